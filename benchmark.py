@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+
+import datetime
+import gc
+import json
+import random
+import re
+import sys
+import threading
+import time
+import timeit
+import tracemalloc
+import unittest.mock
+
+from otvetmailru import (
+    models, factories, compact, categories, rates, stream, records, columnar, lazy, polling, singleflight, base,
+)
+from tests.data import large_main_page
+
+
+CATEGORIES = categories.Categories([
+    {'id': 1, 'urlname': 'auto', 'position': 1, 'name': 'Авто', 'readonly': '0',
+     'categories': [{'id': 2, 'urlname': 'cars', 'position': 1, 'name': 'Легковые', 'readonly': '0'}]},
+])
+
+
+def question_preview_data(i: int) -> dict:
+    return {'id': str(i), 'qtext': f'Question {i}?', 'state': 'A', 'cid': '2', 'added': '60', 'waslead': '0',
+            'polltype': '', 'anscnt': '3', 'total_voted': '0', 'usrid': str(i % 1000), 'nick': f'user{i % 1000}',
+            'vip': 0, 'kpd': '0.5', 'about': '', 'filin': f'filin{i % 1000}', 'is_expert': 0}
+
+
+def answer_preview_data(i: int) -> dict:
+    return {'aid': str(i), 'aadded': '30', 'atext': f'Answer {i}', 'best': 0, 'qid': str(i), 'qtext': f'Question {i}?',
+            'qstate': 'A', 'cid': '2', 'qadded': '60', 'waslead': '0', 'anscnt': '3', 'qusrid': str(i % 1000),
+            'qnick': f'user{i % 1000}', 'qfilin': f'filin{i % 1000}'}
+
+
+def small_user_data(i: int) -> dict:
+    return {'id': str(i), 'nick': f'user{i}', 'filin': f'filin{i}', 'lvl': 'Ученик'}
+
+
+def comment_data(i: int) -> dict:
+    return {'cmid': str(i), 'cmtext': f'Comment {i}', 'usrid': str(i % 1000), 'nick': f'user{i % 1000}',
+            'ofilin': f'filin{i % 1000}', 'points': '100', 'lvl': 'Ученик', 'added': '10', 'comcnt': '0',
+            'comments': [], 'parent': '0', 'refid': '1', 'num': '1', 'type': 'A'}
+
+
+def best_question_preview_data(i: int) -> dict:
+    return {**question_preview_data(i), 'canmark': 1, 'sum': '5'}
+
+
+def user_data(i: int) -> dict:
+    return {'usrid': str(i), 'nick': f'user{i}', 'vip': 0, 'kpd': '0.25', 'about': 'about', 'filin': f'filin{i}',
+            'is_expert': 0, 'points': '1500'}
+
+
+def brand_user_data(i: int) -> dict:
+    return {**user_data(i), 'brand_url': 'brand', 'url': 'https://example.com', 'brand': 'Brand', 'role': 'expert'}
+
+
+def answer_data(i: int) -> dict:
+    return {**user_data(i % 7), 'id': str(i), 'atext': f'Answer {i}', 'source': '', 'added': '100',
+            'totalmarks': '1', 'canmark': 1, 'comcnt': '0', 'comments': []}
+
+
+def question_data(i: int) -> dict:
+    return {**user_data(i % 1000), 'qid': str(i), 'cid': '2', 'acanselbest': 0, 'added': '600', 'totalmarks': '0',
+            'anscnt': '5', 'comcnt': '0', 'cancomment': '1', 'canreply': 1, 'qtext': f'Question {i}?',
+            'qcomment': 'text', 'hidden': '0', 'state': 'A', 'waslead': '0', 'watcher': 0, 'marked': [],
+            'answers': [answer_data(j) for j in range(5)], 'bestanswer': None, 'adds': [], 'polltype': '',
+            'comments': [], 'arating': 0, 'can_edit': 0, 'noadd': 0, 'created_at': 1600000000}
+
+
+def my_profile_data(i: int) -> dict:
+    return {'snick': f'user{i}', 'spoints': '1500', 'srank': 'Ученик', 'description': '', 'skpd': '0.25',
+            'is_expert': 0, 'vip': 0, 'banned': 0, 'subscribed': 0, 'hidden': 0, 'place': '100', 'sans': '10',
+            'sbans': '2', 'sqst': '3', 'black_cnt': '0', 'following': '1', 'weekpoints': '5', 'filin': f'filin{i}',
+            'cnt': {'deleted_answers': '0', 'questions_new': '1', 'questions_voting': '1', 'questions_resolved': '1',
+                    'followers': '4', 'questions_direct': '0', 'questions_removed': '0'},
+            'maillogin': f'user{i}', 'watchcnt': '2'}
+
+
+# baseline: the factories before every model was built in one step, they built the base model
+# and copied its fields into the subclass with vars()
+
+
+def baseline_best_question_preview(data: dict, category_provider) -> models.BestQuestionPreview:
+    base = models.SimpleQuestion(**factories.simple_question_fields(data, category_provider))
+    preview = models.QuestionPreview(**vars(base), author=factories.build_question_author(data))
+    return models.BestQuestionPreview(**vars(preview), can_like=bool(data.get('canmark')),
+                                      like_count=int(data['sum']))
+
+
+def baseline_user_question_preview(data: dict, category_provider) -> models.UserQuestionPreview:
+    base = models.SimpleQuestion(**factories.simple_question_fields(data, category_provider))
+    return models.UserQuestionPreview(**vars(base), is_hidden=bool(data['hidden']))
+
+
+def baseline_question(data: dict, category_provider) -> models.Question:
+    base = models.IncompleteQuestion(**factories.incomplete_question_fields(data, category_provider))
+    return models.Question(**vars(base), best_answer_vote_count=int(data['arating']),
+                           can_edit=bool(data['can_edit']), can_add=not data['noadd'],
+                           created_at=datetime.datetime.fromtimestamp(int(data['created_at'])))
+
+
+def baseline_brand_user(data: dict) -> models.BrandUser:
+    base = models.User(**factories.user_fields(data))
+    return models.BrandUser(**vars(base), brand=factories.build_brand(data), role=data['role'])
+
+
+def baseline_my_user_profile(data: dict, category_provider) -> models.MyUserProfile:
+    # data without maillogin, so that the factory builds the base UserProfile
+    base = factories.build_user_profile(data, 1, category_provider)
+    return models.MyUserProfile(
+        **vars(base),
+        watching_question_count=int(data['watchcnt']),
+        direct_question_count=int(data['cnt']['questions_direct']),
+        removed_question_count=int(data['cnt']['questions_removed']),
+        banned_until=datetime.datetime.fromtimestamp(data['ban_until']) if 'ban_until' in data else None,
+    )
+
+
+def decode_benchmark(count: int) -> None:
+    print(f'Decode time per object, best of 5 runs of {count}:')
+    print(f'  {"":24} {"baseline":>10} {"models":>10} {"records":>10} {"raw":>10}')
+    profile = my_profile_data(1)
+    base_profile = {k: v for k, v in profile.items() if k != 'maillogin'}
+    cases = [
+        ('best question preview', lambda f, c, d: f.build_best_question_preview(d, c),
+         lambda d: baseline_best_question_preview(d, CATEGORIES), best_question_preview_data(1)),
+        ('user question preview', lambda f, c, d: f.build_user_question_preview(d, c),
+         lambda d: baseline_user_question_preview(d, CATEGORIES), {**question_preview_data(1), 'hidden': 0}),
+        ('question (5 answers)', lambda f, c, d: f.build_question(d, c),
+         lambda d: baseline_question(d, CATEGORIES), question_data(1)),
+        ('brand user', lambda f, c, d: f.build_user(d, {}), baseline_brand_user, brand_user_data(1)),
+        ('my user profile', lambda f, c, d: f.build_user_profile(d, 1, c),
+         lambda d: baseline_my_user_profile(base_profile, CATEGORIES), profile),
+    ]
+    outputs = [(factories, CATEGORIES), (records.factories, records.categories),
+               (records.raw_factories, records.categories)]
+    for name, build, baseline, data in cases:
+        assert repr(baseline(data)) == repr(build(factories, CATEGORIES, data))
+        times = [min(timeit.repeat(lambda: baseline(data), number=count, repeat=5)) / count * 1e6]
+        times += [min(timeit.repeat(lambda: build(f, c, data), number=count, repeat=5)) / count * 1e6
+                  for f, c in outputs]
+        print(f'  {name:24} ' + ' '.join(f'{t:7.2f} us' for t in times))
+
+
+def user_stats(count: int) -> list:
+    # most users have few points, kpd is mostly low
+    rng = random.Random(0)
+    return [(int(rng.lognormvariate(5, 2)), rng.betavariate(1.5, 8) * 60) for _ in range(count)]
+
+
+# baseline: the rate lookups before the thresholds were bisected
+
+
+def baseline_by_user_stats(points: int, kpd: float) -> models.Rate:
+    return max([r for r in rates.rates if r.min_points <= points and r.min_kpd <= kpd],
+               key=lambda r: (r.min_points, r.min_kpd))
+
+
+_baseline_by_name = {r.name.lower(): r for r in rates.rates}
+
+
+def baseline_by_name(name: str) -> models.Rate:
+    return _baseline_by_name[name.lower()]
+
+
+def rates_benchmark(count: int) -> None:
+    stats = user_stats(count)
+    names = [rates.by_user_stats(points, kpd).name for points, kpd in stats]
+    assert [baseline_by_user_stats(points, kpd) for points, kpd in stats] == [rates.by_name(n) for n in names]
+    print(f'Rate lookup time, best of 5 runs of {count}:')
+    print(f'  {"":24} {"baseline":>10} {"current":>10}')
+    cases = [
+        ('by_user_stats', lambda: [baseline_by_user_stats(points, kpd) for points, kpd in stats],
+         lambda: [rates.by_user_stats(points, kpd) for points, kpd in stats]),
+        ('by_name', lambda: [baseline_by_name(name) for name in names],
+         lambda: [rates.by_name(name) for name in names]),
+    ]
+    for name, *runs in cases:
+        times = [min(timeit.repeat(run, number=1, repeat=5)) / count * 1e9 for run in runs]
+        print(f'  {name:24} ' + ' '.join(f'{t:7.0f} ns' for t in times))
+
+
+# baseline: the main page extraction before the page was scanned once, one regular expression per value
+
+
+def baseline_read_variable(page: str, name: str, opening: str) -> object:
+    string = re.search(rf'var {name} = ({re.escape(opening)}.*)$', page, re.MULTILINE).group(1)
+    try:
+        return json.loads(string)
+    except json.JSONDecodeError as e:
+        return json.loads(string[:e.pos])
+
+
+def baseline_auth_fields(page: str) -> dict:
+    return {
+        'salt': re.search(r'"salt" : "([a-zA-Z0-9]+)"', page).group(1),
+        'id': re.search(r'"id" : "([0-9]+)"', page).group(1),
+        'is_adult': re.search(r'"is_adult" : (true|false),', page).group(1) == 'true',
+    }
+
+
+def baseline_scan_main_page(page: str) -> dict:
+    return {**baseline_auth_fields(page), 'CATEGORIES': baseline_read_variable(page, 'CATEGORIES', '['),
+            'BRANDURLS': baseline_read_variable(page, 'BRANDURLS', '['),
+            'ERRORS': baseline_read_variable(page, 'ERRORS', '{')}
+
+
+def main_page_benchmark(count: int) -> None:
+    page = large_main_page()
+    assert baseline_scan_main_page(page) == base.scan_main_page(page)
+    assert baseline_auth_fields(page) == base.scan_main_page(page, with_metadata=False)
+    print(f'Main page scan time, {len(page.encode()) // 1024} KB page, best of 5 runs of {count}:')
+    print(f'  {"":24} {"baseline":>10} {"current":>10}')
+    cases = [
+        ('auth fields only', lambda: baseline_auth_fields(page), lambda: base.scan_main_page(page, False)),
+        ('auth fields and metadata', lambda: baseline_scan_main_page(page), lambda: base.scan_main_page(page)),
+    ]
+    for name, *runs in cases:
+        times = [min(timeit.repeat(run, number=count, repeat=5)) / count * 1e3 for run in runs]
+        print(f'  {name:24} ' + ' '.join(f'{t:7.2f} ms' for t in times))
+
+
+def build_all(f, count: int) -> list:
+    result = []
+    for i in range(count):
+        result.append(f.build_question_preview(question_preview_data(i), CATEGORIES))
+        result.append(f.build_answer_preview(answer_preview_data(i), CATEGORIES))
+        result.append(f.build_small_user_preview(small_user_data(i)))
+        result.append(f.build_comment(comment_data(i), {}))
+    return result
+
+
+def measure_memory(f, count: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    objects = build_all(f, count)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def memory_benchmark(count: int) -> None:
+    print(f'Memory for {count} question previews, answer previews, user previews and comments:')
+    for name, f in [('models', factories), ('compact', compact.factories)]:
+        size = measure_memory(f, count)
+        print(f'  {name:8} {size / 2 ** 20:8.1f} MiB  {size / count / 4:6.0f} bytes per object')
+
+
+def comments_payload(count: int) -> bytes:
+    comments = [{**comment_data(i), 'comments': [comment_data(count + i * 3 + j) for j in range(3)]}
+                for i in range(count)]
+    return json.dumps({'comments': {'comments': comments, 'count': count}, 'status': 200}).encode()
+
+
+def peak_memory(run) -> int:
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def stream_benchmark(count: int) -> None:
+    payload = comments_payload(count)
+    chunks = [payload[i:i + 65536] for i in range(0, len(payload), 65536)]
+    print(f'Peak memory for reading {count} comments with 3 replies each ({len(payload) / 2 ** 20:.1f} MiB):')
+
+    def full():
+        data = json.loads(b''.join(chunks))
+        for c in [factories.build_comment(c, {}) for c in data['comments']['comments']]:
+            pass
+
+    def streamed():
+        parser = stream.JsonArrayStream(('comments', 'comments'))
+        for chunk in chunks:
+            for c in parser.feed(chunk):
+                factories.build_comment(c, {})
+        for c in parser.finish()[0]:
+            factories.build_comment(c, {})
+
+    for name, run in [('full', full), ('stream', streamed)]:
+        print(f'  {name:8} {peak_memory(run) / 2 ** 20:8.1f} MiB')
+
+
+def retained_memory(run) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = run()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def columns_benchmark(count: int) -> None:
+    pages = [[question_preview_data(i) for i in range(p, p + 100)] for p in range(0, count, 100)]
+    print(f'Decoding {count} question previews in pages of 100, best of 5 runs, and memory kept by the pages:')
+
+    def decode_models():
+        return [[factories.build_question_preview(q, CATEGORIES) for q in page] for page in pages]
+
+    def decode_columns():
+        return [columnar.to_columns([records.factories.build_question_preview(q, records.categories) for q in page])
+                for page in pages]
+
+    def sum_models(decoded):
+        counts = {}
+        for page in decoded:
+            for q in page:
+                counts[q.author.id] = counts.get(q.author.id, 0) + q.answer_count
+        return counts
+
+    def sum_columns(decoded):
+        counts = {}
+        for batch in decoded:
+            for author_id, answer_count in zip(batch['author_id'], batch['answer_count']):
+                counts[author_id] = counts.get(author_id, 0) + answer_count
+        return counts
+
+    assert sum_models(decode_models()) == sum_columns(decode_columns())
+    print(f'  {"":8} {"decode":>11} {"sum by author":>14} {"memory":>10}')
+    for name, decode, aggregate in [('models', decode_models, sum_models), ('columns', decode_columns, sum_columns)]:
+        decoded = decode()
+        decode_time = min(timeit.repeat(decode, number=1, repeat=5))
+        aggregate_time = min(timeit.repeat(lambda: aggregate(decoded), number=1, repeat=5))
+        size = retained_memory(decode)
+        print(f'  {name:8} {decode_time * 1e3:8.1f} ms {aggregate_time * 1e3:11.1f} ms {size / 2 ** 20:6.1f} MiB')
+
+
+def read_lazy_fields(question) -> list:
+    return [getattr(question, name) for names in lazy.LAZY_FIELDS.values() for name in names]
+
+
+def lazy_benchmark(count: int) -> None:
+    data = question_data(1)
+    lazy_factories = lazy.bind(factories)
+    print(f'Time to decode a question with 5 answers, best of 5 runs of {count}:')
+    print(f'  {"":24} {"eager":>10} {"lazy":>10}')
+    cases = [
+        ('read can_answer', lambda f: f.build_question(data, CATEGORIES).can_answer),
+        ('read all answers', lambda f: f.build_question(data, CATEGORIES).answers),
+        ('read all fields', lambda f: read_lazy_fields(f.build_question(data, CATEGORIES))),
+    ]
+    for name, run in cases:
+        times = [min(timeit.repeat(lambda: run(f), number=count, repeat=5)) / count * 1e6
+                 for f in (factories, lazy_factories)]
+        print(f'  {name:24} ' + ' '.join(f'{t:7.2f} us' for t in times))
+
+
+def arrival_times(hours: int) -> list:
+    # questions arrive at 3 per second at the peak and 100 times slower at night
+    rng = random.Random(0)
+    times, now = [], 0.
+    while now < hours * 3600:
+        hour = now / 3600 % 24
+        rate = 3 * 100 ** (-abs(hour - 14) / 10)
+        now += rng.expovariate(rate)
+        times.append(now)
+    return times
+
+
+def simulate_polling(times: list, step: int, delay: float, backfill: bool, adaptive: polling.AdaptivePolling = None):
+    tracker = polling.NewItemTracker(0, 10 if backfill else 0, step)
+    requests, seen, now, rate, arrived = 0, 0, 0., None, 0
+    while now < times[-1]:
+        next_delay = adaptive.next_delay(rate, step) if adaptive else delay
+        now += next_delay
+        while arrived < len(times) and times[arrived] <= now:
+            arrived += 1
+        newest = arrived
+        page = [{'id': i} for i in range(newest, max(newest - step, 0), -1)]
+        while True:
+            requests += 1
+            seen += len(tracker.feed(page))
+            if tracker.offset is None:
+                break
+            page = [{'id': i} for i in range(tracker.anchor - tracker.offset,
+                                             max(tracker.anchor - tracker.offset - step, 0), -1)]
+        if adaptive:
+            rate = adaptive.update_rate(rate, tracker.new_count, next_delay)
+    return requests, len(times) - seen
+
+
+def polling_benchmark() -> None:
+    times = arrival_times(24)
+    print(f'Watching new questions for a simulated day ({len(times)} questions, pages of 20):')
+    cases = [
+        ('fixed 10 s', dict(delay=10, backfill=False)),
+        ('fixed 10 s + backfill', dict(delay=10, backfill=True)),
+        ('adaptive + backfill', dict(delay=10, backfill=True, adaptive=polling.AdaptivePolling())),
+    ]
+    for name, kwargs in cases:
+        requests, missed = simulate_polling(times, 20, **kwargs)
+        print(f'  {name:24} {requests:7} requests {missed:7} missed')
+
+
+def answer_times(question_count: int, hours: float) -> list:
+    # most questions get a few answers soon after they are asked, a few keep getting them for hours
+    rng = random.Random(0)
+    result = []
+    for _ in range(question_count):
+        rate, now, times = rng.lognormvariate(-6, 1.5), 0., []
+        while True:
+            now += rng.expovariate(rate)
+            if now > hours * 3600:
+                break
+            times.append(now)
+            rate *= 0.8
+        result.append(times)
+    return result
+
+
+def simulate_follower(times: list, hours: float, adaptive: polling.AdaptivePolling,
+                      state_check_interval: int = 10) -> tuple:
+    step = 20
+    clock = [0.]
+    requests, delays = 0, []
+    with unittest.mock.patch('otvetmailru.polling.time.monotonic', lambda: clock[0]):
+        schedule = polling.AnswerSchedule(adaptive, state_check_interval)
+        for i in range(len(times)):
+            schedule.add(i, 0)
+        while True:
+            when, question_id = schedule.next_check()
+            if when > hours * 3600:
+                break
+            clock[0] = when
+            offset = schedule.offset(question_id)
+            arrived = [t for t in times[question_id][offset:offset + step] if t <= when]
+            requests += 1
+            delays.extend(when - t for t in arrived)
+            state = None
+            if not arrived and schedule.needs_state(question_id):
+                # the questions are never resolved in the simulation
+                requests += 1
+                state = models.QuestionState.open
+            schedule.record(question_id, len(arrived), step, state)
+    return requests, sum(delays) / len(delays)
+
+
+def follower_benchmark(question_count: int) -> None:
+    hours = 2
+    times = answer_times(question_count, hours)
+    print(f'Following {question_count} questions for {hours} hours ({sum(map(len, times))} answers):')
+    # iterate_answers(infinite=True, delay=10) for every question
+    print(f'  {"fixed 10 s":24} {question_count * hours * 360:9} requests {5:7.1f} s average delay of an answer')
+    cases = [
+        ('schedule, 10-600 s', polling.AnswerSchedule().adaptive_polling),
+        ('schedule, 10-60 s', polling.AdaptivePolling(min_delay=10, max_delay=60, target_fill=0.1)),
+    ]
+    for name, adaptive in cases:
+        requests, delay = simulate_follower(times, hours, adaptive)
+        print(f'  {name:24} {requests:9} requests {delay:7.1f} s average delay of an answer')
+
+
+def watchlist_benchmark(question_count: int, syncs: int) -> None:
+    rng = random.Random(0)
+    step = 20
+    counts = {i: rng.randrange(10) for i in range(question_count)}
+
+    def watchlist():
+        return [records.MinimalQuestionPreview(id=i, title='', category=2, state='A', age_seconds=0, is_leader=False,
+                                               poll_type='', answer_count=n, author=None) for i, n in counts.items()]
+
+    snapshot = polling.WatchlistSnapshot()
+    snapshot.update(watchlist())
+    requests = 0
+    for _ in range(syncs):
+        for i in rng.sample(range(question_count), question_count // 100):
+            counts[i] += 1
+        changes = snapshot.update(watchlist())
+        requests += -(-question_count // step) + sum(-(-change.answers_to_load // step) for change in changes)
+    print(f'Requests per check of {question_count} watched questions, 1% of them get an answer between checks:')
+    print(f'  {"every question":16} {question_count:7}')
+    print(f'  {"watchlist sync":16} {requests / syncs:7.0f}')
+
+
+
+def singleflight_benchmark(thread_count: int, calls_per_thread: int) -> None:
+    def run(single_flight):
+        requests = []
+        rng = random.Random(0)
+        keys = [[rng.randrange(5) for _ in range(calls_per_thread)] for _ in range(thread_count)]
+
+        def request(key):
+            requests.append(key)
+            time.sleep(0.01)
+            return key
+
+        def worker(thread_keys):
+            for key in thread_keys:
+                if single_flight is None:
+                    request(key)
+                else:
+                    single_flight.do(key, lambda: request(key))
+
+        threads = [threading.Thread(target=worker, args=(thread_keys,)) for thread_keys in keys]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return len(requests)
+
+    print(f'Requests made by {thread_count} threads reading {calls_per_thread} of 5 pages each, 10 ms per request:')
+    print(f'  {"separate":12} {run(None):7}')
+    print(f'  {"coalesced":12} {run(singleflight.SingleFlight()):7}')
+
+
+if __name__ == '__main__':
+    object_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    memory_benchmark(object_count)
+    print()
+    decode_benchmark(object_count // 10)
+    print()
+    rates_benchmark(object_count)
+    print()
+    main_page_benchmark(20)
+    print()
+    stream_benchmark(object_count // 10)
+    print()
+    columns_benchmark(object_count // 10)
+    print()
+    lazy_benchmark(object_count // 10)
+    print()
+    polling_benchmark()
+    print()
+    follower_benchmark(object_count // 20)
+    print()
+    watchlist_benchmark(object_count // 20, 10)
+    print()
+    singleflight_benchmark(50, 20)
@@ -0,0 +1,464 @@
+import asyncio
+import collections
+import contextlib
+import inspect
+import itertools
+import time
+from http.cookies import SimpleCookie
+from typing import (
+    Optional, Dict, Callable, Union, List, AsyncIterator, Awaitable, Deque, Iterable, Iterator, Any, Sequence,
+)
+
+import aiohttp
+from yarl import URL
+
+from . import (
+    error, utils, transport as transport_, ratelimit, retry, cache as cache_, metadata as metadata_,
+    identity, stream, singleflight, base,
+)
+from .base import MethodArgs, T, R, WRITE_METHODS, decode_error, extract_metadata
+
+
+def flatten_params(params: Optional[dict]) -> Optional[List[tuple]]:
+    """Convert request parameters to a list of string pairs, expanding list values into repeated keys."""
+    if params is None:
+        return None
+    return [(k, str(v)) for k, vs in params.items() for v in (vs if isinstance(vs, list) else [vs])]
+
+
+async def iterate_pages(get_page: Callable[[int], Awaitable[list]], step: int,
+                        prefetch: int = 0) -> AsyncIterator[list]:
+    if prefetch > 0:
+        async for data in prefetch_pages(get_page, step, prefetch):
+            yield data
+        return
+    for p in itertools.count(0, step):
+        data = await get_page(p)
+        if data:
+            yield data
+        if len(data) < step:
+            return
+
+
+async def prefetch_pages(get_page: Callable[[int], Awaitable[list]], step: int,
+                         prefetch: int) -> AsyncIterator[list]:
+    """
+    Same as iterate_pages, but up to `prefetch` next pages are loaded concurrently.
+    Pages are returned in order. Requests for pages past the end are cancelled and awaited.
+    """
+    offsets = itertools.count(0, step)
+    pending: Deque[asyncio.Future] = collections.deque()
+    try:
+        while True:
+            while len(pending) < prefetch:
+                pending.append(asyncio.ensure_future(get_page(next(offsets))))
+            data = await pending.popleft()
+            if data:
+                yield data
+            if len(data) < step:
+                return
+    finally:
+        for task in pending:
+            task.cancel()
+        # retrieve the exceptions, including cancellations, of the discarded requests
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def map_concurrently(func: Callable[[T], Awaitable[R]], items: Iterable[T],
+                           concurrency: int) -> List[Union[R, error.OtvetError]]:
+    """
+    Await a coroutine function for every item, running at most `concurrency` of them at once.
+    :return: results in the order of items, library errors are returned in place of the results
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(item: T) -> Union[R, error.OtvetError]:
+        async with semaphore:
+            try:
+                return await func(item)
+            except error.OtvetError as e:
+                return e
+
+    return list(await asyncio.gather(*[call(item) for item in items]))
+
+
+@contextlib.contextmanager
+def _aiohttp_errors() -> Iterator[None]:
+    try:
+        yield
+    except asyncio.TimeoutError as e:
+        raise error.OtvetTimeoutError(str(e)) from e
+    except aiohttp.ClientConnectionError as e:
+        raise error.OtvetConnectionError(str(e)) from e
+    except aiohttp.ClientError as e:
+        raise error.OtvetTransportError(str(e)) from e
+
+
+class AiohttpTransport(transport_.AsyncTransport):
+    """
+    Transport based on aiohttp.ClientSession with a tunable connection pool.
+    The session is created on first use, inside the running event loop.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession = None, *, limit: int = 100, limit_per_host: int = 0,
+                 keep_alive: bool = True, keepalive_timeout: float = 15, timeout: float = None):
+        """
+        :param session: aiohttp session to use, a new one is created by default
+        :param limit: maximal number of simultaneous connections
+        :param limit_per_host: maximal number of simultaneous connections to one host, 0 for no limit
+        :param keep_alive: reuse connections between requests
+        :param keepalive_timeout: how long to keep idle connections open, in seconds
+        :param timeout: total request timeout in seconds, no timeout by default
+        """
+        self._owns_session = session is None
+        self.session = session
+        self._connector_args = {'limit': limit, 'limit_per_host': limit_per_host}
+        if keep_alive:
+            self._connector_args['keepalive_timeout'] = keepalive_timeout
+        else:
+            self._connector_args['force_close'] = True
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._pending_cookies: Dict[str, SimpleCookie] = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(**self._connector_args),
+                                                 timeout=self._timeout)
+        if self._pending_cookies:
+            for cookie in self._pending_cookies.values():
+                self.session.cookie_jar.update_cookies(cookie, URL('https://otvet.mail.ru/'))
+            self._pending_cookies.clear()
+        return self.session
+
+    async def request(self, method: str, url: str, *, params: transport_.Params = None,
+                      data: transport_.Params = None, headers: Dict[str, str] = None) -> transport_.Response:
+        with _aiohttp_errors():
+            async with self._get_session().request(method, url, params=flatten_params(params),
+                                                   data=flatten_params(data), headers=headers) as result:
+                return transport_.Response(result.status, await result.read(), result.charset)
+
+    async def stream(self, method: str, url: str, *, params: transport_.Params = None,
+                     data: transport_.Params = None, headers: Dict[str, str] = None,
+                     chunk_size: int = 65536) -> transport_.AsyncStreamingResponse:
+        with _aiohttp_errors():
+            result = await self._get_session().request(method, url, params=flatten_params(params),
+                                                       data=flatten_params(data), headers=headers)
+
+        async def chunks():
+            with _aiohttp_errors():
+                async for chunk in result.content.iter_chunked(chunk_size):
+                    yield chunk
+
+        async def close():
+            result.release()
+
+        return transport_.AsyncStreamingResponse(result.status, chunks(), close)
+
+    def get_cookie(self, name: str) -> Optional[str]:
+        if name in self._pending_cookies:
+            return self._pending_cookies[name][name].value
+        if self.session is None:
+            return None
+        morsel = self.session.cookie_jar.filter_cookies(URL('https://otvet.mail.ru/')).get(name)
+        return morsel.value if morsel is not None else None
+
+    def set_cookie(self, name: str, value: str, domain: str) -> None:
+        cookie = SimpleCookie()
+        cookie[name] = value
+        cookie[name]['domain'] = domain
+        if self.session is None:
+            self._pending_cookies[name] = cookie
+        else:
+            self.session.cookie_jar.update_cookies(cookie, URL('https://otvet.mail.ru/'))
+
+    async def close(self) -> None:
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class AsyncOtvetClient(base.BaseOtvetClient):
+    """
+    Asynchronous otvet.mail.ru API client, mirrors OtvetClient.
+    Methods that perform http requests are coroutines, iterate_* methods are async generators.
+    There are no is_adult, categories and brand_list properties, use the get_is_adult, get_categories and
+    get_brand_list coroutines.
+    Should be closed with close() or used as an async context manager.
+    Coroutines running at the same time share one token renewal, like the threads of OtvetClient.
+
+    :ivar user_id: id of the authenticated user, or None
+    :ivar cache: response cache, or None
+    """
+
+    def __init__(self, *, session: aiohttp.ClientSession = None, transport: transport_.AsyncTransport = None,
+                 auth_info: str = None, auto_renew_token: bool = True, api_retry_attempts: int = 3,
+                 rate_limiter: ratelimit.RateLimiter = None, retry_policy: retry.RetryPolicy = None,
+                 cache: cache_.ResponseCache = None, metadata_snapshot: metadata_.MetadataSnapshot = None,
+                 compact_models: bool = False, user_identity_map: identity.UserIdentityMap = None,
+                 json_backend: Union[str, utils.JsonBackend, None] = None, lazy_questions: bool = False,
+                 coalesce_requests: bool = False):
+        """
+        :param session: aiohttp session that will be used for http requests, created on first use by default
+        :param transport: transport that will be used for http requests, overrides session
+        :param auth_info: authentication string previously returned by auth_info property, to reuse old authentication
+        :param auto_renew_token: renew the authentication token automatically when it expires
+        :param api_retry_attempts: how many times to retry failed http requests, ignored if retry_policy is given
+        :param rate_limiter: rate limiter to throttle api requests, can be shared between clients;
+            one with a state file is called in the default executor
+        :param retry_policy: when and how long to wait before retrying failed http requests
+        :param cache: cache for responses of read-only api methods, can be shared between clients
+        :param metadata_snapshot: on-disk snapshot of categories, brands and error messages to start without
+            downloading the main page
+        :param compact_models: return models with __slots__ from otvetmailru.compact, which take less memory
+        :param user_identity_map: map to return the same User object for a user in all responses,
+            can be shared between clients
+        :param json_backend: json decoder for responses, 'orjson', 'ujson', 'json' or a JsonBackend object;
+            the json module by default, see otvetmailru.utils.get_json_backend
+        :param lazy_questions: decode answers, comments, likes, additions and polls of questions on first access,
+            see otvetmailru.lazy
+        :param coalesce_requests: make one network request for identical read requests running at the same time,
+            their callers get the same response object, see otvetmailru.singleflight
+        """
+        super().__init__(transport or AiohttpTransport(session), auth_info=auth_info,
+                         auto_renew_token=auto_renew_token, api_retry_attempts=api_retry_attempts,
+                         rate_limiter=rate_limiter, retry_policy=retry_policy, cache=cache,
+                         metadata_snapshot=metadata_snapshot, compact_models=compact_models,
+                         user_identity_map=user_identity_map, json_backend=json_backend,
+                         lazy_questions=lazy_questions,
+                         single_flight=singleflight.AsyncSingleFlight() if coalesce_requests else None)
+        self._main_page_lock: Optional[asyncio.Lock] = None
+        # the event loop keeps only a weak reference to a task
+        self._metadata_refresh_task: Optional[asyncio.Future] = None
+
+    async def __aenter__(self) -> 'AsyncOtvetClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the transport, cancelling a background refresh of the metadata snapshot."""
+        task = self._metadata_refresh_task
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self._transport.close()
+
+    async def _run(self, op: base.Op[T]) -> T:
+        send, value = op.send, None
+        try:
+            while True:
+                try:
+                    effect = send(value)
+                except StopIteration as e:
+                    return e.value
+                try:
+                    send, value = op.send, await self._perform(effect)
+                except Exception as e:
+                    send, value = op.throw, e
+        finally:
+            op.close()
+
+    async def _iterate(self, op: base.Op[Any]) -> AsyncIterator[Any]:
+        send, value = op.send, None
+        try:
+            while True:
+                try:
+                    effect = send(value)
+                except StopIteration:
+                    return
+                send, value = op.send, None
+                try:
+                    if isinstance(effect, base.Emit):
+                        yield effect.value
+                    elif isinstance(effect, base.EmitPages):
+                        async for page in iterate_pages(effect.get_page, effect.step, effect.prefetch):
+                            yield page
+                    elif isinstance(effect, base.EmitStream):
+                        async for data in self._stream_items(effect.method, effect.params, effect.path):
+                            yield effect.build(data)
+                    else:
+                        value = await self._perform(effect)
+                except Exception as e:
+                    send, value = op.throw, e
+        finally:
+            op.close()
+
+    async def _perform(self, effect: Any) -> Any:
+        if isinstance(effect, base.Call):
+            return await self._call_checked(effect.method, effect.params, effect.direct)
+        if isinstance(effect, base.LoadMetadata):
+            return await self._load_metadata()
+        if isinstance(effect, base.LoadMainPage):
+            return await self._load_main_page()
+        if isinstance(effect, base.RenewToken):
+            return await self._renew_token(effect.expired_auth)
+        if isinstance(effect, base.Sleep):
+            return await asyncio.sleep(effect.seconds)
+        if isinstance(effect, base.Batch):
+            return await map_concurrently(effect.func, effect.items, effect.concurrency)
+        if isinstance(effect, base.Invoke):
+            result = effect.func()
+            return await result if inspect.isawaitable(result) else result
+        if isinstance(effect, base.ReadPages):
+            return [page async for page in iterate_pages(effect.get_page, effect.step, effect.prefetch)]
+        raise TypeError(f'Unknown effect: {effect!r}')
+
+    async def _load_main_page(self) -> None:
+        async with self._get_main_page_lock():
+            await self._read_main_page()
+
+    def _get_main_page_lock(self) -> asyncio.Lock:
+        # created on first use to bind to the running event loop
+        if self._main_page_lock is None:
+            self._main_page_lock = asyncio.Lock()
+        return self._main_page_lock
+
+    async def _read_main_page(self) -> None:
+        page = (await self._transport.get(base.MAIN_PAGE_URL + '?login=1')).text
+        self._apply_main_page(page, self._transport.get_cookie('ot'))
+
+    async def _fetch_metadata(self) -> metadata_.Metadata:
+        page = (await self._transport.get(base.MAIN_PAGE_URL)).text
+        return extract_metadata(page)
+
+    async def _load_metadata(self) -> None:
+        async with self._get_main_page_lock():
+            if self._has_metadata():
+                # loaded by another caller while this one was waiting
+                return
+            metadata = self._load_snapshot()
+            if metadata is None:
+                await self._read_main_page()
+            elif (not self._metadata_snapshot.is_fresh(metadata) and self._metadata_refresh_task is None
+                  and self._metadata_snapshot.start_refresh()):
+                self._metadata_refresh_task = asyncio.ensure_future(self._fetch_metadata())
+                self._metadata_refresh_task.add_done_callback(self._metadata_refresh_done)
+
+    def _metadata_refresh_done(self, task: asyncio.Future) -> None:
+        # also called for a task cancelled before it started, which has not run any of its code
+        self._metadata_refresh_task = None
+        metadata = None
+        if not task.cancelled():
+            if task.exception() is None:
+                metadata = task.result()
+            else:
+                # the stale snapshot stays in use, the next client will try again
+                metadata_.logger.warning('Cannot refresh the metadata snapshot: %s', task.exception())
+        self._metadata_snapshot.finish_refresh(metadata)
+
+    async def _throttle(self, method: str) -> None:
+        if self._rate_limiter is not None:
+            if getattr(self._rate_limiter, 'path', None) is not None:
+                # the shared state file is locked and read, which would block the event loop
+                delay = await utils.get_running_loop().run_in_executor(None, self._rate_limiter.reserve, method)
+            else:
+                delay = self._rate_limiter.reserve(method)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    async def _call_api(self, method: str, params: MethodArgs, direct: bool = False) -> dict:
+        await self._throttle(method)
+        url, real_params = self._api_request(method, params, direct)
+        send = self._transport.get if direct else self._transport.post
+        result = await send(url, real_params, headers=self._headers)
+        return self._decode_response(result.status_code, result.content)
+
+    async def _renew_token(self, expired_auth: Optional[base.AuthState]) -> None:
+        """
+        Load a new token from the main page after a request failed with invalid_token.
+        Only one caller renews the token, the others wait for it; if the token has changed since the failed request
+        was made, it is not renewed again.
+        :param expired_auth: auth state of the failed request, None to renew anyway
+        """
+        async with self._get_main_page_lock():
+            if expired_auth is None or expired_auth is self._auth:
+                await self._read_main_page()
+
+    async def _retrying(self, method: str, policy: retry.RetryPolicy, call: Callable[[], Awaitable[R]]) -> R:
+        policy = policy.for_method(method)
+        is_write = method in WRITE_METHODS
+        started = time.monotonic()
+        for attempt in itertools.count():
+            try:
+                return await call()
+            except error.OtvetTransportError as e:
+                delay = policy.next_delay(attempt, e, is_write, started)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    async def _call_retrying(self, method: str, params: MethodArgs, direct: bool,
+                             policy: retry.RetryPolicy) -> dict:
+        return await self._retrying(method, policy, lambda: self._call_api(method, params, direct))
+
+    async def _open_stream(self, method: str, params: MethodArgs) -> transport_.AsyncStreamingResponse:
+        await self._throttle(method)
+        url, real_params = self._api_request(method, params, False)
+        result = await self._transport.stream('POST', url, data=real_params, headers=self._headers)
+        if result.status_code >= 500 or result.status_code == 429:
+            await result.close()
+            raise error.OtvetHTTPError(result.status_code)
+        return result
+
+    async def _stream_items(self, method: str, params: MethodArgs, path: Sequence[str]) -> AsyncIterator[Any]:
+        """
+        Call an api method and yield the decoded items of one array in the response, reading it in chunks.
+        The response is not cached.
+        :param path: keys that lead to the array
+        """
+        for attempt in range(2):
+            auth = self._auth
+            result = await self._retrying(method, self._retry_policy, lambda: self._open_stream(method, params))
+            parser = stream.JsonArrayStream(path)
+            try:
+                async for chunk in result.iter_content():
+                    try:
+                        items = parser.feed(chunk)
+                    except ValueError as e:
+                        raise decode_error(result.status_code, e) from e
+                    for item in items:
+                        yield item
+                try:
+                    items, response = parser.finish()
+                except ValueError as e:
+                    raise decode_error(result.status_code, e) from e
+                for item in items:
+                    yield item
+            finally:
+                await result.close()
+            # an error response has no items, so the request can be repeated after renewing the token
+            if not await self._run(self._check_response(response, attempt == 0, auth)):
+                return
+
+    async def _call_checked(self, method: str, params: MethodArgs, direct: bool = False,
+                            retry_policy: retry.RetryPolicy = None) -> dict:
+        cached, result = self._cached_response(method, params)
+        if result is not None:
+            return result
+        retry_policy = retry_policy or self._retry_policy
+        if not self._coalesced(method):
+            return await self._call_uncached(method, params, direct, retry_policy, cached)
+        key = cache_.request_key(method, params, self.user_id)
+        return await self._single_flight.do(key, lambda: self._call_uncached(method, params, direct, retry_policy,
+                                                                             cached))
+
+    async def _call_uncached(self, method: str, params: MethodArgs, direct: bool, retry_policy: retry.RetryPolicy,
+                             cached: bool) -> dict:
+        auth = self._auth
+        result = await self._call_retrying(method, params, direct, retry_policy)
+        if await self._run(self._check_response(result, True, auth)):
+            result = await self._call_retrying(method, params, direct, retry_policy)
+            await self._run(self._check_response(result, False))
+        self._store_response(method, params, cached, result)
+        return result
+
+    async def authenticate(self, login: str, password: str) -> None:
+        """Authenticate the client with mail.ru username and password."""
+        if '@' not in login:
+            login += '@mail.ru'
+        data = {'Login': login, 'Username': login, 'Password': password}
+        await self._transport.post('https://auth.mail.ru/cgi-bin/auth', data)
+        await self._load_main_page()
+        if self.user_id is None:
+            raise error.OtvetAuthError(login)
@@ -0,0 +1,2006 @@
+"""
+The part of the clients that does not depend on how requests are made.
+
+Every api method of the clients is written once here, as a generator that yields effects (Call for an api request,
+Sleep, LoadMetadata, ...) and gets their results back. OtvetClient performs the effects with blocking calls and
+AsyncOtvetClient with coroutines; a method marked with @operation becomes a plain method in the first one and
+a coroutine in the second one, and a method marked with @iteration becomes a generator or an async generator.
+The annotations of the marked methods are the types of their results. Inside this module an operation calls another
+one with `yield from self._call_operation(BaseOtvetClient.method, ...)`, which calls the override instead if
+a subclass of a client overrides the method.
+"""
+import functools
+import inspect
+import itertools
+import json
+import re
+import time
+import types
+from typing import (
+    Optional, Dict, Callable, Union, List, Iterator, Iterable, TypeVar, Any, Tuple, Sequence, Generator, NamedTuple,
+)
+
+from . import (
+    error, models, factories, categories, utils, retry, cache as cache_, metadata as metadata_, compact, identity,
+    records, columnar, lazy, polling,
+)
+
+
+MethodArgs = Dict[str, Union[str, int]]
+StateInput = Union[str, models.QuestionState, None]
+CategoryInput = Union[str, models.Category, None]
+UserInput = Union[int, models.BaseUser, None]
+OptionInput = Union[int, models.PollOption]
+QuestionInput = Union[int, models.BaseQuestion]
+AnswerInput = Union[int, models.BaseAnswer]
+CommentInput = Union[int, models.Comment]
+BrandInput = Union[str, models.BaseBrand]
+T = TypeVar('T')
+R = TypeVar('R')
+# generator that yields effects and returns T
+Op = Generator[Any, Any, T]
+
+# the models and their compact counterparts, objects of both kinds can be passed to the clients
+_POLL_OPTION = compact.model_types(models.PollOption)
+_QUESTION = compact.model_types(models.BaseQuestion)
+_INCOMPLETE_QUESTION = compact.model_types(models.IncompleteQuestion)
+_FULL_QUESTION = compact.model_types(models.Question)
+_ANSWER = compact.model_types(models.BaseAnswer)
+_COMMENT = compact.model_types(models.Comment)
+_BRAND = compact.model_types(models.BaseBrand)
+_USER = compact.model_types(models.BaseUser)
+
+API_URL = 'https://otvet.mail.ru/api/'
+MAIN_PAGE_URL = 'https://otvet.mail.ru/'
+
+WRITE_METHODS = frozenset({
+    '/v2/addqst', '/v2/editqst', '/v2/updqst', '/v2/addans', '/v2/editans', '/v2/addcmt', '/v2/votepoll',
+    '/v2/votefor', '/v2/selectbest', '/v2/mark', '/v2/unmark', '/v2/thanks', '/v2/golden', '/v2/notimportant',
+    '/v2/unnotimportant', '/v2/startwatch', '/v2/dropwatch', '/v2/follow', '/v2/unfollow', '/v2/removefollower',
+    '/v2/addblist', '/v2/delblist', '/v2/abuse', '/v2/iamadult',
+})
+
+
+def normalize_state(state: StateInput) -> Optional[models.QuestionState]:
+    if state is None:
+        return None
+    if not isinstance(state, models.QuestionState):
+        state = models.QuestionState(state)
+    return state
+
+
+def normalize_option(option: OptionInput) -> int:
+    if isinstance(option, _POLL_OPTION):
+        return option.id
+    return option
+
+
+def normalize_question(question: QuestionInput) -> int:
+    if isinstance(question, _QUESTION):
+        return question.id
+    return question
+
+
+def normalize_answer(answer: AnswerInput) -> int:
+    if isinstance(answer, _ANSWER):
+        return answer.id
+    return answer
+
+
+def normalize_comment(comment: CommentInput) -> int:
+    if isinstance(comment, _COMMENT):
+        return comment.id
+    return comment
+
+
+def normalize_brand(brand: BrandInput) -> str:
+    if isinstance(brand, _BRAND):
+        return brand.urlname
+    return brand
+
+
+def normalize_comment_reference(reference: Union[int, models.BaseQuestion, models.BaseAnswer],
+                                reference_type: Union[str, models.CommentType, None]
+                                ) -> Tuple[int, models.CommentType]:
+    if isinstance(reference, _QUESTION):
+        return reference.id, models.CommentType.question
+    if isinstance(reference, _ANSWER):
+        return reference.id, models.CommentType.answer
+    if isinstance(reference_type, str):
+        return reference, models.CommentType(reference_type)
+    if reference_type is None:
+        raise error.OtvetArgumentError('reference_type is required for numeric reference')
+    return reference, reference_type
+
+
+def follow_answers_cursor(question: QuestionInput, include_existing: bool
+                          ) -> Tuple[int, Optional[int], Optional[models.QuestionState]]:
+    """Arguments of AnswerSchedule.add for a question."""
+    offset = 0 if include_existing else None
+    if not include_existing and isinstance(question, _INCOMPLETE_QUESTION):
+        offset = question.answer_count
+    return normalize_question(question), offset, getattr(question, 'state', None)
+
+
+def decode_error(status_code: int, e: ValueError) -> error.OtvetError:
+    """Error to raise when a response body is not valid json."""
+    if status_code >= 400:
+        return error.OtvetHTTPError(status_code)
+    return error.OtvetDecodeError(str(e))
+
+
+_METADATA_MARKERS = {'CATEGORIES': 'var CATEGORIES = ', 'BRANDURLS': 'var BRANDURLS = ', 'ERRORS': 'var ERRORS = '}
+# a regular expression with a literal prefix is as fast as str.find, and checks the format of the value
+_AUTH_PATTERNS = {
+    'salt': re.compile(r'"salt" : "([a-zA-Z0-9]+)"'),
+    'id': re.compile(r'"id" : "([0-9]+)"'),
+    'is_adult': re.compile(r'"is_adult" : (true|false)\b'),
+}
+# the auth fields are in one object, the fields after salt are looked for this close to it first
+_AUTH_WINDOW = 2000
+
+
+def _scan_auth_fields(page: str) -> Dict[str, Any]:
+    found: Dict[str, Any] = {}
+    salt = _AUTH_PATTERNS['salt'].search(page)
+    if salt is None:
+        return found
+    found['salt'] = salt.group(1)
+    start, end = max(0, salt.start() - _AUTH_WINDOW), salt.end() + _AUTH_WINDOW
+    for name in ('id', 'is_adult'):
+        pattern = _AUTH_PATTERNS[name]
+        match = pattern.search(page, start, end) or pattern.search(page)
+        if match:
+            found[name] = match.group(1)
+    if 'is_adult' in found:
+        found['is_adult'] = found['is_adult'] == 'true'
+    return found
+
+
+def scan_main_page(page: str, with_metadata: bool = True) -> Dict[str, Any]:
+    """
+    Find the javascript variables and auth fields in the main page.
+    Each variable is located with str.find, which is much faster than a regular expression that matches its whole
+    value, and decoded in place, without copying the rest of the page.
+    The auth fields are matched by regular expressions that check the format of their values. Only salt is searched
+    for in the whole page, id and is_adult are searched for next to it first, so that without metadata the page
+    is mostly scanned once.
+    :param page: main page html
+    :param with_metadata: also find CATEGORIES, BRANDURLS and ERRORS, not only salt, id and is_adult
+    :return: decoded values by name, first valid occurrence of each one; salt and id are strings,
+    the auth fields are missing if salt is not found
+    """
+    found = _scan_auth_fields(page)
+    if not with_metadata:
+        return found
+    for name, marker in _METADATA_MARKERS.items():
+        pos = page.find(marker)
+        while pos >= 0:
+            try:
+                found[name] = utils.read_json_prefix(page, pos + len(marker))
+                break
+            except ValueError:
+                pos = page.find(marker, pos + 1)
+    return found
+
+
+def extract_categories_json(page: str) -> List[dict]:
+    return scan_main_page(page)['CATEGORIES']
+
+
+def extract_brands_json(page: str) -> List[str]:
+    return scan_main_page(page)['BRANDURLS']
+
+
+def extract_errors_json(page: str) -> Dict[str, str]:
+    return scan_main_page(page)['ERRORS']
+
+
+def extract_metadata(page: Union[str, Dict[str, Any]]) -> metadata_.Metadata:
+    """
+    :param page: main page html or the result of scan_main_page
+    """
+    values = scan_main_page(page) if isinstance(page, str) else page
+    return metadata_.Metadata(categories=values['CATEGORIES'], brands=values['BRANDURLS'], errors=values['ERRORS'],
+                              created=time.time())
+
+
+class Call(NamedTuple):
+    """Make an api request, the result is the decoded response."""
+    method: str
+    params: MethodArgs
+    direct: bool = False
+
+
+class LoadMetadata(NamedTuple):
+    """Load categories, brands and error messages, from the snapshot or the main page."""
+
+
+class LoadMainPage(NamedTuple):
+    """Load the main page, which updates the auth state."""
+
+
+class AuthState(NamedTuple):
+    """
+    Auth state of a client. The clients replace it as a whole, so that a reader that takes no lock
+    never sees the user of one token with the parameters of another one.
+    :ivar user_id: id of the authenticated user, or None
+    :ivar params: auth parameters of api requests
+    :ivar is_adult: whether the user is adult, None if unknown
+    """
+    user_id: Optional[int]
+    params: Dict[str, str]
+    is_adult: Optional[bool]
+
+
+NO_AUTH = AuthState(None, {}, None)
+
+
+class RenewToken(NamedTuple):
+    """Load a new token after a request failed with invalid_token, see _renew_token of the clients."""
+    expired_auth: Optional[AuthState]
+
+
+class Sleep(NamedTuple):
+    """Wait for some time."""
+    seconds: float
+
+
+class Batch(NamedTuple):
+    """Call a method of the client for every item concurrently, the result is map_concurrently of the client."""
+    func: Callable[[Any], Any]
+    items: Iterable[Any]
+    concurrency: int
+
+
+class Invoke(NamedTuple):
+    """Call a method that a subclass of the client overrides, the result is its return value."""
+    func: Callable[[], Any]
+
+
+class ReadPages(NamedTuple):
+    """Load pages by offset until a short one, the result is the list of non-empty pages."""
+    get_page: Callable[[int], Any]
+    step: int
+    prefetch: int = 0
+
+
+class Emit(NamedTuple):
+    """Return a value from an iteration."""
+    value: Any
+
+
+class EmitPages(NamedTuple):
+    """Return the pages of ReadPages from an iteration, one by one as they are loaded."""
+    get_page: Callable[[int], Any]
+    step: int
+    prefetch: int = 0
+
+
+class EmitStream(NamedTuple):
+    """Return the items of an array in a response from an iteration, decoded one by one while it is downloaded."""
+    method: str
+    params: MethodArgs
+    path: Sequence[str]
+    build: Callable[[Any], Any]
+
+
+def _wrap(func: Callable[..., Op], kind: str, is_async: bool) -> Callable:
+    """Method of a client that runs a marked method of BaseOtvetClient with _run or _iterate of the client."""
+    if kind == 'operation' and is_async:
+        async def method(self, *args, **kwargs):
+            return await self._run(func(self, *args, **kwargs))
+    elif kind == 'operation':
+        def method(self, *args, **kwargs):
+            return self._run(func(self, *args, **kwargs))
+    elif is_async:
+        async def method(self, *args, **kwargs):
+            async for value in self._iterate(func(self, *args, **kwargs)):
+                yield value
+    else:
+        def method(self, *args, **kwargs):
+            yield from self._iterate(func(self, *args, **kwargs))
+    return functools.wraps(func)(method)
+
+
+def operation(func: Callable[..., Op]) -> Callable[..., Op]:
+    """Mark a method of BaseOtvetClient that returns a value."""
+    func._client_method = 'operation'
+    return func
+
+
+def iteration(func: Callable[..., Op]) -> Callable[..., Op]:
+    """Mark a method of BaseOtvetClient that returns values with Emit, EmitPages or EmitStream."""
+    func._client_method = 'iteration'
+    return func
+
+
+class BaseOtvetClient:
+    """
+    State and api methods shared by OtvetClient and AsyncOtvetClient.
+    Subclasses implement the effects in _run and _iterate, see the module docstring.
+
+    :ivar user_id: id of the authenticated user, or None
+    :ivar cache: response cache, or None
+    """
+    _headers = {'Referer': 'https://otvet.mail.ru/'}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, func in vars(BaseOtvetClient).items():
+            kind = getattr(func, '_client_method', None)
+            # skip the methods already wrapped for a parent class or overridden
+            if kind is not None and getattr(cls, name) is func:
+                setattr(cls, name, _wrap(func, kind, inspect.iscoroutinefunction(cls._run)))
+
+    def __init__(self, transport: Any, *, auth_info: str, auto_renew_token: bool, api_retry_attempts: int,
+                 rate_limiter: Any, retry_policy: Optional[retry.RetryPolicy], cache: Optional[cache_.ResponseCache],
+                 metadata_snapshot: Optional[metadata_.MetadataSnapshot], compact_models: bool,
+                 user_identity_map: Optional[identity.UserIdentityMap],
+                 json_backend: Union[str, utils.JsonBackend, None], lazy_questions: bool, single_flight: Any):
+        self._transport = transport
+        self._auth = NO_AUTH
+        self._categories: Optional[categories.Categories] = None
+        self._auto_renew_token: bool = auto_renew_token
+        self._retry_policy = retry_policy or retry.RetryPolicy(attempts=api_retry_attempts + 1)
+        self._rate_limiter = rate_limiter
+        self.cache = cache
+        self._metadata_snapshot = metadata_snapshot
+        self._factories = compact.factories if compact_models else factories
+        if lazy_questions:
+            self._factories = lazy.bind(self._factories)
+        self._single_flight = single_flight
+        self._user_identity_map = user_identity_map
+        if not isinstance(json_backend, utils.JsonBackend):
+            json_backend = utils.get_json_backend(json_backend)
+        self._json = json_backend
+        self._brand_list: List[str] = None
+        self._localized_errors: Dict[str, str] = None
+        if auth_info:
+            self._load_auth_info(auth_info)
+
+    def _run(self, op: Op[T]) -> T:
+        """Perform the effects of an operation, :return: its result"""
+        raise NotImplementedError
+
+    def _iterate(self, op: Op[Any]) -> Any:
+        """Perform the effects of an iteration, :return: iterator over the values it emits"""
+        raise NotImplementedError
+
+    def _call_operation(self, func: Callable[..., Op[T]], *args, **kwargs) -> Op[T]:
+        """
+        Run an operation of BaseOtvetClient from another one.
+        If a subclass of the client overrides it, the override is called with Invoke, like the old clients did.
+        """
+        method = getattr(type(self), func.__name__)
+        if getattr(method, '__wrapped__', None) is func:
+            return (yield from func(self, *args, **kwargs))
+        return (yield Invoke(functools.partial(getattr(self, func.__name__), *args, **kwargs)))
+
+    def _apply_main_page(self, page: str, token: Optional[str]) -> None:
+        """
+        Update the auth state, and the metadata if some of it is missing, from the main page.
+        :param page: main page html, loaded with the cookies of the client
+        :param token: 'ot' cookie after loading the page, None if the client is not authenticated
+        :raises OtvetAuthError: if the client is authenticated, but the page has no valid auth fields
+        """
+        need_metadata = not self._categories or not self._brand_list or not self._localized_errors
+        values = scan_main_page(page, need_metadata)
+        if need_metadata:
+            metadata = extract_metadata(values)
+            self._set_metadata(metadata)
+            if self._metadata_snapshot is not None:
+                self._metadata_snapshot.try_save(metadata)
+        if token is not None:
+            if not _AUTH_PATTERNS.keys() <= values.keys():
+                raise error.OtvetAuthError()
+            self._auth = AuthState(int(values['id']), {'token': token, 'salt': values['salt']}, values['is_adult'])
+        else:
+            self._auth = NO_AUTH
+
+    def _set_metadata(self, metadata: metadata_.Metadata) -> None:
+        if not self._categories:
+            self._categories = categories.Categories(metadata.categories)
+        if not self._brand_list:
+            self._brand_list = metadata.brands
+        if not self._localized_errors:
+            self._localized_errors = metadata.errors
+
+    def _has_metadata(self) -> bool:
+        return bool(self._categories and self._brand_list and self._localized_errors)
+
+    def _load_snapshot(self) -> Optional[metadata_.Metadata]:
+        """
+        Set the metadata from the snapshot.
+        :return: metadata of the snapshot, None if there is no snapshot
+        """
+        if self._metadata_snapshot is None:
+            return None
+        metadata = self._metadata_snapshot.load()
+        if metadata is not None:
+            self._set_metadata(metadata)
+        return metadata
+
+    def _load_auth_info(self, auth_info) -> None:
+        data = json.loads(auth_info)
+        self._auth = AuthState(data['user_id'], data['dict'], None)
+        self._transport.set_cookie('Mpop', data['cookie'], '.mail.ru')
+
+    @property
+    def user_id(self) -> Optional[int]:
+        """Id of the authenticated user, or None."""
+        return self._auth.user_id
+
+    @property
+    def auth_info(self) -> str:
+        """Auth info string that can be saved and reused later."""
+        auth = self._auth
+        return json.dumps({
+            'dict': auth.params,
+            'user_id': auth.user_id,
+            'cookie': self._transport.get_cookie('Mpop'),
+        })
+
+    def _api_request(self, method: str, params: MethodArgs, direct: bool) -> Tuple[str, MethodArgs]:
+        """
+        Url and parameters of an api request, with the auth parameters.
+        :param direct: method is the url itself, the request is a GET
+        """
+        real_params = {**params, **self._auth.params}
+        if direct:
+            return method, real_params
+        real_params['__urlp'] = method
+        return API_URL, real_params
+
+    def _decode_response(self, status_code: int, content: bytes) -> dict:
+        if status_code >= 500 or status_code == 429:
+            raise error.OtvetHTTPError(status_code)
+        try:
+            return self._json.loads(content)
+        except ValueError as e:
+            raise decode_error(status_code, e) from e
+
+    def _get_localized_message(self, error_code) -> Op[Optional[str]]:
+        if not self._localized_errors:
+            yield LoadMetadata()
+        return self._localized_errors.get(str(error_code))
+
+    def _check_response(self, response: dict, allow_retry: bool, auth: AuthState = None) -> Op[bool]:
+        """
+        Raise an error for an error response, or renew the token if it has expired.
+        :param response: decoded response
+        :param allow_retry: whether the request can be repeated after renewing the token
+        :param auth: auth state the request was made with
+        :return: whether the token was renewed and the request should be repeated
+        """
+        if int(response.get('status', 200)) < 400:
+            return False
+        if allow_retry and response.get('error') == 'invalid_token' and self._auto_renew_token:
+            yield RenewToken(auth)
+            return True
+        message = yield from self._get_localized_message(response.get('errid'))
+        raise error.OtvetAPIError(response, message)
+
+    def _cached_response(self, method: str, params: MethodArgs) -> Tuple[bool, Optional[dict]]:
+        """
+        :return: whether the responses of the method are cached, and the cached response if there is one
+        """
+        cached = self.cache is not None and self.cache.is_cached(method)
+        if cached:
+            return True, self.cache.get(method, params, self.user_id)
+        return False, None
+
+    def _store_response(self, method: str, params: MethodArgs, cached: bool, result: dict) -> None:
+        if cached:
+            self.cache.put(method, params, self.user_id, result)
+        elif self.cache is not None and method in WRITE_METHODS:
+            self.cache.invalidate_after_write(method, params, self.user_id)
+
+    def _coalesced(self, method: str) -> bool:
+        """Whether identical concurrent requests of a method share one network request."""
+        return self._single_flight is not None and method not in WRITE_METHODS
+
+    def _user_cache(self, output: str = None) -> Union[Dict[int, models.User], identity.UserMapView]:
+        if self._user_identity_map is not None and (output is None or output == 'models'):
+            return self._user_identity_map.view()
+        return {}
+
+    def _output(self, output: Optional[str]) -> types.SimpleNamespace:
+        """Factories for an output mode of the page methods."""
+        if output is None or output == 'models':
+            return self._factories
+        if output == 'records':
+            return records.factories
+        if output == 'raw':
+            return records.raw_factories
+        if output in columnar.COLUMNAR_OUTPUTS:
+            columnar.require(output)
+            return records.factories
+        raise error.OtvetArgumentError(f'Unknown output mode: {output}')
+
+    def _get_categories(self) -> Op[categories.Categories]:
+        if not self._categories:
+            yield LoadMetadata()
+        return self._categories
+
+    def _output_categories(self, output: Optional[str]) -> Op[categories.Categories]:
+        if output is None or output == 'models':
+            return (yield from self._get_categories())
+        return records.categories
+
+    def _normalize_user(self, user: UserInput) -> int:
+        if isinstance(user, _USER):
+            return user.id
+        if user is not None:
+            return user
+        if self.user_id is not None:
+            return self.user_id
+        raise error.OtvetArgumentError('Either authenicate the client or provide a user')
+
+    def _ensure_authenticated(self) -> None:
+        if self.user_id is None:
+            raise error.OtvetArgumentError('Authentication is required to call this method')
+
+    def _normalize_category(self, category: CategoryInput) -> Op[Optional[str]]:
+        if not category:
+            return None
+        if isinstance(category, str):
+            all_categories = yield from self._get_categories()
+            c = all_categories.by_urlname(category) or all_categories.by_name(category)
+            if not c:
+                raise error.OtvetArgumentError(f'No such category: {category}')
+            return c.urlname
+        return category.urlname
+
+    @operation
+    def check_authentication(self) -> bool:
+        """
+        Ensure that the authentication data is valid.
+        If not, resets it and sets user_id to None.
+        May update auth_info.
+        :return: true if auth data is valid, false otherwise
+        """
+        if self.user_id is None:
+            return False
+        yield LoadMainPage()
+        return self.user_id is not None
+
+    @operation
+    def get_is_adult(self) -> Optional[bool]:
+        """Is the authenticated user adult. Some categories may be unavailable for non-adult users.
+        Use set_is_adult_flag method to set it to true."""
+        if self._auth.is_adult is None and self.user_id:
+            yield LoadMainPage()
+        return self._auth.is_adult
+
+    @operation
+    def get_categories(self) -> categories.Categories:
+        """Container with all categories, can be queried or iterated."""
+        return (yield from self._get_categories())
+
+    @operation
+    def get_brand_list(self) -> List[str]:
+        """All brand urlnames."""
+        if not self._brand_list:
+            yield LoadMetadata()
+        return self._brand_list
+
+    @operation
+    def get_questions_page(self, state: StateInput = 'A', category: CategoryInput = None,
+                           step: Optional[int] = 20, offset: int = None, lastid: int = None,
+                           category_exclude: str = '', only_leaders: bool = False,
+                           *, output: str = None) -> List[models.QuestionPreview]:
+        """
+        A page of questions.
+        :param state: state of the questions (open, voting, resolved), open by default
+        :param category: category of the questions (all by default)
+        :param step: number of questions
+        :param offset: offset of the first question
+        :param lastid: the question that should be considered first (for stable pagination)
+        :param only_leaders: return only leader questions
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: list of questions
+        """
+        output_factories = self._output(output)
+        state = normalize_state(state)
+        category = yield from self._normalize_category(category)
+        params: MethodArgs = {'state': state.value} if state is not None else {}
+        if category_exclude or (state is models.QuestionState.open and category is None and not only_leaders):
+            params['category_exclude'] = category_exclude
+        utils.update_not_none(params, {'cat': category, 'p': offset, 'lastid': lastid, 'n': step})
+        data = yield Call('/v2/leadqst' if only_leaders else '/v2/questlist', params)
+        all_categories = yield from self._output_categories(output)
+        items = [output_factories.build_question_preview(q, all_categories) for q in data['qst']]
+        return columnar.convert(items, output)
+
+    @operation
+    def get_best_questions_page(self, category: CategoryInput = None, step: int = 20,
+                                offset: int = None, lastid: int = None,
+                                *, output: str = None) -> List[models.BestQuestionPreview]:
+        """
+        A page of best questions.
+        :param category: category of the questions (all by default)
+        :param step: number of questions
+        :param offset: offset of the first question
+        :param lastid: the question that should be considered first (for stable pagination)
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: list of best questions
+        """
+        output_factories = self._output(output)
+        category = yield from self._normalize_category(category)
+        params = {'state': 'B', 'n': step}
+        utils.update_not_none(params, {'cat': category, 'p': offset, 'lastid': lastid})
+        data = yield Call('/v2/qstrating', params)
+        all_categories = yield from self._output_categories(output)
+        items = [output_factories.build_best_question_preview(q, all_categories) for q in data['qst']]
+        return columnar.convert(items, output)
+
+    @operation
+    def get_user_questions_page(self, user: UserInput = None, state: StateInput = None,
+                                only_hidden: bool = False, step: int = 20,
+                                offset: int = 0, *, output: str = None) -> List[models.UserQuestionPreview]:
+        """
+        Questions of a user.
+        :param user: user (myself by default)
+        :param state: state of the questions (open, voting, resolved; all by default)
+        :param only_hidden: show only hidden questions
+        :param step: number of questions
+        :param offset: offset of the first question
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: list of questions
+        """
+        output_factories = self._output(output)
+        state = normalize_state(state)
+        user = self._normalize_user(user)
+        params: MethodArgs = {'n': step, 'p': offset, 'user': user}
+        if only_hidden:
+            params['hidden'] = 1
+        if state is not None:
+            params['state'] = str(state.value)
+        data = yield Call('/v2/quserlist', params)
+        all_categories = yield from self._output_categories(output)
+        items = [output_factories.build_user_question_preview(q, all_categories) for q in data['qst']]
+        return columnar.convert(items, output)
+
+    @operation
+    def get_brand_questions_page(self, brand: BrandInput, state: StateInput = None,
+                                 step: int = 20, offset: int = 0,
+                                 *, output: str = None) -> List[models.UserQuestionPreview]:
+        """
+        Questions of a brand.
+        :param brand: brand
+        :param state: state of the questions (open, voting, resolved; all by default)
+        :param step: number of questions
+        :param offset: offset of the first question
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: list of questions
+        """
+        output_factories = self._output(output)
+        state = normalize_state(state)
+        brand = normalize_brand(brand)
+        params = {'n': step, 'p': offset, 'user': brand, 'urlname': brand}
+        if state is not None:
+            params['state'] = str(state.value)
+        data = yield Call('/v2/bquserlist', params)
+        all_categories = yield from self._output_categories(output)
+        items = [output_factories.build_user_question_preview(q, all_categories) for q in data['qst']]
+        return columnar.convert(items, output)
+
+    @operation
+    def get_votes_page(self, option: OptionInput, step: int = 20, offset: int = 0,
+                       *, output: str = None) -> List[models.PollUserPreview]:
+        """
+        Votes for a poll option.
+        :param option: poll option
+        :param step: number of votes
+        :param offset: offset of the first vote
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: list of votes
+        """
+        output_factories = self._output(output)
+        option = normalize_option(option)
+        data = yield Call('/v2/whovoted', {'optid': option, 'n': step, 'p': offset})
+        return columnar.convert([output_factories.build_poll_user_preview(u) for u in data['users']], output)
+
+    @operation
+    def get_more_answers_page(self, question: QuestionInput, step: int = 20, offset: int = 0, sort: int = 1,
+                              *, output: str = None) -> List[models.Answer]:
+        """
+        Question answers.
+        :param question: the question
+        :param step: number of answers
+        :param offset: offset of the first answer
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: list of answers
+        """
+        output_factories = self._output(output)
+        question = normalize_question(question)
+        params = {'qid': question, 'n': step, 'p': offset, 'sort': sort}
+        user_cache = self._user_cache(output)
+        data = yield Call('/v2/moreanswers', params)
+        return columnar.convert([output_factories.build_answer(a, user_cache) for a in data['answers']], output)
+
+    @iteration
+    def stream_answers(self, question: QuestionInput, *, answer_count: int = 1000, offset: int = 0,
+                       sort: int = 1) -> Iterator[models.Answer]:
+        """
+        Question answers, decoded one by one while the response is downloaded.
+        Uses little memory even for a large answer_count.
+        :param question: the question
+        :param answer_count: number of answers
+        :param offset: offset of the first answer
+        :return: iterator over answers
+        """
+        question = normalize_question(question)
+        params = {'qid': question, 'n': answer_count, 'p': offset, 'sort': sort}
+        user_cache = self._user_cache()
+        yield EmitStream('/v2/moreanswers', params, ('answers',),
+                         lambda data: self._factories.build_answer(data, user_cache))
+
+    @operation
+    def get_user_answers_page(self, user: UserInput = None, only_best: bool = False, step: int = 20,
+                              offset: int = 0, *, output: str = None) -> List[models.AnswerPreview]:
+        """
+        Answers of a user
+        :param user: user (myself by default)
+        :param only_best: show only best answers of a user
+        :param step: number of answers
+        :param offset: offset of the first answer
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: list of answers
+        """
+        output_factories = self._output(output)
+        user = self._normalize_user(user)
+        params = {'n': step, 'p': offset, 'usrid': user}
+        if only_best:
+            params['best'] = 1
+        data = yield Call('/v2/auserlist', params)
+        all_categories = yield from self._output_categories(output)
+        items = [output_factories.build_answer_preview(a, all_categories) for a in data['answers']]
+        return columnar.convert(items, output)
+
+    @operation
+    def get_brand_answers_page(self, brand: BrandInput, only_best: bool = False,
+                               step: int = 20, offset: int = 0, *, output: str = None) -> List[models.AnswerPreview]:
+        """
+        Answers of brand experts.
+        :param brand: brand
+        :param only_best: show only best answers
+        :param step: number of answers
+        :param offset: offset of the fist answer
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: list of answers
+        """
+        output_factories = self._output(output)
+        brand = normalize_brand(brand)
+        params = {'n': step, 'p': offset, 'usrid': brand, 'urlname': brand}
+        if only_best:
+            params['best'] = 1
+        data = yield Call('/v2/abrandans', params)
+        all_categories = yield from self._output_categories(output)
+        items = [output_factories.build_answer_preview(a, all_categories) for a in data['answers']]
+        return columnar.convert(items, output)
+
+    @operation
+    def get_watching_questions_page(self, user: UserInput = None, step: int = 20,
+                                    offset: int = 0, *, output: str = None) -> List[models.MinimalQuestionPreview]:
+        """
+        Questions watched by a user.
+        :param user: user (myself by default)
+        :param step: number of questions
+        :param offset: offset of the first question
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: list of watched questions
+        """
+        output_factories = self._output(output)
+        user = self._normalize_user(user)
+        params = {'n': step, 'p': offset, 'id': user}
+        data = yield Call('/v2/watchlist', params)
+        all_categories = yield from self._output_categories(output)
+        items = [output_factories.build_minimal_question_preview(q, all_categories) for q in (data['questions'] or [])]
+        return columnar.convert(items, output)
+
+    @operation
+    def get_likes_page(self, id: int, is_answer: bool, step: int = 20, offset: int = 0, *,
+                       output: str = None) -> List[models.SmallUserPreview]:
+        """
+        Users who liked a question  or an answer.
+        :param id: object id
+        :param is_answer: if the object is an answer
+        :param step: number of likes
+        :param offset: offset of the first like
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: list of users who liked this
+        """
+        output_factories = self._output(output)
+        params = {'n': step, 'p': offset, 'aid' if is_answer else 'qid': id}
+        data = yield Call('/v2/marked', params)
+        return columnar.convert([output_factories.build_small_user_preview(u) for u in data['marked']], output)
+
+    @operation
+    def get_user_rating_page(self, rating_type: Union[str, models.RatingType] = "points", category: CategoryInput = None,
+                             all_time: bool = False,
+                             step: int = 20, offset: int = 0, *, output: str = None) -> List[models.User]:
+        """
+        User rating.
+        :param rating_type: type of the rating
+        :param category: category (all by default)
+        :param all_time: show rating for all time
+        :param step: number of users
+        :param offset: offsetof the first user
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: list of users
+        """
+        output_factories = self._output(output)
+        params = {'n': step, 'p': offset, 'cat': '', 'type': 'points'}
+        category = (yield from self._normalize_category(category)) or ''
+        rating_type = models.RatingType(rating_type)
+        if all_time:
+            params['all'] = 1
+        else:
+            params['type'] = rating_type.value
+            if rating_type is models.RatingType.points:
+                params['cat'] = category
+        data = yield Call('/v2/usrrating', params)
+        if all_time:
+            user_cache = self._user_cache(output)
+            return columnar.convert([output_factories.build_user(u, user_cache) for u in data['rating']], output)
+        return columnar.convert([output_factories.build_user_in_rating(u, rating_type) for u in data['rating']], output)
+
+    @operation
+    def get_search_page(self, query: str, sort_by_date: bool = False, step: int = 20, offset: int = 0, *,
+                        state: StateInput = None, category: CategoryInput = None, last_days: float = None,
+                        questions_only: bool = False, output: str = None) -> List[models.QuestionSearchResult]:
+        """
+        Search questions.
+        :param query: query string
+        :param sort_by_date: sort by date, not by relevance
+        :param step: number of results
+        :param offset: offset of the first result
+        :param state: search only questions with this state
+        :param category: search in this category
+        :param last_days: search only questions not older than this number of days
+        :param questions_only: search only in question text
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: list of questions
+        """
+        output_factories = self._output(output)
+        params = {'num': step, 'sf': offset, 'q': query}
+        if sort_by_date:
+            params['sort'] = 'date'
+        if state is not None:
+            params['zvstate'] = {'A': 3, 'V': 2, 'R': 1}[normalize_state(state).value]
+        if category is not None:
+            params['zVCat'] = (yield from self._normalize_category_object(category)).id
+        if last_days is not None:
+            params['zdts'] = -int(last_days * 86400)
+        if questions_only:
+            params['question_only'] = 1
+        data = yield Call('https://otvet.mail.ru/go-proxy/answer_json', params, direct=True)
+        all_categories = yield from self._output_categories(output)
+        items = [output_factories.build_question_search_result(q, all_categories) for q in data['results']]
+        return columnar.convert(items, output)
+
+    @operation
+    def get_followers_page(self, user: UserInput = None, reverse: bool = False, step: int = 20, offset: int = 0,
+                           *, output: str = None) -> List[models.SmallUserPreview]:
+        """
+        User followers
+        :param user: user (myself by default)
+        :param reverse: show those whom the user follows, not his followers
+        :param step: number of users
+        :param offset: offset of the first user
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: list of followers
+        """
+        output_factories = self._output(output)
+        user = self._normalize_user(user)
+        params = {'id': user, 'n': step, 'p': offset}
+        if reverse:
+            params['reverse'] = 1
+        data = yield Call('/v2/who_follow', params)
+        build = output_factories.build_small_user_preview if reverse else output_factories.build_follower_preview
+        return columnar.convert([build(u) for u in data['followers']], output)
+
+    @operation
+    def get_brand_followers_page(self, brand: BrandInput, reverse: bool = False, step: int = 20, offset: int = 0,
+                                 *, output: str = None) -> List[models.SmallUserPreview]:
+        """
+        Brand followers.
+        :param brand: brand
+        :param step: number of users
+        :param offset: offset of the first user
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: list of followers
+        """
+        output_factories = self._output(output)
+        brand = normalize_brand(brand)
+        params = {'n': step, 'p': offset, 'id': brand, 'urlname': brand}
+        if reverse:
+            params['reverse'] = 1
+        data = yield Call('/v2/brand_who_follow', params)
+        build = output_factories.build_small_user_preview if reverse else output_factories.build_follower_preview
+        return columnar.convert([build(u) for u in data['followers']], output)
+
+    @operation
+    def get_blacklist_page(self, step: int = 20, offset: int = 0,
+                           *, output: str = None) -> List[models.SmallUserPreview]:
+        """
+        Blacklisted users.
+        :param step: number of users
+        :param offset: offset of the first user
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: list of blacklisted users
+        """
+        output_factories = self._output(output)
+        self._ensure_authenticated()
+        params = {'bid': self.user_id, 'n': step, 'p': offset}
+        data = yield Call('/v2/listblist', params)
+        return columnar.convert([output_factories.build_small_user_preview(u) for u in data['list']], output)
+
+
+    @operation
+    def get_promoted_leader_questions(self, category: CategoryInput = None) -> List[models.QuestionPreview]:
+        """
+        Leader questions displayed on the left.
+        :param category: category (all by default)
+        :return: list of questions
+        """
+        category = (yield from self._normalize_category(category)) or ''
+        return (yield from self._call_operation(BaseOtvetClient.get_questions_page, None, category, only_leaders=True,
+                                                step=None))
+
+    @operation
+    def get_comments(self, reference: Union[int, models.BaseQuestion, models.BaseAnswer],
+                     reference_type: Union[str, models.CommentType] = None) -> List[models.Comment]:
+        """
+        Comments to an answer or a poll.
+        :param reference: answer or poll
+        :param reference_type: type of an object (Q or A), required when the reference is an id
+        :return:
+        """
+        reference, reference_type = normalize_comment_reference(reference, reference_type)
+        data = yield Call('/v2/all_comments', {'refid': reference, 'type': reference_type.value})
+        user_cache = self._user_cache()
+        return [self._factories.build_comment(c, user_cache) for c in data['comments']['comments']]
+
+    @iteration
+    def stream_comments(self, reference: Union[int, models.BaseQuestion, models.BaseAnswer],
+                        reference_type: Union[str, models.CommentType] = None) -> Iterator[models.Comment]:
+        """
+        Comments to an answer or a poll, decoded one by one while the response is downloaded.
+        Every top-level comment is yielded together with its replies.
+        :param reference: answer or poll
+        :param reference_type: type of an object (Q or A), required when the reference is an id
+        :return: iterator over comments
+        """
+        reference, reference_type = normalize_comment_reference(reference, reference_type)
+        params = {'refid': reference, 'type': reference_type.value}
+        user_cache = self._user_cache()
+        yield EmitStream('/v2/all_comments', params, ('comments', 'comments'),
+                         lambda data: self._factories.build_comment(data, user_cache))
+
+    @operation
+    def get_limits(self) -> models.Limits:
+        """
+        Daily limits
+        :return: limits object
+        """
+        self._ensure_authenticated()
+        data = yield Call('/v2/showlimits', {})
+        return self._factories.build_limits(data)
+
+    @operation
+    def get_similar_questions(self, query: str) -> List[models.SimilarQuestionSearchResult]:
+        """
+        Similar questions.
+        :param query: question text
+        :return: list of similar questions
+        """
+        params = {'keyword': query}
+        data = yield Call('/search/search', params)
+        all_categories = yield from self._get_categories()
+        return [self._factories.build_similar_question_search_result(q, all_categories) for q in data['search']]
+
+    @operation
+    def get_search_suggestions(self, query: str) -> List[str]:
+        """
+        Question search suggestions.
+        :param query: query prefix
+        :return: list of suggestions
+        """
+        params = {'q': query}
+        data = yield Call('https://suggests.go.mail.ru/sg_otvet_u', params, direct=True)
+        return [r['text'] for r in data['items']]
+
+    @operation
+    def get_settings(self) -> models.Settings:
+        """
+        Current user settings
+        :return: settings object
+        """
+        self._ensure_authenticated()
+        data = yield Call('/v2/showsettings', {})
+        return self._factories.build_settings(data)
+
+    @operation
+    def get_brand_experts(self, brand: BrandInput) -> List[models.BrandUser]:
+        """
+        Experts of the brand.
+        :return: list of experts.
+        """
+        brand = normalize_brand(brand)
+        data = yield Call('/v2/expert_list', {'urlname': brand})
+        user_cache = self._user_cache()
+        return [self._factories.build_user(u, user_cache) for u in data['list']]
+
+
+    @iteration
+    def iterate_questions(self, state: StateInput = 'A', category: CategoryInput = None, *,
+                          category_exclude: str = '', step: int = 20, only_leaders: bool = False,
+                          output: str = None) -> Iterator[List[models.QuestionPreview]]:
+        """
+        Lists of questions, from new to old.
+        :param state: state of the questions (open, voting, resolved), open by default
+        :param category: category of the questions (all by default)
+        :param step: size of one list
+        :param only_leaders: return only leader questions
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of questions
+        """
+        row_output = columnar.row_output(output)
+        data = yield from self._call_operation(BaseOtvetClient.get_questions_page, state, category, step,
+                                               category_exclude=category_exclude, only_leaders=only_leaders,
+                                               output=row_output)
+        lastid = records.item_id(data[0])
+        for p in itertools.count(step, step):
+            yield Emit(columnar.convert(data, output))
+            data = yield from self._call_operation(BaseOtvetClient.get_questions_page, state, category, step, p, lastid,
+                                                   category_exclude=category_exclude, only_leaders=only_leaders,
+                                                   output=row_output)
+            if not data:
+                return
+
+    @iteration
+    def iterate_best_questions(self, category: CategoryInput = None, *, step: int = 20,
+                               output: str = None) -> Iterator[List[models.BestQuestionPreview]]:
+        """
+        Lists of best questions, from new to old.
+        :param category: category of the questions (all by default)
+        :param step: size of one list
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of questions
+        """
+        row_output = columnar.row_output(output)
+        data = yield from self._call_operation(BaseOtvetClient.get_best_questions_page, category, step,
+                                               output=row_output)
+        lastid = records.item_id(data[0])
+        for p in itertools.count(step, step):
+            yield Emit(columnar.convert(data, output))
+            data = yield from self._call_operation(BaseOtvetClient.get_best_questions_page, category, step, p, lastid,
+                                                   output=row_output)
+            if not data:
+                return
+
+    @iteration
+    def iterate_new_questions(self, state: StateInput = 'A', category: CategoryInput = None, *,
+                              category_exclude: str = '', step: int = 20,
+                              delay: float = 10, include_first_batch: bool = True, max_backfill_pages: int = 10,
+                              adaptive_polling: polling.AdaptivePolling = None,
+                              output: str = None) -> Iterator[List[models.QuestionPreview]]:
+        """
+        Lists of new questions, as they appear.
+        If all questions on the first page of a check are new, the next pages are loaded until a question seen before,
+        so questions are skipped only if more than max_backfill_pages pages of them appear between checks.
+        :param state: state of the questions (open, voting, resolved), open by default
+        :param category: category of the questions (all by default)
+        :param step: maximal size of one list
+        :param delay: interval between checks in seconds, ignored with adaptive_polling
+        :param include_first_batch: return the last batch of questions that existed before the call (yes by defaullt)
+        :param max_backfill_pages: maximal number of extra pages to load in one check
+        :param adaptive_polling: adapt the interval between checks to the rate of new questions
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of questions
+        """
+        row_output = columnar.row_output(output)
+        last_call = time.time()
+        data = yield from self._call_operation(BaseOtvetClient.get_questions_page, state, category, step,
+                                               category_exclude=category_exclude, output=row_output)
+        tracker = polling.NewItemTracker(records.item_id(data[0]) if data else 0, max_backfill_pages, step)
+        if include_first_batch and data:
+            yield Emit(columnar.convert(data, output))
+        rate = None
+        while True:
+            if adaptive_polling is not None:
+                delay = adaptive_polling.next_delay(rate, step)
+            yield Sleep(max(0., last_call + delay - time.time()))
+            elapsed = time.time() - last_call
+            last_call = time.time()
+            data = yield from self._call_operation(BaseOtvetClient.get_questions_page, state, category, step,
+                                                   category_exclude=category_exclude, output=row_output)
+            while True:
+                batch = tracker.feed(data)
+                if batch:
+                    yield Emit(columnar.convert(batch, output))
+                if tracker.offset is None:
+                    break
+                data = yield from self._call_operation(BaseOtvetClient.get_questions_page, state, category, step,
+                                                       tracker.offset, tracker.anchor,
+                                                       category_exclude=category_exclude, output=row_output)
+            if adaptive_polling is not None:
+                rate = adaptive_polling.update_rate(rate, tracker.new_count, elapsed)
+
+    @iteration
+    def iterate_user_questions(self, user: UserInput = None, state: StateInput = None, *,
+                               only_hidden: bool = False, step: int = 20, prefetch: int = 0,
+                               output: str = None) -> Iterator[List[models.UserQuestionPreview]]:
+        """
+        Lists of questions asked by a user.
+        :param user: user (myself by default)
+        :param state: state of the questions (open, voting, resolved), all by default
+        :param only_hidden: show only hidden questions
+        :param step: size of one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of questions
+        """
+        yield EmitPages(lambda p: self.get_user_questions_page(user, state, only_hidden, step, p, output=output),
+                        step, prefetch)
+
+    @iteration
+    def iterate_brand_questions(self, brand: BrandInput, state: StateInput = None, *,
+                                step: int = 20, prefetch: int = 0,
+                                output: str = None) -> Iterator[List[models.UserQuestionPreview]]:
+        """
+        Lists of questions asked by brand experts.
+        :param brand: brand
+        :param state: state of the questions (open, voting, resolved), all by default
+        :param step: size of one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of quesions
+        """
+        yield EmitPages(lambda p: self.get_brand_questions_page(brand, state, step, p, output=output),
+                        step, prefetch)
+
+    @iteration
+    def iterate_answers(self, question: QuestionInput, *, step: int = 20,
+                        infinite: bool = False, delay: float = 10, output: str = None) -> Iterator[List[models.Answer]]:
+        """
+        Lists of answers to a question.
+        :param question: question. If the question object contains some answers by itself they are returned first
+        (with the models output)
+        :param step: size of one list (except maybe the first one)
+        :param infinite: yield new answers as they appear
+        :param delay: interval between checks in seconds
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of answers
+        """
+        if getattr(question, 'answer_count', None) == 0 and not infinite:
+            return
+        if output is None or output == 'models':
+            if not isinstance(question, _FULL_QUESTION):
+                question = yield from self._call_operation(BaseOtvetClient.get_question, question, answer_count=step)
+            if question.answers:
+                yield Emit(question.answers)
+            question_id, offset, answer_count = question.id, len(question.answers), question.answer_count
+        else:
+            # the answers of a question object are models, so all answers are loaded again
+            question_id, offset, answer_count = normalize_question(question), 0, None
+        if answer_count is None or offset < answer_count:
+            while True:
+                answers = yield from self._call_operation(BaseOtvetClient.get_more_answers_page, question_id, step,
+                                                          offset, output=output)
+                if answers:
+                    yield Emit(answers)
+                offset += len(answers)
+                if len(answers) < step:
+                    break
+        if not infinite:
+            return
+        last_call = time.time()
+        while True:
+            yield Sleep(max(0., last_call + delay - time.time()))
+            last_call = time.time()
+            answers = yield from self._call_operation(BaseOtvetClient.get_more_answers_page, question_id, step, offset,
+                                                      output=output)
+            if answers:
+                yield Emit(answers)
+            offset += len(answers)
+
+
+    @iteration
+    def follow_answers(self, questions: Iterable[QuestionInput] = (), *, step: int = 20,
+                       include_existing: bool = False, schedule: polling.AnswerSchedule = None,
+                       output: str = None) -> Iterator[Tuple[int, List[models.Answer]]]:
+        """
+        New answers to many questions, as they appear, in one stream.
+        Questions are checked one at a time, the ones that get answers more often are checked more often,
+        see polling.AnswerSchedule. Once in a while a check that finds no new answers also loads the state
+        of the question (see AnswerSchedule.needs_state), and a question is not followed anymore once it is resolved.
+        Questions that return an api error (like deleted ones) are not followed either, and a check that fails
+        with a transport error or a limit error is repeated with a growing delay. Stops when no questions are left.
+        :param questions: questions to follow
+        :param step: maximal number of answers to load in one request
+        :param include_existing: return the answers that existed before the call too
+        :param schedule: schedule to add the questions to, questions can be added to it and removed from it
+        while iterating (a new one by default)
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: pairs of a question id and a list of its new answers
+        """
+        row_output = columnar.row_output(output)
+        if schedule is None:
+            schedule = polling.AnswerSchedule()
+        for question in questions:
+            schedule.add(*follow_answers_cursor(question, include_existing))
+        while True:
+            next_check = schedule.next_check()
+            if next_check is None:
+                return
+            when, question_id = next_check
+            yield Sleep(max(0., when - time.monotonic()))
+            state = None
+            try:
+                answers = yield from self._call_operation(BaseOtvetClient.get_more_answers_page, question_id, step,
+                                                          schedule.offset(question_id), output=row_output)
+                if not answers and schedule.needs_state(question_id):
+                    state = yield from self._get_question_state(question_id)
+            except error.OtvetAPIError as e:
+                if e.is_limit_error:
+                    schedule.record_failure(question_id)
+                else:
+                    schedule.remove(question_id)
+                continue
+            except error.OtvetTransportError:
+                schedule.record_failure(question_id)
+                continue
+            if schedule.record(question_id, len(answers), step, state) and answers:
+                yield Emit((question_id, columnar.convert(answers, output)))
+
+    def _get_question_state(self, question: int) -> Op[models.QuestionState]:
+        data = yield Call('/v2/question', {'qid': question, 'n': 1, 'p': 0, 'sort': 1})
+        return models.QuestionState(data['state'])
+
+    @iteration
+    def iterate_votes(self, option: OptionInput, *, step: int = 20, prefetch: int = 0,
+                      output: str = None) -> Iterator[List[models.PollUserPreview]]:
+        """
+        Lists of votes for a poll option.
+        :param option: poll option
+        :param step: size of one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of votes
+        """
+        yield EmitPages(lambda p: self.get_votes_page(option, step, p, output=output), step, prefetch)
+
+    @iteration
+    def iterate_user_answers(self, user: UserInput = None, only_best: bool = False, *, step: int = 20,
+                             prefetch: int = 0, output: str = None) -> Iterator[List[models.AnswerPreview]]:
+        """
+        Lists of answers of a user.
+        :param user: user (myself by default)
+        :param only_best: return only best answers
+        :param step: size of one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of answers
+        """
+        yield EmitPages(lambda p: self.get_user_answers_page(user, only_best, step, p, output=output),
+                        step, prefetch)
+
+    @iteration
+    def iterate_brand_answers(self, brand: BrandInput, only_best: bool = False, *, step: int = 20, prefetch: int = 0,
+                              output: str = None) -> Iterator[List[models.AnswerPreview]]:
+        """
+        Lists of answers of a brand.
+        :param brand: brand
+        :param only_best: return only best answers
+        :param step: size of one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of answers
+        """
+        yield EmitPages(lambda p: self.get_brand_answers_page(brand, only_best, step, p, output=output),
+                        step, prefetch)
+
+    @iteration
+    def iterate_watching_questions(self, user: UserInput = None, *, step: int = 20, prefetch: int = 0,
+                                   output: str = None) -> Iterator[List[models.MinimalQuestionPreview]]:
+        """
+        Lists of questions watched by a user.
+        :param user: user (myself by default)
+        :param step: size of one lists
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of questions
+        """
+        yield EmitPages(lambda p: self.get_watching_questions_page(user, step, p, output=output),
+                        step, prefetch)
+
+    @operation
+    def sync_watchlist(self, snapshot: polling.WatchlistSnapshot, user: UserInput = None, *, step: int = 20,
+                       prefetch: int = 0, load_answers: bool = True,
+                       output: str = None) -> List[polling.WatchlistChange]:
+        """
+        Scan the watched questions and find the ones that changed since the previous sync.
+        New answers are loaded only for the questions whose answer count has grown.
+        :param snapshot: answer counts and states from the previous sync, updated by the call
+        :param user: user (myself by default)
+        :param step: number of questions or answers to load in one request
+        :param prefetch: number of next watchlist pages to load in parallel, 0 to load pages one by one
+        :param load_answers: load the new answers of the changed questions
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: changed questions, nothing after the first sync of an empty snapshot
+        """
+        row_output = columnar.row_output(output)
+        pages = yield ReadPages(lambda p: self.get_watching_questions_page(user, step, p, output=row_output),
+                                step, prefetch)
+        questions = [q for page in pages for q in page]
+        changes = snapshot.update(questions)
+        for change in changes:
+            offset = change.previous_answer_count
+            while load_answers and len(change.new_answers) < change.answers_to_load:
+                answers = yield from self._call_operation(BaseOtvetClient.get_more_answers_page, change.question_id,
+                                                          step, offset, output=row_output)
+                change.new_answers.extend(answers)
+                offset += len(answers)
+                if len(answers) < step:
+                    break
+            change.new_answers = columnar.convert(change.new_answers, output)
+        return changes
+
+    @iteration
+    def iterate_watchlist_changes(self, user: UserInput = None, *, step: int = 20, prefetch: int = 0,
+                                  delay: float = 60, load_answers: bool = True,
+                                  snapshot: polling.WatchlistSnapshot = None,
+                                  output: str = None) -> Iterator[List[polling.WatchlistChange]]:
+        """
+        Lists of changes of the watched questions, as they appear, see sync_watchlist.
+        :param user: user (myself by default)
+        :param step: number of questions or answers to load in one request
+        :param prefetch: number of next watchlist pages to load in parallel, 0 to load pages one by one
+        :param delay: interval between syncs in seconds
+        :param load_answers: load the new answers of the changed questions
+        :param snapshot: snapshot to continue from (a new one by default)
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of changes
+        """
+        if snapshot is None:
+            snapshot = polling.WatchlistSnapshot()
+        while True:
+            last_call = time.time()
+            changes = yield from self._call_operation(BaseOtvetClient.sync_watchlist, snapshot, user, step=step,
+                                                      prefetch=prefetch, load_answers=load_answers, output=output)
+            if changes:
+                yield Emit(changes)
+            yield Sleep(max(0., last_call + delay - time.time()))
+
+    @iteration
+    def iterate_question_likes(self, question: QuestionInput, *, step: int = 20, prefetch: int = 0,
+                               output: str = None) -> Iterator[List[models.SmallUserPreview]]:
+        """
+        Lists of users who liked a question.
+        :param question: question
+        :param step: size of one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of users
+        """
+        question = normalize_question(question)
+        yield EmitPages(lambda p: self.get_likes_page(question, False, step, p, output=output), step, prefetch)
+
+    @iteration
+    def iterate_answer_likes(self, answer: AnswerInput, *, step: int = 20, prefetch: int = 0,
+                             output: str = None) -> Iterator[List[models.SmallUserPreview]]:
+        """
+        Lists of users who liked an answer.
+        :param answer: answer
+        :param step: size of one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of user
+        """
+        answer = normalize_answer(answer)
+        yield EmitPages(lambda p: self.get_likes_page(answer, True, step, p, output=output), step, prefetch)
+
+    @iteration
+    def iterate_all_time_user_rating(self, *, step: int = 20, prefetch: int = 0,
+                                     output: str = None) -> Iterator[List[models.User]]:
+        """
+        Lists of users in the rating of all time.
+        :param step: size of one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of users
+        """
+        yield EmitPages(lambda p: self.get_user_rating_page(all_time=True, step=step, offset=p, output=output),
+                        step, prefetch)
+
+    @iteration
+    def iterate_user_rating_by_answers(self, *, step: int = 20, prefetch: int = 0,
+                                       output: str = None) -> Iterator[List[models.UserInRating]]:
+        """
+        Lists of users in the weekly rating by answers.
+        :param step: size of one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of users
+        """
+        yield EmitPages(
+            lambda p: self.get_user_rating_page(models.RatingType.answer_count, step=step, offset=p, output=output),
+            step, prefetch)
+
+    @iteration
+    def iterate_user_rating_by_best_answers(self, *, step: int = 20, prefetch: int = 0,
+                                            output: str = None) -> Iterator[List[models.UserInRating]]:
+        """
+        Lists of users in the weekly rating by best answers.
+        :param step: size of one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of users
+        """
+        yield EmitPages(
+            lambda p: self.get_user_rating_page(models.RatingType.best_answer_count, step=step, offset=p,
+                                                output=output),
+            step, prefetch)
+
+    @iteration
+    def iterate_user_rating_by_points(self, category: CategoryInput = None, *, step: int = 20, prefetch: int = 0,
+                                      output: str = None) -> Iterator[List[models.UserInRating]]:
+        """
+        Lists of users in the weekly rating by points.
+        :param category: category (all by default)
+        :param step: size of one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of users
+        """
+        yield EmitPages(lambda p: self.get_user_rating_page(category=category, step=step, offset=p, output=output),
+                        step, prefetch)
+
+    @iteration
+    def iterate_search(self, query: str, sort_by_date: bool = False, *, step: int = 20, prefetch: int = 0,
+                       state: StateInput = None, category: CategoryInput = None, last_days: float = None,
+                       questions_only: bool = False, output: str = None) -> Iterator[List[models.QuestionSearchResult]]:
+        """
+        Lists of questions returned by search.
+        :param query: query string
+        :param sort_by_date: whether to sort by date, not by relevance
+        :param step: size of one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param state: search only questions with this state
+        :param category: search in this category
+        :param last_days: search only questions not older than this number of days
+        :param questions_only: search only in question text
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of questions
+        """
+        yield EmitPages(lambda p: self.get_search_page(query, sort_by_date, step, p, state=state, category=category,
+                                                       last_days=last_days, questions_only=questions_only,
+                                                       output=output),
+                        step, prefetch)
+
+    @iteration
+    def iterate_following(self, user: UserInput = None, *, step: int = 20, prefetch: int = 0,
+                          output: str = None) -> Iterator[List[models.SmallUserPreview]]:
+        """
+        Iterate the users whom a given user follows.
+        :param user: user (myself by default)
+        :param step: size of one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of users
+        """
+        yield EmitPages(lambda p: self.get_followers_page(user, True, step, p, output=output), step, prefetch)
+
+    @iteration
+    def iterate_followers(self, user: UserInput = None, *, step: int = 20, prefetch: int = 0,
+                          output: str = None) -> Iterator[List[models.FollowerPreview]]:
+        """
+        Iterate the followers of a user.
+        :param user: user (myself by default)
+        :param step: size of one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of users
+        """
+        yield EmitPages(lambda p: self.get_followers_page(user, False, step, p, output=output), step, prefetch)
+
+    @iteration
+    def iterate_brand_following(self, brand: BrandInput, *, step: int = 20, prefetch: int = 0,
+                                output: str = None) -> Iterator[List[models.SmallUserPreview]]:
+        """
+        Iterate the users whom the given brand experts follow.
+        :param brand: brand
+        :param step: size of one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of users
+        """
+        yield EmitPages(lambda p: self.get_brand_followers_page(brand, True, step, p, output=output),
+                        step, prefetch)
+
+    @iteration
+    def iterate_brand_followers(self, brand: BrandInput, *, step: int = 20, prefetch: int = 0,
+                                output: str = None) -> Iterator[List[models.FollowerPreview]]:
+        """
+        Iterate the followers of a brand.
+        :param brand: brand
+        :param step: size of one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of users
+        """
+        yield EmitPages(lambda p: self.get_brand_followers_page(brand, False, step, p, output=output),
+                        step, prefetch)
+
+    @iteration
+    def iterate_blacklist(self, *, step: int = 20, prefetch: int = 0,
+                          output: str = None) -> Iterator[List[models.SmallUserPreview]]:
+        """
+        Iterate the blacklist.
+        :param step: sizeof one list
+        :param prefetch: number of next pages to load in parallel, 0 to load pages one by one
+        :param output: 'models' (default), 'records', 'raw', 'columns', 'numpy' or 'arrow', see otvetmailru.records
+        :return: lists of users
+        """
+        yield EmitPages(lambda p: self.get_blacklist_page(step, p, output=output), step, prefetch)
+
+
+    @operation
+    def get_question(self, question: QuestionInput, *, answer_count: int = 20) -> models.Question:
+        """
+        A full question object.
+        :param question: question
+        :param answer_count: how many answer to prefetch (use iterate_answers to get all of them)
+        :return: question object
+        """
+        question = normalize_question(question)
+        params = {'qid': question, 'n': answer_count, 'p': 0, 'sort': 1}
+        data = yield Call('/v2/question', params)
+        all_categories = yield from self._get_categories()
+        return self._factories.build_question(data, all_categories, self._user_cache())
+
+    @operation
+    def get_question_by_answer(self, answer: AnswerInput) -> models.IncompleteQuestion:
+        """
+        Question object by answer.
+        :param answer: answer
+        :return: question to which the answer was given
+        """
+        answer = normalize_answer(answer)
+        data = yield Call('/v2/showans', {'aid': answer})
+        all_categories = yield from self._get_categories()
+        question = self._factories.build_incomplete_question(data, all_categories, self._user_cache())
+        return question
+
+    @operation
+    def get_user(self, user: UserInput = None) -> models.UserProfile:
+        """
+        A full user profile object.
+        Returns MyUserProfile when possible.
+        :param user: user
+        :return: user profile object
+        """
+        user = self._normalize_user(user)
+        data = yield Call('/v2/stats_ex', {'user': user})
+        all_categories = yield from self._get_categories()
+        return self._factories.build_user_profile(data, user, all_categories)
+
+    @operation
+    def get_brand(self, brand: BrandInput) -> models.BrandProfile:
+        """
+        Brand profile.
+        :return: brand profile object
+        """
+        brand = normalize_brand(brand)
+        params = {'urlname': brand, 'sub': 1, 'stat': 1}
+        data = (yield Call('/v2/getBrands', params))['data']
+        return self._factories.build_brand_profile(data)
+
+    @operation
+    def get_questions(self, questions: Iterable[QuestionInput], *, concurrency: int = 8,
+                      answer_count: int = 20) -> List[Union[models.Question, error.OtvetError]]:
+        """
+        Full question objects for many questions, loaded in parallel.
+        :param questions: questions
+        :param concurrency: maximal number of simultaneous requests
+        :param answer_count: how many answer to prefetch for every question
+        :return: questions in the same order; if a question failed to load, the error is returned in its place
+        """
+        yield from self._get_categories()  # load the main page once before starting the requests
+        return (yield Batch(lambda q: self.get_question(q, answer_count=answer_count), questions, concurrency))
+
+    @operation
+    def get_questions_by_answers(self, answers: Iterable[AnswerInput], *, concurrency: int = 8
+                                 ) -> List[Union[models.IncompleteQuestion, error.OtvetError]]:
+        """
+        Question objects for many answers, loaded in parallel.
+        :param answers: answers
+        :param concurrency: maximal number of simultaneous requests
+        :return: questions in the same order; if a question failed to load, the error is returned in its place
+        """
+        yield from self._get_categories()
+        return (yield Batch(self.get_question_by_answer, answers, concurrency))
+
+    @operation
+    def get_users(self, users: Iterable[UserInput], *, concurrency: int = 8
+                  ) -> List[Union[models.UserProfile, error.OtvetError]]:
+        """
+        Full user profile objects for many users, loaded in parallel.
+        :param users: users
+        :param concurrency: maximal number of simultaneous requests
+        :return: profiles in the same order; if a profile failed to load, the error is returned in its place
+        """
+        yield from self._get_categories()
+        return (yield Batch(self.get_user, users, concurrency))
+
+
+    def _normalize_category_object(self, category: CategoryInput) -> Op[models.Category]:
+        if isinstance(category, models.Category):
+            return category
+        category = yield from self._normalize_category(category)
+        if not category:
+            raise error.OtvetArgumentError('A category is required')
+        all_categories = yield from self._get_categories()
+        return all_categories.by_urlname(category)
+
+    def _ensure_child_category(self, category: models.Category) -> None:
+        if category.children:
+            raise error.OtvetArgumentError('Asking questions is allowed only in categories without subcategories')
+
+    def _add_question(self, category: CategoryInput, params: dict) -> Op[int]:
+        self._ensure_authenticated()
+        category = yield from self._normalize_category_object(category)
+        self._ensure_child_category(category)
+        if category.parent:
+            params['cid'] = category.parent.id
+            params['subcid'] = category.id
+        else:
+            params['cid'] = category.id
+        data = yield Call('/v2/addqst', params)
+        return int(data['qid'])
+
+    @operation
+    def add_question(self, category: CategoryInput, title: str, text: str = "", *,
+                     allow_comments: bool = True, watch: bool = True) -> int:
+        """
+        Ask a question.
+        :param category: category
+        :param title: question title
+        :param text: question text
+        :param allow_comments: whether to allow comments to answers
+        :param watch: whether to get notifications about answers
+        :return: question id
+        """
+        params = {'Body': text, 'qtext': title, 'cancmt': int(bool(allow_comments)), 'watch': int(bool(watch))}
+        return (yield from self._add_question(category, params))
+
+    @operation
+    def add_poll(self, category: CategoryInput, title: str, poll_options: List[str],
+                 text: str = "", allow_multiple: bool = False, *,
+                 allow_comments: bool = True, watch: bool = True) -> int:
+        """
+        Create a poll.
+        :param category: category
+        :param title: poll title
+        :param poll_options: list of poll options
+        :param text: poll text
+        :param allow_multiple: whether to allow multiple votes
+        :param allow_comments: whether to allow comments
+        :param watch: whether to get notifications about votes
+        :return: question id
+        """
+        params = {'Body': text, 'qtext': title, 'cancmt': int(bool(allow_comments)), 'watch': int(bool(watch)),
+                  'poll': 'C' if allow_multiple else 'S', 'poll_options[]': poll_options}
+        return (yield from self._add_question(category, params))
+
+    @operation
+    def edit_question(self, question: QuestionInput, category: CategoryInput = None, title: str = None,
+                      text: str = None, poll_options: List[str] = None) -> models.Question:
+        """
+        Edit a question.
+        :param question: question to edit
+        :param category: new category
+        :param title: new title
+        :param text: new text
+        :param poll_options: new poll options
+        :return: edited question object
+        """
+        self._ensure_authenticated()
+        if not isinstance(question, _FULL_QUESTION):
+            question = yield from self._call_operation(BaseOtvetClient.get_question, question)
+        if not question.edit_token:
+            raise error.OtvetArgumentError('Cannot edit this question')
+        current_poll_options = question.poll.options if question.poll else []
+        params = {'id': question.id, 'edit_token': question.edit_token, 'header': question.title,
+                  'text': question.text, 'cid': question.category.id,
+                  'poll_options[]': [f'{o.id}:{o.text}' for o in current_poll_options]}
+        utils.update_not_none(params, {'header': title, 'text': text})
+        if category is not None:
+            category = yield from self._normalize_category_object(category)
+            self._ensure_child_category(category)
+            params['cid'] = category.id
+        if poll_options is not None:
+            if len(poll_options) > len(current_poll_options):
+                raise error.OtvetArgumentError('Cannot add more options when editing a poll')
+            params['poll_options[]'] = [f'{o.id}:{t}' for o, t in zip(current_poll_options, poll_options)]
+        data = yield Call('/v2/editqst', params)
+        all_categories = yield from self._get_categories()
+        return self._factories.build_question(data, all_categories, self._user_cache())
+
+    @operation
+    def add_answer(self, question: QuestionInput, text: str) -> int:
+        """
+        Answer a question.
+        :param question: question
+        :param text: answer text
+        :return: qnswer id
+        """
+        self._ensure_authenticated()
+        question = normalize_question(question)
+        params = {'qid': question, 'Body': text}
+        data = yield Call('/v2/addans', params)
+        return int(data['result']['id'])
+
+    @operation
+    def edit_answer(self, question: QuestionInput, answer: AnswerInput, text: str) -> None:
+        """
+        Edit an answer.
+        :param question: question
+        :param answer: answer
+        :param text: new answer text
+        """
+        self._ensure_authenticated()
+        question = normalize_question(question)
+        answer = normalize_answer(answer)
+        params = {'qid': question, 'update': answer, 'Body': text}
+        yield Call('/v2/editans', params)
+
+    @operation
+    def add_question_addition(self, question: QuestionInput, text: str) -> int:
+        """
+        Add something to a question.
+        :param question: question
+        :param text: addition text
+        :return: addition id
+        """
+        self._ensure_authenticated()
+        question = normalize_question(question)
+        params = {'qid': question, 'Body': text}
+        data = yield Call('/v2/updqst', params)
+        return int(data['adnid'])
+
+    def _add_comment(self, text: str, params: dict) -> Op[int]:
+        self._ensure_authenticated()
+        params = {'Body': text, 'source': '', **params}
+        data = yield Call('/v2/addcmt', params)
+        return int(data['cmid'])
+
+    @operation
+    def add_answer_comment(self, answer: AnswerInput, text: str, reply_comment: CommentInput = None) -> int:
+        """
+        Comment an answer.
+        :param answer: answer
+        :param text: comment text
+        :param reply_comment: a comment to reply to
+        :return: comment id
+        """
+        if reply_comment is None:
+            answer = normalize_answer(answer)
+            return (yield from self._add_comment(text, {'refid': answer, 'type': 'A'}))
+        else:
+            reply_comment = normalize_comment(reply_comment)
+            return (yield from self._add_comment(text, {'cmid': reply_comment}))
+
+    @operation
+    def add_poll_comment(self, question: QuestionInput, text: str, reply_comment: CommentInput = None) -> int:
+        """
+        Comment a poll.
+        :param question: question
+        :param text: comment text
+        :param reply_comment: a comment to reply to
+        :return: comment id
+        """
+        question = normalize_question(question)
+        if reply_comment is None:
+            return (yield from self._add_comment(text, {'refid': question, 'type': 'Q'}))
+        else:
+            reply_comment = normalize_comment(reply_comment)
+            return (yield from self._add_comment(text, {'refid': question, 'type': 'Q', 'cmid': reply_comment}))
+
+    @operation
+    def vote_in_poll(self, question: QuestionInput, options: List[OptionInput]) -> None:
+        """
+        Vote in a poll.
+        :param question: question
+        :param options: options to vote for (only one is allowed for polls without multiple choice)
+        """
+        self._ensure_authenticated()
+        question = normalize_question(question)
+        options = [normalize_option(o) for o in options]
+        params = {'qid': question, 'vote[]': options}
+        yield Call('/v2/votepoll', params)
+
+    @operation
+    def vote_for_best_answer(self, question: QuestionInput, answer: AnswerInput) -> None:
+        """
+        Vote for the best answer in a question.
+        :param question: question
+        :param answer: selected answer
+        """
+        self._ensure_authenticated()
+        question = normalize_question(question)
+        answer = normalize_answer(answer)
+        params = {'qid': question, 'aid': answer}
+        yield Call('/v2/votefor', params)
+
+    def _like(self, params: dict, remove: bool) -> Op[None]:
+        self._ensure_authenticated()
+        yield Call('/v2/' + ('unmark' if remove else 'mark'), params)
+
+    @operation
+    def like_question(self, question: QuestionInput, remove: bool = False) -> None:
+        """
+        Like a question
+        :param question: question
+        :param remove: whether to remove the like
+        """
+        question = normalize_question(question)
+        yield from self._like({'qid': question}, remove)
+
+    @operation
+    def like_answer(self, answer: AnswerInput, remove: bool = False) -> None:
+        """
+        Like an answer
+        :param answer: answer
+        :param remove: whether to remove the like
+        """
+        answer = normalize_answer(answer)
+        yield from self._like({'aid': answer}, remove)
+
+    @operation
+    def choose_best_answer(self, answer: AnswerInput) -> None:
+        """
+        Choose the best answer in a question.
+        :param answer: answer
+        """
+        self._ensure_authenticated()
+        answer = normalize_answer(answer)
+        yield Call('/v2/selectbest', {'aid': answer})
+
+    @operation
+    def watch_question(self, question: QuestionInput, drop: bool = False) -> None:
+        """
+        Watch a question and get notifications about new answers to it.
+        :param question: questions
+        :param drop: whether to stop watching
+        """
+        self._ensure_authenticated()
+        question = normalize_question(question)
+        yield Call('/v2/' + ('dropwatch' if drop else 'startwatch'), {'qid': question})
+
+    @operation
+    def set_is_adult_flag(self) -> None:
+        """
+        Set is_adult flag to get access to some categories.
+        """
+        yield Call('/v2/iamadult', {})
+
+    @operation
+    def follow_user(self, user: UserInput, unfollow: bool = False) -> None:
+        """
+        Follow a user
+        :param user: a user to follow
+        :param unfollow: whether to unfollow the user
+        """
+        self._ensure_authenticated()
+        user = self._normalize_user(user)
+        params = {'uid': user}
+        yield Call('/v2/' + ('unfollow' if unfollow else 'follow'), params)
+
+    @operation
+    def remove_follower(self, user: UserInput) -> None:
+        """
+        Remove a user from followers.
+        :param user: user
+        """
+        self._ensure_authenticated()
+        user = self._normalize_user(user)
+        params = {'uid': user}
+        yield Call('/v2/removefollower', params)
+
+    @operation
+    def blacklist_user(self, user: UserInput, remove: bool = False) -> None:
+        """
+        Blacklist a follower
+        :param user: user
+        :param remove: whether to remove the user from the blacklist
+        """
+        self._ensure_authenticated()
+        user = self._normalize_user(user)
+        params = {'bid': user}
+        yield Call('/v2/' + ('delblist' if remove else 'addblist'), params)
+
+    @operation
+    def recommend_to_golden(self, question: QuestionInput) -> None:
+        """
+        Recommend a question to golden.
+        :param question: question
+        """
+        self._ensure_authenticated()
+        question = normalize_question(question)
+        params = {'qid': question}
+        yield Call('/v2/golden', params)
+
+    @operation
+    def thank_answer(self, answer: AnswerInput) -> None:
+        """
+        Thank an answer (equivalent to liking by the question author).
+        :param answer: answer
+        """
+        self._ensure_authenticated()
+        answer = normalize_answer(answer)
+        params = {'aid': answer}
+        yield Call('/v2/thanks', params)
+
+    @operation
+    def hide_answer(self, answer: AnswerInput, revert: bool = False) -> None:
+        """
+        Mark an answer as useless
+        :param answer: answer
+        :param revert: show the answer again
+        """
+        self._ensure_authenticated()
+        answer = normalize_answer(answer)
+        params = {'aid': answer}
+        yield Call('/v2/' + ('unnotimportant' if revert else 'notimportant'), params)
+
+    @operation
+    def report_question(self, question: QuestionInput, reason: str) -> None:
+        """
+        Report the question.
+        :param question: question to report
+        :param reason: reason why it is reported (see `models.AbuseReason`)
+        """
+        self._ensure_authenticated()
+        question = normalize_question(question)
+        yield Call('/v2/abuse', {'qid': question, 'report': reason})
+
+    @operation
+    def report_answer(self, answer: AnswerInput, reason: str) -> None:
+        """
+        Report the answer.
+        :param answer: answer to report
+        :param reason: reason why it is reported (see `models.AbuseReason`)
+        """
+        self._ensure_authenticated()
+        answer = normalize_answer(answer)
+        yield Call('/v2/abuse', {'aid': answer, 'report': reason})
+
+    @operation
+    def report_comment(self, comment: models.Comment, reason: str) -> None:
+        """
+        Report the comment.
+        :param comment: comment to report
+        :param reason: reason why it is reported (see `models.AbuseReason`)
+        """
+        self._ensure_authenticated()
+        if comment.type is models.CommentType.question:
+            question = comment.reference_id
+            answer = None
+        else:
+            answer = comment.reference_id
+            question = (yield from self._call_operation(BaseOtvetClient.get_question_by_answer, answer)).id
+        params = {'cid': comment.id, 'qid': question, 'report': reason}
+        utils.update_not_none(params, {'aid': answer})
+        yield Call('/v2/abuse', params)
+
+
+# TODO notifications
+# TODO gifts
+# TODO change settings
+# TODO add images and videos
+# TODO see images and videos
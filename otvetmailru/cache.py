@@ -0,0 +1,273 @@
+import collections
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, Iterable, Iterator, Tuple, Set, Union
+
+
+MethodArgs = Dict[str, Union[str, int]]
+
+
+class CacheBackend:
+    """
+    Storage for cached api responses.
+    Entries have a time to live and a set of tags that can be used to invalidate them together.
+    Implement this class to keep the cache in a shared store.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value that has not expired yet, or None."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float, tags: Iterable[str]) -> None:
+        """Store a value for ttl seconds."""
+        raise NotImplementedError
+
+    def delete_tag(self, tag: str) -> None:
+        """Delete all values with a tag."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Delete all values."""
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU cache, thread-safe.
+    Can be shared between several clients.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        :param maxsize: maximal number of stored responses, least recently used ones are evicted first
+        """
+        self._maxsize = maxsize
+        self._entries: 'collections.OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]' = collections.OrderedDict()
+        self._tags: Dict[str, Set[str]] = collections.defaultdict(set)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._delete(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float, tags: Iterable[str]) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._delete(key)
+            tags = tuple(tags)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags[tag].add(key)
+            while len(self._entries) > self._maxsize:
+                self._delete(next(iter(self._entries)))
+
+    def delete_tag(self, tag: str) -> None:
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                self._delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _delete(self, key: str) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SqliteCache(CacheBackend):
+    """
+    On-disk cache in an sqlite database.
+    Survives restarts and can be shared between processes.
+    """
+
+    def __init__(self, path: str, maxsize: int = 100000):
+        """
+        :param path: database file
+        :param maxsize: maximal number of stored responses, least recently used ones are evicted first
+        """
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT, expires REAL, used REAL);
+            CREATE TABLE IF NOT EXISTS tags (tag TEXT, key TEXT);
+            CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag);
+            CREATE INDEX IF NOT EXISTS tags_key ON tags (key);
+            CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+        ''')
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute('SELECT value FROM entries WHERE key = ? AND expires >= ?', (key, now)).fetchone()
+            if row is None:
+                return None
+            self._db.execute('UPDATE entries SET used = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float, tags: Iterable[str]) -> None:
+        now = time.time()
+        data = json.dumps(value)
+        with self._lock, self._db:
+            self._db.execute('BEGIN')
+            self._db.execute('DELETE FROM tags WHERE key = ?', (key,))
+            self._db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)', (key, data, now + ttl, now))
+            self._db.executemany('INSERT INTO tags VALUES (?, ?)', [(tag, key) for tag in tags])
+            self._db.execute('DELETE FROM entries WHERE expires < ?', (now,))
+            self._db.execute('DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY used DESC '
+                             'LIMIT -1 OFFSET ?)', (self._maxsize,))
+            self._db.execute('DELETE FROM tags WHERE key NOT IN (SELECT key FROM entries)')
+
+    def delete_tag(self, tag: str) -> None:
+        with self._lock, self._db:
+            self._db.execute('BEGIN')
+            self._db.execute('DELETE FROM entries WHERE key IN (SELECT key FROM tags WHERE tag = ?)', (tag,))
+            self._db.execute('DELETE FROM tags WHERE key NOT IN (SELECT key FROM entries)')
+
+    def clear(self) -> None:
+        with self._lock, self._db:
+            self._db.execute('BEGIN')
+            self._db.execute('DELETE FROM entries')
+            self._db.execute('DELETE FROM tags')
+
+    def close(self) -> None:
+        self._db.close()
+
+
+# api method -> (parameter, tag prefix) for tags of cached responses
+_READ_TAGS = {
+    '/v2/question': ('qid', 'question'),
+    '/v2/stats_ex': ('user', 'user'),
+    '/v2/getBrands': ('urlname', 'brand'),
+    '/v2/expert_list': ('urlname', 'brand'),
+}
+
+# parameters of write methods that identify affected objects
+_WRITE_TAGS = {
+    'qid': 'question',
+    'aid': 'answer',
+    'cmid': 'comment',
+    'uid': 'user',
+    'bid': 'user',
+}
+
+
+def _question_tags(response: dict) -> Iterator[str]:
+    """Tags of the answers and comments in a question, so that writes to them invalidate the question."""
+    answers = ([response['best']] if response.get('best') else []) + list(response.get('answers') or [])
+    comments = list(response.get('comments') or [])
+    for answer in answers:
+        yield f'answer:{answer["id"]}'
+        comments += answer.get('comments') or []
+    while comments:
+        comment = comments.pop()
+        yield f'comment:{comment["cmid"]}'
+        comments += comment.get('comments') or []
+
+
+def request_key(method: str, params: MethodArgs, user_id: Optional[int]) -> str:
+    """Key identifying an api request of a user, the same for equal parameters in any order."""
+    return json.dumps([method, user_id, sorted((k, str(v)) for k, v in params.items())], ensure_ascii=False)
+
+
+class ResponseCache:
+    """
+    Cache of raw api responses for read-only methods, used by the clients between the public methods
+    and the http transport. Responses are cached per authenticated user.
+    Writes made through the client invalidate the cached responses for the affected questions and users,
+    questions are also invalidated by writes to their answers and comments.
+    """
+
+    DEFAULT_TTLS = {
+        '/v2/question': 10,
+        '/v2/stats_ex': 60,
+        '/v2/getBrands': 3600,
+        '/v2/expert_list': 600,
+        '/search/search': 300,
+    }
+
+    def __init__(self, backend: CacheBackend = None, ttls: Dict[str, float] = None):
+        """
+        :param backend: storage, MemoryCache by default
+        :param ttls: time to live in seconds by api method, replaces DEFAULT_TTLS; only these methods are cached
+        """
+        self.backend = backend or MemoryCache()
+        self.ttls = dict(self.DEFAULT_TTLS if ttls is None else ttls)
+
+    @staticmethod
+    def _key(method: str, params: MethodArgs, user_id: Optional[int]) -> str:
+        return request_key(method, params, user_id)
+
+    @staticmethod
+    def _tags(method: str, params: MethodArgs, response: dict) -> Iterable[str]:
+        yield f'method:{method}'
+        if method in _READ_TAGS:
+            param, prefix = _READ_TAGS[method]
+            if param in params:
+                yield f'{prefix}:{params[param]}'
+        if method == '/v2/question':
+            yield from _question_tags(response)
+
+    def is_cached(self, method: str) -> bool:
+        """Whether responses of an api method are cached."""
+        return method in self.ttls
+
+    def get(self, method: str, params: MethodArgs, user_id: Optional[int]) -> Optional[dict]:
+        """Get a cached response, or None."""
+        return self.backend.get(self._key(method, params, user_id))
+
+    def put(self, method: str, params: MethodArgs, user_id: Optional[int], response: dict) -> None:
+        """Store a response."""
+        self.backend.set(self._key(method, params, user_id), response, self.ttls[method],
+                         self._tags(method, params, response))
+
+    def invalidate_question(self, question_id: int) -> None:
+        """Forget cached responses for a question."""
+        self.backend.delete_tag(f'question:{question_id}')
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Forget cached profiles of a user."""
+        self.backend.delete_tag(f'user:{user_id}')
+
+    def invalidate_brand(self, urlname: str) -> None:
+        """Forget cached responses for a brand."""
+        self.backend.delete_tag(f'brand:{urlname}')
+
+    def invalidate_method(self, method: str) -> None:
+        """Forget all cached responses of an api method."""
+        self.backend.delete_tag(f'method:{method}')
+
+    def invalidate_after_write(self, method: str, params: MethodArgs, user_id: Optional[int]) -> None:
+        """Forget responses that may have been changed by a write request."""
+        for param, prefix in _WRITE_TAGS.items():
+            if param in params:
+                self.backend.delete_tag(f'{prefix}:{params[param]}')
+        if 'refid' in params:
+            # comments refer to a question or an answer
+            self.backend.delete_tag(f"{'question' if params.get('type') == 'Q' else 'answer'}:{params['refid']}")
+        if method == '/v2/editqst':
+            self.invalidate_question(params['id'])
+        if user_id is not None:
+            self.invalidate_user(user_id)
+
+    def clear(self) -> None:
+        """Forget all cached responses."""
+        self.backend.clear()
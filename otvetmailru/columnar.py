@@ -0,0 +1,168 @@
+"""
+Columnar page output, for analytics.
+
+Pages are built as records (see otvetmailru.records) and transposed into columns, one per scalar field.
+Nested records are flattened with a prefix (author_id, author_name, question_id...), fields holding lists
+or optional records (answers, comments, best_answer) are left out.
+
+Use output='columns', output='numpy' or output='arrow' in the page and iterate methods of the client.
+"""
+import array
+import datetime
+import sys
+from typing import Dict, Sequence, List, Any, Iterator, Union
+
+from . import error
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+COLUMNAR_OUTPUTS = ('columns', 'numpy', 'arrow')
+
+_SCALARS = (int, float, str, datetime.datetime, type(None))
+_NUMPY_TYPES = {'q': 'int64', 'd': 'float64', 'b': 'int8'}
+
+
+class ColumnBatch:
+    """
+    Page of objects stored by columns.
+    Integers, floats and flags are stored in typed arrays ('q', 'd' and 'b'), strings are interned,
+    other columns (with missing values or timestamps) are lists.
+    With output='numpy' all columns are numpy arrays.
+    :ivar columns: columns by field name, in the order of the fields
+    """
+
+    def __init__(self, columns: Dict[str, Sequence], length: int):
+        """
+        :param columns: columns by field name
+        :param length: number of rows
+        """
+        self.columns = columns
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, name: str) -> Sequence:
+        return self.columns[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.columns)
+
+    def __repr__(self):
+        return f'ColumnBatch({self._length} rows, columns={list(self.columns)})'
+
+
+def _is_record(value: Any) -> bool:
+    return isinstance(value, tuple) and hasattr(value, '_fields')
+
+
+def _typed_column(values: tuple) -> Sequence:
+    kinds = set(map(type, values))
+    if kinds == {int}:
+        return array.array('q', values)
+    if kinds == {float} or kinds == {int, float}:
+        return array.array('d', values)
+    if kinds == {bool}:
+        return array.array('b', values)
+    if kinds == {str}:
+        return list(map(sys.intern, values))
+    return list(values)
+
+
+def _add_columns(columns: Dict[str, Sequence], rows: Sequence[tuple], prefix: str) -> None:
+    record_types = set(map(type, rows))
+    if len(record_types) == 1:
+        fields = rows[0]._fields
+        values_by_field = zip(*rows)
+    else:
+        # like users and brand users, only the common fields are kept
+        fields = [f for f in rows[0]._fields if all(f in t._fields for t in record_types)]
+        values_by_field = (tuple(getattr(row, f) for row in rows) for f in fields)
+    for name, values in zip(fields, values_by_field):
+        if all(_is_record(v) for v in values):
+            _add_columns(columns, values, f'{prefix}{name}_')
+        elif all(isinstance(v, _SCALARS) for v in values):
+            columns[prefix + name] = _typed_column(values)
+
+
+def to_columns(rows: Sequence[tuple]) -> ColumnBatch:
+    """
+    Transpose records into columns.
+    :param rows: records of one type, or of types with common fields
+    """
+    columns: Dict[str, Sequence] = {}
+    if rows:
+        _add_columns(columns, rows, '')
+    return ColumnBatch(columns, len(rows))
+
+
+def _numpy_column(column: Sequence) -> 'numpy.ndarray':
+    if isinstance(column, array.array):
+        result = numpy.frombuffer(column, dtype=_NUMPY_TYPES[column.typecode])
+        return result.astype(bool) if column.typecode == 'b' else result
+    if all(isinstance(v, str) for v in column):
+        return numpy.array(column, dtype=str)
+    if all(isinstance(v, datetime.datetime) for v in column):
+        return numpy.array(column, dtype='datetime64[s]')
+    return numpy.array(column, dtype=object)
+
+
+def to_numpy(batch: ColumnBatch) -> ColumnBatch:
+    """Convert the columns to numpy arrays, typed arrays are not copied."""
+    require('numpy')
+    return ColumnBatch({name: _numpy_column(column) for name, column in batch.columns.items()}, len(batch))
+
+
+def _arrow_column(column: Sequence) -> 'pyarrow.Array':
+    if isinstance(column, array.array):
+        if numpy is not None:
+            return pyarrow.array(_numpy_column(column))
+        if column.typecode == 'b':
+            return pyarrow.array([bool(v) for v in column], type=pyarrow.bool_())
+        return pyarrow.array(column, type=pyarrow.int64() if column.typecode == 'q' else pyarrow.float64())
+    return pyarrow.array(column)
+
+
+def to_arrow(batch: ColumnBatch) -> 'pyarrow.RecordBatch':
+    """Convert the columns to an arrow record batch."""
+    require('arrow')
+    names = list(batch.columns)
+    return pyarrow.RecordBatch.from_arrays([_arrow_column(batch.columns[name]) for name in names], names=names)
+
+
+def require(output: str) -> None:
+    """Check that the library needed for an output mode is installed."""
+    if output == 'numpy' and numpy is None:
+        raise error.OtvetArgumentError('numpy is not installed')
+    if output == 'arrow' and pyarrow is None:
+        raise error.OtvetArgumentError('pyarrow is not installed')
+
+
+def row_output(output: str) -> str:
+    """Output mode to request from the pages before the conversion."""
+    return 'records' if output in COLUMNAR_OUTPUTS else output
+
+
+def convert(items: List[Any], output: str) -> Union[List[Any], ColumnBatch, 'pyarrow.RecordBatch']:
+    """
+    Convert a page of records for a columnar output mode, other outputs are returned as is.
+    :param items: page built with records.factories for a columnar mode
+    :param output: output mode of the client method
+    """
+    if output not in COLUMNAR_OUTPUTS:
+        return items
+    batch = to_columns(items)
+    if output == 'numpy':
+        return to_numpy(batch)
+    if output == 'arrow':
+        return to_arrow(batch)
+    return batch
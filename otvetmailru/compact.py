@@ -0,0 +1,75 @@
+"""
+Models with __slots__, for keeping many objects in memory.
+
+Every dataclass from otvetmailru.models has a counterpart here with the same name, fields, properties and
+equality rules, but without a per-instance __dict__. Compact classes form their own hierarchy, so
+isinstance checks should use the classes from this module, or model_types to accept both kinds of models.
+Enums, Avatar, Rate and Category are shared with otvetmailru.models.
+
+Use OtvetClient(compact_models=True) to get these models from the client.
+"""
+import dataclasses
+import sys
+import types
+from typing import Tuple
+
+from . import models, factories as factories_
+from .models import (
+    QuestionState, PollType, ThankStatus, CommentType, RatingType, BrandAnswerStatus, AbuseReason, Avatar, Rate,
+    Category,
+)
+
+
+# used as they are, the factories bound to this module look them up here by name
+_SHARED = (
+    QuestionState, PollType, ThankStatus, CommentType, RatingType, BrandAnswerStatus, AbuseReason, Avatar, Rate,
+    Category,
+)
+
+
+def _rebind(func: types.FunctionType, namespace: dict) -> types.FunctionType:
+    new_func = types.FunctionType(func.__code__, namespace, func.__name__, func.__defaults__, func.__closure__)
+    new_func.__qualname__ = func.__qualname__
+    new_func.__doc__ = func.__doc__
+    new_func.__kwdefaults__ = func.__kwdefaults__
+    return new_func
+
+
+def _make_slotted(cls: type, bases: tuple, namespace: dict) -> type:
+    base_fields = {f.name for base in bases if dataclasses.is_dataclass(base) for f in dataclasses.fields(base)}
+    own_fields = tuple(f.name for f in dataclasses.fields(cls) if f.name not in base_fields)
+    body = {}
+    for key, value in vars(cls).items():
+        if key in ('__dict__', '__weakref__') or key in own_fields:
+            continue
+        if isinstance(value, types.FunctionType) and value.__globals__ is vars(models):
+            # methods like __eq__ refer to base classes by name, they must see the compact ones
+            value = _rebind(value, namespace)
+        body[key] = value
+    body['__slots__'] = own_fields
+    body['__module__'] = __name__
+    return type(cls.__name__, bases, body)
+
+
+def _build_classes(namespace: dict) -> None:
+    mapping = {}
+    for value in list(vars(models).values()):
+        if not isinstance(value, type) or not dataclasses.is_dataclass(value) or value in _SHARED:
+            continue
+        bases = tuple(mapping.get(base, base) for base in value.__bases__)
+        mapping[value] = namespace[value.__name__] = _make_slotted(value, bases, namespace)
+
+
+_build_classes(globals())
+
+
+def model_types(cls: type) -> Tuple[type, ...]:
+    """
+    A class from otvetmailru.models together with its compact counterpart, for isinstance checks.
+    :param cls: class from otvetmailru.models
+    """
+    if cls in _SHARED or not dataclasses.is_dataclass(cls):
+        return (cls,)
+    return cls, globals()[cls.__name__]
+
+factories = factories_.bind(sys.modules[__name__])
@@ -9,12 +9,12 @@ class OtvetError(Exception):
 class OtvetAuthError(OtvetError):
     """
     Authentication error.
-    :ivar login: a username of the account that failed authentication
+    :ivar login: a username of the account that failed authentication, None if it is not known
     """
 
-    def __init__(self, login: str):
+    def __init__(self, login: Optional[str] = None):
 
-        super().__init__(f'Authentication failed for "{login}"')
+        super().__init__(f'Authentication failed for "{login}"' if login is not None else 'Authentication failed')
         self.login = login
 
 
@@ -29,7 +29,62 @@ class OtvetAPIError(OtvetError):
         self.response = response
         self.localized_message = localized_message
 
+    @property
+    def status(self) -> Optional[int]:
+        """Status field of the response, like 404, None if there is none."""
+        try:
+            return int(self.response['status'])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @property
+    def is_limit_error(self) -> bool:
+        """Whether the request was refused because a limit is spent, the status of the response is 429."""
+        return self.status == 429
+
 
 class OtvetArgumentError(OtvetError):
     """A client-side error caused by bad method arguments."""
     pass
+
+
+class OtvetTransportError(OtvetError):
+    """An http request could not be completed."""
+    pass
+
+
+class OtvetConnectionError(OtvetTransportError):
+    """Failed to connect to the server."""
+    pass
+
+
+class OtvetTimeoutError(OtvetTransportError):
+    """The server did not respond in time."""
+    pass
+
+
+class OtvetHTTPError(OtvetTransportError):
+    """
+    The server returned an http error instead of an API response.
+    :ivar status_code: http status code
+    """
+
+    def __init__(self, status_code: int):
+        super().__init__(f'HTTP error {status_code}')
+        self.status_code = status_code
+
+
+class OtvetDecodeError(OtvetTransportError):
+    """The server returned a response that is not valid json."""
+    pass
+
+
+class OtvetLimitError(OtvetError):
+    """
+    No account of a client pool has any of a daily limit left.
+    :ivar limit: name of the exhausted field of LimitSet, like 'answers'
+    """
+
+    def __init__(self, limit: str):
+        super().__init__(f'Daily limit "{limit}" is exhausted on all accounts')
+        self.limit = limit
@@ -1,27 +1,52 @@
 import datetime
-from typing import Dict
+import types
+from typing import Dict, Any
 
-from . import models, rates, categories
+from . import models, rates, categories, lazy
 
 
-def build_simple_question(data: dict, category_provider: categories.Categories) -> models.SimpleQuestion:
-    category = category_provider.by_id(int(data['cid']))
-    question = models.SimpleQuestion(
+def bind(models_module: Any, **overrides: Any) -> types.SimpleNamespace:
+    """
+    Copy all factory functions so that they build classes from another module with the same class names,
+    like otvetmailru.compact.
+    :param models_module: module or object with model classes as attributes
+    :param overrides: other modules used by the factories to replace, like rates
+    :return: namespace with build_* and *_fields functions
+    """
+    namespace = dict(globals(), models=models_module, **overrides)
+    functions = {}
+    for name, value in globals().items():
+        if isinstance(value, types.FunctionType) and value.__globals__ is globals() and value is not bind:
+            functions[name] = types.FunctionType(value.__code__, namespace, name, value.__defaults__,
+                                                 value.__closure__)
+    # factories call each other through the globals
+    namespace.update(functions)
+    return types.SimpleNamespace(**functions)
+
+
+# *_fields functions return constructor arguments shared by a model and its subclasses,
+# so that every model is built in one step
+
+
+def simple_question_fields(data: dict, category_provider: categories.Categories) -> Dict[str, Any]:
+    return dict(
         id=int(data['id']),
         title=data['qtext'],
         state=models.QuestionState(data['state']),
-        category=category,
+        category=category_provider.by_id(int(data['cid'])),
         age_seconds=int(data['added']),
         is_leader=bool(int(data['waslead'])),
         poll_type=models.PollType(data['polltype']),
         answer_count=int(data['total_voted'] if data['polltype'] else data['anscnt']),
     )
-    return question
 
 
-def build_question_preview(data: dict, category_provider: categories.Categories) -> models.QuestionPreview:
-    base = build_simple_question(data, category_provider)
-    user = models.UserPreview(
+def build_simple_question(data: dict, category_provider: categories.Categories) -> models.SimpleQuestion:
+    return models.SimpleQuestion(**simple_question_fields(data, category_provider))
+
+
+def build_question_author(data: dict) -> models.UserPreview:
+    return models.UserPreview(
         id=int(data['usrid']),
         name=data['nick'],
         is_vip=bool(data['vip']),
@@ -30,36 +55,33 @@ def build_question_preview(data: dict, category_provider: categories.Categories)
         avatar=models.Avatar(data['filin']),
         is_expert=bool(data['is_expert']),
     )
-    question = models.QuestionPreview(
-        **vars(base),
-        author=user,
+
+
+def build_question_preview(data: dict, category_provider: categories.Categories) -> models.QuestionPreview:
+    return models.QuestionPreview(
+        **simple_question_fields(data, category_provider),
+        author=build_question_author(data),
     )
-    return question
 
 
 def build_best_question_preview(data: dict, category_provider: categories.Categories) -> models.BestQuestionPreview:
-    base = build_question_preview(data, category_provider)
-    question = models.BestQuestionPreview(
-        **vars(base),
+    return models.BestQuestionPreview(
+        **simple_question_fields(data, category_provider),
+        author=build_question_author(data),
         can_like=bool(data.get('canmark')),
         like_count=int(data['sum']),
     )
-    return question
 
 
 def build_user_question_preview(data: dict, category_provider: categories.Categories) -> models.UserQuestionPreview:
-    base = build_simple_question(data, category_provider)
-    question = models.UserQuestionPreview(
-        **vars(base),
+    return models.UserQuestionPreview(
+        **simple_question_fields(data, category_provider),
         is_hidden=bool(data['hidden']),
     )
-    return question
 
 
-def build_small_user_preview(data: dict) -> models.SmallUserPreview:
-    if 'brand_cid' in data:
-        return build_brand_small_user_preview(data)
-    return models.SmallUserPreview(
+def small_user_preview_fields(data: dict) -> Dict[str, Any]:
+    return dict(
         id=int(data['id']),
         name=data['nick'],
         avatar=models.Avatar(data['filin']),
@@ -67,6 +89,12 @@ def build_small_user_preview(data: dict) -> models.SmallUserPreview:
     )
 
 
+def build_small_user_preview(data: dict) -> models.SmallUserPreview:
+    if 'brand_cid' in data:
+        return build_brand_small_user_preview(data)
+    return models.SmallUserPreview(**small_user_preview_fields(data))
+
+
 def build_brand_small_user_preview(data: dict) -> models.BrandSmallUserPreview:
     return models.BrandSmallUserPreview(
         id=int(data['id']),
@@ -78,26 +106,31 @@ def build_brand_small_user_preview(data: dict) -> models.BrandSmallUserPreview:
     )
 
 
+def user_fields(data: dict) -> Dict[str, Any]:
+    return dict(
+        id=int(data['usrid']),
+        name=data['nick'],
+        is_vip=bool(data['vip']),
+        kpd=float(data['kpd']),
+        about=data['about'],
+        avatar=models.Avatar(data['ofilin' if 'ofilin' in data else 'filin']),
+        is_expert=bool(data['is_expert']),
+        points=int(data['points']) if 'points' in data else None,
+        rate=rates.by_user_stats(int(data['points']), float(data['kpd'])) if 'points' in data else None,
+    )
+
+
 def build_user(data: dict, user_cache: Dict[int, models.User]) -> models.User:
     user_id = int(data['usrid'])
     if user_id not in user_cache:
-        user_cache[user_id] = models.User(
-            id=user_id,
-            name=data['nick'],
-            is_vip=bool(data['vip']),
-            kpd=float(data['kpd']),
-            about=data['about'],
-            avatar=models.Avatar(data['ofilin' if 'ofilin' in data else 'filin']),
-            is_expert=bool(data['is_expert']),
-            points=int(data['points']) if 'points' in data else None,
-            rate=rates.by_user_stats(int(data['points']), float(data['kpd'])) if 'points' in data else None,
-        )
         if data.get('brand_url'):
             user_cache[user_id] = models.BrandUser(
-                **vars(user_cache[user_id]),
+                **user_fields(data),
                 brand=build_brand(data),
                 role=data['role'],
             )
+        else:
+            user_cache[user_id] = models.User(**user_fields(data))
     return user_cache[user_id]
 
 
@@ -192,19 +225,33 @@ def build_comment(data: dict, user_cache: Dict[int, models.User]) -> models.Comm
     )
 
 
-def build_incomplete_question(data: dict, category_provider: categories.Categories) -> models.IncompleteQuestion:
-    category = category_provider.by_id(int(data['cid']))
-    user_cache = {}
-    user = build_user(data, user_cache)
+def question_answers_fields(data: dict, user_cache: Dict[int, models.User]) -> Dict[str, Any]:
     answers = {a['id']: build_answer(a, user_cache)
                for a in ([data['best']] if 'best' in data else []) + data['answers']}
-    additions = [build_question_addition(a) for a in data['adds']]
+    return dict(answers=list(answers.values()), best_answer=answers.get(data['bestanswer']))
+
+
+def question_liked_by_fields(data: dict) -> Dict[str, Any]:
+    return dict(liked_by=[build_small_user_preview(u) for u in data['marked']])
+
+
+def question_additions_fields(data: dict) -> Dict[str, Any]:
+    return dict(additions=[build_question_addition(a) for a in data['adds']])
+
+
+def question_poll_fields(data: dict, user_cache: Dict[int, models.User]) -> Dict[str, Any]:
     poll = build_poll(data['poll']) if 'poll' in data else None
     comments = [build_comment(c, user_cache) for c in data['comments']] if poll else None
-    question = models.IncompleteQuestion(
+    return dict(poll=poll, comments=comments)
+
+
+def question_scalar_fields(data: dict, category_provider: categories.Categories,
+                           user_cache: Dict[int, models.User]) -> Dict[str, Any]:
+    """Fields of a question except the ones from question_*_fields."""
+    return dict(
         id=int(data['qid']),
-        category=category,
-        author=user,
+        category=category_provider.by_id(int(data['cid'])),
+        author=build_user(data, user_cache),
         can_choose_best_answer=bool(data['acanselbest']),
         age_seconds=int(data['added']),
         like_count=int(data['totalmarks']),
@@ -220,40 +267,83 @@ def build_incomplete_question(data: dict, category_provider: categories.Categori
         state=models.QuestionState(data['state']),
         is_leader=bool(int(data['waslead'])),
         is_watching=bool(data['watcher']),
-        liked_by=[build_small_user_preview(u) for u in data['marked']],
-        answers=list(answers.values()),
-        best_answer=answers.get(data['bestanswer']),
-        additions=additions,
-        poll=poll,
         poll_type=models.PollType(data['polltype']),
         deleted_by_id=int(data['deleted_by']['id']) if 'deleted_by' in data else None,
-        comments=comments,
         can_recommend_to_golden=bool(data.get('goldrec')),
         edit_token=data.get('edit_token'),
         brand_answer_status=models.BrandAnswerStatus.answered if data.get('has_brand_answer') else
         models.BrandAnswerStatus.waiting if data.get('waiting_brand_reply') else
         models.BrandAnswerStatus.none,
     )
-    return question
 
 
-def build_question(data: dict, category_provider: categories.Categories) -> models.Question:
-    incomplete_question = build_incomplete_question(data, category_provider)
-    question = models.Question(
-        **vars(incomplete_question),
+def question_extra_fields(data: dict) -> Dict[str, Any]:
+    """Fields of a full question that an incomplete one does not have."""
+    return dict(
         best_answer_vote_count=int(data['arating']),
         can_edit=bool(data['can_edit']),
         can_add=not data['noadd'],
         created_at=datetime.datetime.fromtimestamp(int(data['created_at'])),
     )
-    return question
+
+
+def incomplete_question_fields(data: dict, category_provider: categories.Categories,
+                               user_cache: Dict[int, models.User] = None) -> Dict[str, Any]:
+    if user_cache is None:
+        user_cache = {}
+    return dict(
+        **question_scalar_fields(data, category_provider, user_cache),
+        **question_answers_fields(data, user_cache),
+        **question_liked_by_fields(data),
+        **question_additions_fields(data),
+        **question_poll_fields(data, user_cache),
+    )
+
+
+def build_incomplete_question(data: dict, category_provider: categories.Categories,
+                              user_cache: Dict[int, models.User] = None) -> models.IncompleteQuestion:
+    return models.IncompleteQuestion(**incomplete_question_fields(data, category_provider, user_cache))
+
+
+def build_question(data: dict, category_provider: categories.Categories,
+                   user_cache: Dict[int, models.User] = None) -> models.Question:
+    return models.Question(
+        **incomplete_question_fields(data, category_provider, user_cache),
+        **question_extra_fields(data),
+    )
+
+
+def lazy_question_loaders(data: dict, user_cache: Dict[int, models.User]) -> Dict[str, Any]:
+    """Loaders of the fields in lazy.LAZY_FIELDS."""
+    return {
+        'answers': lambda: question_answers_fields(data, user_cache),
+        'liked_by': lambda: question_liked_by_fields(data),
+        'additions': lambda: question_additions_fields(data),
+        'poll': lambda: question_poll_fields(data, user_cache),
+    }
+
+
+def build_lazy_incomplete_question(data: dict, category_provider: categories.Categories,
+                                   user_cache: Dict[int, models.User] = None) -> models.IncompleteQuestion:
+    if user_cache is None:
+        user_cache = {}
+    return lazy.create(models.IncompleteQuestion, question_scalar_fields(data, category_provider, user_cache),
+                       lazy_question_loaders(data, user_cache))
+
+
+def build_lazy_question(data: dict, category_provider: categories.Categories,
+                        user_cache: Dict[int, models.User] = None) -> models.Question:
+    if user_cache is None:
+        user_cache = {}
+    fields = dict(**question_scalar_fields(data, category_provider, user_cache), **question_extra_fields(data))
+    return lazy.create(models.Question, fields, lazy_question_loaders(data, user_cache))
 
 
 def build_user_profile(data: dict, user_id: int, category_provider: categories.Categories
                        ) -> models.UserProfile:
     if 'expert' in data:
         return build_brand_expert_profile(data, user_id, category_provider)
-    profile = models.UserProfile(
+    fields = dict(
         id=user_id,
         name=data['snick'],
         points=int(data['spoints']),
@@ -280,14 +370,14 @@ def build_user_profile(data: dict, user_id: int, category_provider: categories.C
         avatar=models.Avatar(data['sfilin' if 'sfilin' in data else 'filin']),
     )
     if 'maillogin' in data:
-        profile = models.MyUserProfile(
-            **vars(profile),
+        return models.MyUserProfile(
+            **fields,
             watching_question_count=int(data['watchcnt']),
             direct_question_count=int(data['cnt']['questions_direct']),
             removed_question_count=int(data['cnt']['questions_removed']),
             banned_until=datetime.datetime.fromtimestamp(data['ban_until']) if 'ban_until' in data else None,
         )
-    return profile
+    return models.UserProfile(**fields)
 
 
 def build_brand_expert_profile(data: dict, user_id: int, category_provider: categories.Categories
@@ -413,9 +503,8 @@ def build_minimal_question_preview(
 
 
 def build_user_in_rating(data: dict, rating_type: models.RatingType) -> models.UserInRating:
-    user = build_user(data, {})
     return models.UserInRating(
-        **vars(user),
+        **user_fields(data),
         rating_type=rating_type,
         rating_points=int(data['dif' + rating_type.value]),
     )
@@ -453,9 +542,8 @@ def build_similar_question_search_result(
 
 
 def build_follower_preview(data: dict) -> models.FollowerPreview:
-    user = build_small_user_preview(data)
     return models.FollowerPreview(
-        **vars(user),
+        **small_user_preview_fields(data),
         is_followed_by_me=bool(data['fr']),
     )
 
@@ -0,0 +1,88 @@
+import collections
+import dataclasses
+import threading
+from typing import Dict, Tuple, Optional
+
+from . import models
+
+
+class UserIdentityMap:
+    """
+    Client-wide map from user id to a single User object, shared by all responses.
+    When a user is seen again, the newer field values are merged into the existing object:
+    fields that are None in the newer data (like points missing from a comment) keep the known values.
+    If the user comes with another model type (a BrandUser instead of a User), the newer object replaces
+    the old one in the map.
+    Only User objects are mapped; small previews (likes, followers, the blacklist) are returned as they are decoded.
+    The map keeps at most maxsize least recently seen users, thread-safe.
+    """
+
+    def __init__(self, maxsize: int = 100000):
+        """
+        :param maxsize: maximal number of users to keep
+        """
+        self._maxsize = maxsize
+        self._users: 'collections.OrderedDict[int, models.User]' = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._fields: Dict[type, Tuple[str, ...]] = {}
+
+    def _field_names(self, cls: type) -> Tuple[str, ...]:
+        if cls not in self._fields:
+            self._fields[cls] = tuple(f.name for f in dataclasses.fields(cls) if f.name != 'id')
+        return self._fields[cls]
+
+    def merge(self, user: models.User) -> models.User:
+        """
+        Add a freshly decoded user to the map.
+        :return: the object that represents this user from now on
+        """
+        with self._lock:
+            known = self._users.get(user.id)
+            if known is None or type(known) is not type(user):
+                self._users[user.id] = user
+                self._users.move_to_end(user.id)
+                while len(self._users) > self._maxsize:
+                    self._users.popitem(last=False)
+                return user
+            self._users.move_to_end(user.id)
+            for name in self._field_names(type(user)):
+                value = getattr(user, name)
+                if value is not None:
+                    setattr(known, name, value)
+            return known
+
+    def get(self, user_id: int) -> Optional[models.User]:
+        """Get a known user by id, or None."""
+        with self._lock:
+            return self._users.get(user_id)
+
+    def view(self) -> 'UserMapView':
+        """Create a user cache for decoding one response."""
+        return UserMapView(self)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+
+class UserMapView:
+    """
+    User cache for factories that decode one response.
+    Every user is merged into the identity map once per response.
+    """
+
+    def __init__(self, identity_map: UserIdentityMap):
+        self._identity_map = identity_map
+        self._local: Dict[int, models.User] = {}
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._local
+
+    def __getitem__(self, user_id: int) -> models.User:
+        return self._local[user_id]
+
+    def __setitem__(self, user_id: int, user: models.User) -> None:
+        self._local[user_id] = self._identity_map.merge(user)
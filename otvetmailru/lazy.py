@@ -0,0 +1,92 @@
+"""
+Questions with lazily decoded collections, for bots that read only a few fields of many questions.
+
+A lazy question is an instance of a subclass of the usual Question (or IncompleteQuestion) class, so isinstance
+checks work as before. Answers and the best answer, comments, users who liked the question, additions and the
+poll are decoded from the api response on first access, all other fields are decoded at once.
+A lazy question is pickled as an instance of the usual class, with all fields decoded.
+
+Use OtvetClient(lazy_questions=True) to get these questions from the client.
+"""
+import dataclasses
+import functools
+import types
+from typing import Any, Callable, Dict
+
+
+# fields decoded together, by the name of the loader
+LAZY_FIELDS = {
+    'answers': ('answers', 'best_answer'),
+    'liked_by': ('liked_by',),
+    'additions': ('additions',),
+    'poll': ('poll', 'comments'),
+}
+
+
+class _LazyField:
+    """Descriptor for a field that is decoded by a loader on first access."""
+
+    def __init__(self, name: str, loader: str):
+        self.name = name
+        self.loader = loader
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        if instance is None:
+            return self
+        values = instance._lazy_values
+        loader = instance._lazy_loaders.get(self.loader)
+        if self.name not in values and loader is not None:
+            # fields assigned by the user are not overwritten, the response is released after the last loader
+            for name, value in loader().items():
+                values.setdefault(name, value)
+            instance._lazy_loaders.pop(self.loader, None)
+        return values[self.name]
+
+    def __set__(self, instance: Any, value: Any) -> None:
+        instance._lazy_values[self.name] = value
+
+
+def _eager(cls: type, fields: Dict[str, Any]) -> Any:
+    return cls(**fields)
+
+
+def _reduce(question: Any) -> tuple:
+    """Pickle a lazy question as an instance of the usual class, the loaders are run first."""
+    cls = type(question).__bases__[0]
+    return _eager, (cls, {f.name: getattr(question, f.name) for f in dataclasses.fields(cls)})
+
+
+@functools.lru_cache(maxsize=None)
+def lazy_class(cls: type) -> type:
+    """Subclass of a question class with the fields from LAZY_FIELDS decoded on first access."""
+    body = {name: _LazyField(name, loader) for loader, names in LAZY_FIELDS.items() for name in names}
+    body['__slots__'] = ('_lazy_values', '_lazy_loaders')
+    body['__reduce__'] = _reduce
+    body['__module__'] = __name__
+    body['__qualname__'] = cls.__qualname__
+    return type(cls.__name__, (cls,), body)
+
+
+def create(cls: type, fields: Dict[str, Any], loaders: Dict[str, Callable[[], Dict[str, Any]]]) -> Any:
+    """
+    Create a lazy question without running the loaders.
+    :param cls: question class
+    :param fields: values of the fields that are not in LAZY_FIELDS
+    :param loaders: functions returning the values of the fields in LAZY_FIELDS, by the name of the loader
+    :return: instance of lazy_class(cls)
+    """
+    question = object.__new__(lazy_class(cls))
+    question._lazy_values = {}
+    question._lazy_loaders = dict(loaders)
+    for name, value in fields.items():
+        setattr(question, name, value)
+    return question
+
+
+def bind(factories: Any) -> types.SimpleNamespace:
+    """
+    Factories that build lazy questions in place of the usual ones.
+    :param factories: factories module or namespace, like otvetmailru.compact.factories
+    """
+    return types.SimpleNamespace(**dict(vars(factories), build_question=factories.build_lazy_question,
+                                        build_incomplete_question=factories.build_lazy_incomplete_question))
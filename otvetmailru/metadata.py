@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, List, Callable
+
+
+SNAPSHOT_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Metadata:
+    """
+    Site metadata embedded in the main page.
+    :ivar categories: raw category tree
+    :ivar brands: urlnames of the brands
+    :ivar errors: localized error messages by error id
+    :ivar created: unix time when the metadata was downloaded
+    """
+    categories: List[dict]
+    brands: List[str]
+    errors: Dict[str, str]
+    created: float
+
+
+class MetadataSnapshot:
+    """
+    On-disk snapshot of the site metadata, so that new clients do not have to download the main page.
+    A snapshot older than ttl is still used, but the client refreshes it in background.
+    The file is replaced atomically and can be shared between processes. The clients only log a failed write,
+    like to a read-only directory, and keep working with the downloaded metadata.
+    """
+
+    def __init__(self, path: str, ttl: float = 86400):
+        """
+        :param path: snapshot file
+        :param ttl: age in seconds after which the snapshot is refreshed
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def load(self) -> Optional[Metadata]:
+        """Read the snapshot, None if it is missing, corrupted or has another format version."""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.pop('version', None) != SNAPSHOT_VERSION:
+                return None
+            return Metadata(**data)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def save(self, metadata: Metadata) -> None:
+        """Write the snapshot."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.otvet-metadata-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': SNAPSHOT_VERSION, **asdict(metadata)}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def try_save(self, metadata: Metadata) -> bool:
+        """
+        Write the snapshot, logging a failure instead of raising it, like when the directory is read-only.
+        :return: whether the snapshot was written
+        """
+        try:
+            self.save(metadata)
+            return True
+        except OSError as e:
+            logger.warning('Cannot save the metadata snapshot to %s: %s', self.path, e)
+            return False
+
+    def is_fresh(self, metadata: Metadata) -> bool:
+        """Whether the metadata is younger than ttl."""
+        return time.time() - metadata.created < self.ttl
+
+    def start_refresh(self) -> bool:
+        """Mark a refresh as started, False if another one is in progress."""
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+            return True
+
+    def finish_refresh(self, metadata: Optional[Metadata]) -> None:
+        """Save the refreshed metadata, if any, and mark the refresh as finished. A failed save is only logged."""
+        try:
+            if metadata is not None:
+                self.try_save(metadata)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def refresh_in_background(self, fetch: Callable[[], Metadata]) -> None:
+        """Download the metadata with fetch in a daemon thread and save it, unless a refresh is in progress."""
+        if not self.start_refresh():
+            return
+
+        def run():
+            metadata = None
+            try:
+                metadata = fetch()
+            except Exception as e:
+                # the stale snapshot stays in use, the next client will try again
+                logger.warning('Cannot refresh the metadata snapshot: %s', e)
+            finally:
+                self.finish_refresh(metadata)
+
+        threading.Thread(target=run, daemon=True).start()
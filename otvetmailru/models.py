@@ -1,7 +1,9 @@
+import collections
 import datetime
+import weakref
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional, List, Union
+from typing import Optional, List, Union, Deque
 
 
 class QuestionState(Enum):
@@ -64,11 +66,33 @@ class AbuseReason:
 class Avatar:
     """
     Avatar wrapper.
+    Avatars are interned: while an avatar is in use, creating one with the same filin returns the same object.
+    A bounded number of recently created avatars is kept alive to be reused by the next requests.
+    Since avatars are shared, filin is read-only: assign Avatar(new_filin) to the model field instead.
     :ivar filin: the filin parameter returned from the API
     """
+    __slots__ = ('_filin', '_url', '__weakref__')
 
-    def __init__(self, filin: str):
-        self.filin = filin
+    _instances: 'weakref.WeakValueDictionary[str, Avatar]' = weakref.WeakValueDictionary()
+    _recent: Deque['Avatar'] = collections.deque(maxlen=4096)
+
+    def __new__(cls, filin: str):
+        avatar = cls._instances.get(filin)
+        if avatar is None:
+            avatar = super().__new__(cls)
+            avatar._filin = filin
+            avatar._url = None
+            cls._instances[filin] = avatar
+            cls._recent.append(avatar)
+        return avatar
+
+    @property
+    def filin(self) -> str:
+        return self._filin
+
+    @filin.setter
+    def filin(self, value: str) -> None:
+        raise AttributeError('Avatars are shared, assign Avatar(filin) to the model field instead')
 
     def with_size(self, width: int, height: int) -> str:
         """
@@ -77,13 +101,18 @@ class Avatar:
         :param height: desired height
         :return: avatar url
         """
-        return str(self) + f'&width={width}&height={height}'
+        return f'{self}&width={width}&height={height}'
 
     def __str__(self):
-        return f'https://filin.mail.ru/pic?d={self.filin}'
+        if self._url is None:
+            self._url = f'https://filin.mail.ru/pic?d={self._filin}'
+        return self._url
 
     def __repr__(self):
-        return f'Avatar({self.filin!r})'
+        return f'Avatar({self._filin!r})'
+
+    def __reduce__(self):
+        return Avatar, (self._filin,)
 
 
 @dataclass(frozen=True, eq=False)
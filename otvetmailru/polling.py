@@ -0,0 +1,336 @@
+import heapq
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple, Iterable
+
+from . import models, records
+
+
+@dataclass(frozen=True)
+class AdaptivePolling:
+    """
+    How often to check a list for new items, depending on how fast they appear.
+    The arrival rate is an exponentially weighted average of the rates seen by the previous checks,
+    the next check is made when about target_fill of a page is expected to have arrived.
+
+    :ivar min_delay: minimal interval between checks, in seconds
+    :ivar max_delay: maximal interval between checks, in seconds
+    :ivar target_fill: part of a page that should arrive between checks
+    :ivar smoothing: weight of the last check in the average rate, from 0 to 1
+    """
+    min_delay: float = 2
+    max_delay: float = 120
+    target_fill: float = 0.5
+    smoothing: float = 0.3
+
+    def update_rate(self, rate: Optional[float], count: int, elapsed: float) -> float:
+        """
+        Average arrival rate after a check.
+        :param rate: previous average rate in items per second, None before the first check
+        :param count: number of new items found by the check
+        :param elapsed: seconds since the previous check
+        :return: new average rate
+        """
+        observed = count / max(elapsed, 1e-3)
+        if rate is None:
+            return observed
+        return rate + self.smoothing * (observed - rate)
+
+    def next_delay(self, rate: Optional[float], page_size: int) -> float:
+        """
+        Interval before the next check.
+        :param rate: average arrival rate in items per second, None if unknown
+        :param page_size: number of items on one page
+        """
+        if rate is None:
+            return self.min_delay
+        if rate <= 0:
+            return self.max_delay
+        return min(self.max_delay, max(self.min_delay, self.target_fill * page_size / rate))
+
+
+class NewItemTracker:
+    """
+    Finds new items in a list sorted from new to old, like the list of new questions.
+    When all items on the first page of a check are new, some may have been pushed to the next pages, so the tracker
+    asks for these pages until it reaches a known item or the end of the list, but no more than max_backfill_pages
+    of them.
+    Does not perform any io, so it can be used with any client.
+
+    :ivar last_id: id of the newest known item
+    :ivar offset: offset of the next page to load in this check, None if the check is complete
+    :ivar anchor: id of the first item of the check, to pass as lastid for stable pagination
+    :ivar new_count: number of new items found in this check
+    :ivar skipped: whether the last check stopped before reaching a known item or the end of the list
+    """
+
+    def __init__(self, last_id: int, max_backfill_pages: int = 10, page_size: Optional[int] = None):
+        """
+        :param last_id: id of the newest known item
+        :param max_backfill_pages: maximal number of extra pages to load in one check
+        :param page_size: number of items on a full page, a shorter page is the end of the list;
+            if None, only an empty page is
+        """
+        self.last_id = last_id
+        self.max_backfill_pages = max_backfill_pages
+        self.page_size = page_size
+        self.offset: Optional[int] = None
+        self.anchor: Optional[int] = None
+        self.new_count = 0
+        self.skipped = False
+        self._pages = 0
+        self._seen: Set[int] = set()
+
+    def feed(self, page: List[Any]) -> List[Any]:
+        """
+        Process the next page of a check, the first page of a new check if the previous one is complete.
+        :param page: models, records or raw objects
+        :return: new items on the page
+        """
+        if self.offset is None:
+            self.anchor = records.item_id(page[0]) if page else self.last_id
+            self.new_count = self._pages = 0
+            self.skipped = False
+            self._seen.clear()
+            self.offset = 0
+        fresh = []
+        reached_known = False
+        for item in page:
+            item_id = records.item_id(item)
+            if item_id <= self.last_id:
+                reached_known = True
+            elif item_id not in self._seen:
+                self._seen.add(item_id)
+                fresh.append(item)
+        self.new_count += len(fresh)
+        self.offset += len(page)
+        reached_end = not page or (self.page_size is not None and len(page) < self.page_size)
+        if not reached_known and not reached_end and self._pages < self.max_backfill_pages:
+            self._pages += 1
+        else:
+            self.skipped = not reached_known and not reached_end
+            self.last_id = max(self.last_id, self.anchor)
+            self.offset = None
+        return fresh
+
+
+@dataclass
+class _AnswerCursor:
+    offset: int
+    skip_existing: bool
+    rate: Optional[float] = None
+    last_check: Optional[float] = None
+    new_count: int = 0
+    entry: int = 0
+    # failed checks in a row
+    errors: int = 0
+    # checks without new answers in a row since the state was loaded
+    empty_checks: int = 0
+
+
+class AnswerSchedule:
+    """
+    Which question to check for new answers next, for following many questions at once.
+    Every question has an offset of the next answer and an average answer rate. Questions are kept in a heap
+    by the time of the next check, which adaptive_polling chooses from the rate, so active questions are checked
+    more often.
+    A question is removed when it is added or recorded as resolved, since resolved questions get no new answers.
+    The state is worth loading only for questions that stopped getting answers, and only once in a while,
+    see needs_state.
+    Does not perform any io, so it can be used with any client.
+    """
+
+    def __init__(self, adaptive_polling: AdaptivePolling = None, state_check_interval: int = 10):
+        """
+        :param adaptive_polling: intervals between checks of one question, from 10 seconds to 10 minutes by default
+        :param state_check_interval: load the state of a question on every this many checks in a row
+            that find no new answers
+        """
+        self.adaptive_polling = adaptive_polling or AdaptivePolling(min_delay=10, max_delay=600, target_fill=0.1)
+        self.state_check_interval = state_check_interval
+        self._cursors: Dict[int, _AnswerCursor] = {}
+        # (time.monotonic() of the check, entry number, question id), entries of removed questions are skipped
+        self._heap: List[Tuple[float, int, int]] = []
+        self._entries = itertools.count()
+
+    def add(self, question_id: int, offset: Optional[int] = None, state: models.QuestionState = None) -> None:
+        """
+        Start following a question, the first check is made within adaptive_polling.min_delay.
+        :param question_id: question id
+        :param offset: number of answers that are already known, None to skip all answers existing at the first check
+        :param state: state of the question, resolved questions are not added
+        """
+        if state is models.QuestionState.resolve:
+            self.remove(question_id)
+            return
+        self._cursors[question_id] = _AnswerCursor(offset or 0, offset is None)
+        # spread the first checks of many questions
+        self._push(question_id, time.monotonic() + random.uniform(0, self.adaptive_polling.min_delay))
+
+    def remove(self, question_id: int) -> None:
+        """Stop following a question."""
+        self._cursors.pop(question_id, None)
+
+    def _push(self, question_id: int, when: float) -> None:
+        cursor = self._cursors[question_id]
+        cursor.entry = next(self._entries)
+        heapq.heappush(self._heap, (when, cursor.entry, question_id))
+
+    def __contains__(self, question_id: int) -> bool:
+        return question_id in self._cursors
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    def next_check(self) -> Optional[Tuple[float, int]]:
+        """
+        The next check to make.
+        :return: time.monotonic() of the check and the question id, or None if no questions are followed
+        """
+        heap = self._heap
+        while heap and (heap[0][2] not in self._cursors or self._cursors[heap[0][2]].entry != heap[0][1]):
+            heapq.heappop(heap)
+        return (heap[0][0], heap[0][2]) if heap else None
+
+    def offset(self, question_id: int) -> int:
+        """Offset of the first answer to load in the next check of a question."""
+        return self._cursors[question_id].offset
+
+    def needs_state(self, question_id: int) -> bool:
+        """Whether a check of a question that found no new answers should load its state too."""
+        cursor = self._cursors.get(question_id)
+        return cursor is not None and cursor.empty_checks + 1 >= self.state_check_interval
+
+    def record(self, question_id: int, answer_count: int, page_size: int,
+               state: models.QuestionState = None) -> bool:
+        """
+        Schedule the next check of a question after a check.
+        A full page is followed by a check of the next page at once.
+        :param question_id: question id
+        :param answer_count: number of answers loaded by the check
+        :param page_size: maximal number of answers that could be loaded
+        :param state: state of the question if the check loaded it, a resolved question is removed
+        :return: whether the loaded answers are new, False for the answers skipped at the first check
+        and for questions removed during the check
+        """
+        cursor = self._cursors.get(question_id)
+        if cursor is None:
+            return False
+        is_new = not cursor.skip_existing
+        cursor.offset += answer_count
+        cursor.errors = 0
+        if answer_count or state is not None:
+            cursor.empty_checks = 0
+        else:
+            cursor.empty_checks += 1
+        if state is models.QuestionState.resolve:
+            self.remove(question_id)
+            return is_new
+        now = time.monotonic()
+        if answer_count >= page_size:
+            cursor.new_count += answer_count if is_new else 0
+            self._push(question_id, now)
+            return is_new
+        cursor.skip_existing = False
+        if cursor.last_check is not None:
+            new_count = cursor.new_count + (answer_count if is_new else 0)
+            cursor.rate = self.adaptive_polling.update_rate(cursor.rate, new_count, now - cursor.last_check)
+        cursor.last_check = now
+        cursor.new_count = 0
+        self._push(question_id, now + self.adaptive_polling.next_delay(cursor.rate, page_size))
+        return is_new
+
+    def record_failure(self, question_id: int) -> None:
+        """
+        Schedule the next check of a question after a check that failed, like with a network error
+        or because a rate limit is spent.
+        The check is repeated after adaptive_polling.min_delay, doubled after every failure in a row
+        up to adaptive_polling.max_delay.
+        :param question_id: question id
+        """
+        cursor = self._cursors.get(question_id)
+        if cursor is None:
+            return
+        delay = self.adaptive_polling.min_delay * 2 ** cursor.errors
+        if delay < self.adaptive_polling.max_delay:
+            cursor.errors += 1
+        else:
+            delay = self.adaptive_polling.max_delay
+        self._push(question_id, time.monotonic() + delay)
+
+
+@dataclass
+class WatchlistChange:
+    """
+    Change of a watched question between two syncs of the watchlist.
+    Answer counts and states are in the output mode of the sync, like the question itself.
+
+    :ivar question_id: question id
+    :ivar question: question from the watchlist, None if it is not watched anymore
+    :ivar answer_count: current number of answers, None if the question is not watched anymore
+    :ivar state: current state, None if the question is not watched anymore
+    :ivar previous_answer_count: number of answers at the previous sync, None if the question was not watched
+    :ivar previous_state: state at the previous sync, None if the question was not watched
+    :ivar new_answers: answers added since the previous sync, if they were loaded
+    """
+    question_id: int
+    question: Any
+    answer_count: Optional[int]
+    state: Any
+    previous_answer_count: Optional[int]
+    previous_state: Any
+    new_answers: List[Any] = field(default_factory=list)
+
+    @property
+    def answers_to_load(self) -> int:
+        """Number of answers added since the previous sync, 0 if answers were removed."""
+        if self.answer_count is None or self.previous_answer_count is None:
+            return 0
+        return max(0, self.answer_count - self.previous_answer_count)
+
+
+def _count_and_state(question: Any) -> Tuple[int, Any]:
+    if isinstance(question, dict):
+        return int(question['anscnt']), question['state']
+    return question.answer_count, question.state
+
+
+class WatchlistSnapshot:
+    """
+    Last seen answer counts and states of watched questions, to find the changed ones after a scan of the watchlist.
+    The first scan only fills the snapshot. All scans of one snapshot should use the same output mode.
+    Does not perform any io, so it can be used with any client.
+    """
+
+    def __init__(self):
+        # question id -> (answer count, state)
+        self.questions: Dict[int, Tuple[int, Any]] = {}
+        self.synced = False
+
+    def update(self, questions: Iterable[Any]) -> List[WatchlistChange]:
+        """
+        Compare a full scan of the watchlist with the snapshot and remember the scan.
+        :param questions: all watched questions, models, records or raw objects
+        :return: questions with a new answer count or state, newly watched and not watched anymore questions
+        """
+        current = {}
+        found = {}
+        for question in questions:
+            question_id = records.item_id(question)
+            if question_id not in current:
+                current[question_id] = _count_and_state(question)
+                found[question_id] = question
+        changes = []
+        if self.synced:
+            for question_id, (answer_count, state) in current.items():
+                previous = self.questions.get(question_id, (None, None))
+                if previous != (answer_count, state):
+                    changes.append(WatchlistChange(question_id, found[question_id], answer_count, state, *previous))
+            for question_id, previous in self.questions.items():
+                if question_id not in current:
+                    changes.append(WatchlistChange(question_id, None, None, None, *previous))
+        self.questions = current
+        self.synced = True
+        return changes
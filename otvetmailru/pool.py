@@ -0,0 +1,211 @@
+"""
+Several accounts used as one client, for workloads capped by the daily limits of a single account.
+
+Use OtvetClientPool.from_auth_info with the auth_info strings of the accounts.
+"""
+import dataclasses
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional, TypeVar
+
+from . import error, models
+from .base import CategoryInput, QuestionInput, AnswerInput, OptionInput
+from .client import OtvetClient
+
+
+T = TypeVar('T')
+
+# fields of LimitSet, the names of the limits
+LIMITS = frozenset(f.name for f in dataclasses.fields(models.LimitSet))
+
+
+@dataclass
+class _Account:
+    client: OtvetClient
+    # remaining limits as counted locally, None if they could not be loaded
+    remaining: Optional[models.LimitSet] = None
+    # time.monotonic() of the last get_limits, None if the limits should be loaded before the next write
+    refreshed: Optional[float] = None
+    # number of the last write, to rotate between accounts with equal limits
+    last_write: int = 0
+
+
+class OtvetClientPool:
+    """
+    Clients authenticated as different users.
+    Every write goes to the account that has the most of the needed daily limit left. The remaining limits are
+    loaded with get_limits and then counted locally, every write takes one from its account; they are loaded
+    again after limits_ttl seconds, and before the next write of an account whose write failed.
+    A write that fails because the server says the limit is spent (see OtvetAPIError.is_limit_error) sets its count
+    on the account to 0. A write that fails with another library error, like a transport error, is not counted.
+    Accounts whose limits cannot be loaded (like ones with an expired session) get no writes until the next load.
+    The pool has no read methods: reader() returns the clients in turn, so that reads made with it are spread
+    over the accounts. Each client has its own session and connection pool, unless a session or a transport
+    is passed to all of them. Reads that depend on the account, like the watchlist, should use a specific client
+    from clients.
+    Thread-safe.
+
+    :ivar clients: clients of the pool
+    :ivar limits_ttl: how long to count the limits locally before loading them again, in seconds
+    """
+
+    def __init__(self, clients: Iterable[OtvetClient], *, limits_ttl: float = 600,
+                 limit_error: Callable[[error.OtvetAPIError], bool] = None):
+        """
+        :param clients: authenticated clients
+        :param limits_ttl: how long to count the limits locally before loading them again, in seconds
+        :param limit_error: whether an api error of a write says that its limit is spent,
+            OtvetAPIError.is_limit_error by default
+        """
+        self.clients: List[OtvetClient] = list(clients)
+        if not self.clients:
+            raise error.OtvetArgumentError('A client pool needs at least one client')
+        self.limits_ttl = limits_ttl
+        self._limit_error = limit_error
+        self._accounts = [_Account(client) for client in self.clients]
+        self._lock = threading.Lock()
+        # held while the limits are loaded, so that concurrent writes load them once
+        self._refresh_lock = threading.Lock()
+        self._reads = itertools.count()
+        self._writes = itertools.count(1)
+
+    @classmethod
+    def from_auth_info(cls, auth_infos: Iterable[str], *, limits_ttl: float = 600,
+                       limit_error: Callable[[error.OtvetAPIError], bool] = None,
+                       **client_args: Any) -> 'OtvetClientPool':
+        """
+        Create a pool of clients restored from auth_info strings.
+        :param auth_infos: strings returned by auth_info property of the clients
+        :param limits_ttl: how long to count the limits locally before loading them again, in seconds
+        :param limit_error: whether an api error of a write says that its limit is spent,
+            OtvetAPIError.is_limit_error by default
+        :param client_args: other arguments for every OtvetClient, like rate_limiter or cache
+        """
+        return cls([OtvetClient(auth_info=auth_info, **client_args) for auth_info in auth_infos],
+                   limits_ttl=limits_ttl, limit_error=limit_error)
+
+    def reader(self) -> OtvetClient:
+        """Client for the next read request, the clients take turns."""
+        return self.clients[next(self._reads) % len(self.clients)]
+
+    def _load_limits(self, accounts: List[_Account]) -> None:
+        for account in accounts:
+            try:
+                remaining = account.client.get_limits().current
+            except error.OtvetError:
+                remaining = None
+            with self._lock:
+                account.remaining = remaining
+                account.refreshed = time.monotonic()
+
+    def refresh_limits(self) -> None:
+        """Load the remaining limits of all accounts."""
+        with self._refresh_lock:
+            self._load_limits(self._accounts)
+
+    def _refresh_stale(self) -> None:
+        with self._refresh_lock:
+            now = time.monotonic()
+            with self._lock:
+                stale = [a for a in self._accounts if a.refreshed is None or now - a.refreshed >= self.limits_ttl]
+            self._load_limits(stale)
+
+    def remaining(self, limit: str) -> int:
+        """
+        Total of a daily limit left on all accounts, as counted locally.
+        :param limit: field of LimitSet, like 'answers'
+        """
+        if limit not in LIMITS:
+            raise error.OtvetArgumentError(f'Unknown limit: {limit}')
+        with self._lock:
+            return sum(getattr(a.remaining, limit) for a in self._accounts if a.remaining is not None)
+
+    def writer(self, limit: str) -> OtvetClient:
+        """
+        Take one of a daily limit from the account that has the most of it left.
+        :param limit: field of LimitSet that the write spends, like 'answers'
+        :return: client of the account
+        :raises OtvetLimitError: if no account has the limit left
+        """
+        if limit not in LIMITS:
+            raise error.OtvetArgumentError(f'Unknown limit: {limit}')
+        self._refresh_stale()
+        with self._lock:
+            accounts = [a for a in self._accounts if a.remaining is not None and getattr(a.remaining, limit) > 0]
+            if not accounts:
+                raise error.OtvetLimitError(limit)
+            # the least recently used of the accounts with the most left
+            account = max(accounts, key=lambda a: (getattr(a.remaining, limit), -a.last_write))
+            setattr(account.remaining, limit, getattr(account.remaining, limit) - 1)
+            account.last_write = next(self._writes)
+            return account.client
+
+    def write(self, limit: str, call: Callable[[OtvetClient], T]) -> T:
+        """
+        Make a write request with the account that has the most of a daily limit left.
+        :param limit: field of LimitSet that the write spends, like 'answers'
+        :param call: function making the request with the client of the account
+        :return: result of call
+        :raises OtvetLimitError: if no account has the limit left
+        """
+        client = self.writer(limit)
+        try:
+            return call(client)
+        except error.OtvetAPIError as e:
+            limit_error = e.is_limit_error if self._limit_error is None else self._limit_error(e)
+            with self._lock:
+                account = self._accounts[self.clients.index(client)]
+                if limit_error and account.remaining is not None:
+                    # spent elsewhere, like by another pool or on the site, the account gets no such writes
+                    # until the next load of its limits
+                    setattr(account.remaining, limit, 0)
+                else:
+                    # the local count may be wrong
+                    account.refreshed = None
+            raise
+        except error.OtvetError:
+            with self._lock:
+                account = self._accounts[self.clients.index(client)]
+                # the write most likely did not happen, the limits are loaded before the next write to make sure
+                if account.remaining is not None:
+                    setattr(account.remaining, limit, getattr(account.remaining, limit) + 1)
+                account.refreshed = None
+            raise
+
+    def add_question(self, category: CategoryInput, title: str, text: str = "", *,
+                     allow_comments: bool = True, watch: bool = True) -> int:
+        """
+        Ask a question with the account that has the most questions left.
+        :return: question id
+        """
+        return self.write('questions', lambda client: client.add_question(
+            category, title, text, allow_comments=allow_comments, watch=watch))
+
+    def add_answer(self, question: QuestionInput, text: str) -> int:
+        """
+        Answer a question with the account that has the most answers left.
+        :return: answer id
+        """
+        return self.write('answers', lambda client: client.add_answer(question, text))
+
+    def vote_in_poll(self, question: QuestionInput, options: List[OptionInput]) -> None:
+        """Vote in a poll with the account that has the most poll votes left."""
+        self.write('poll_votes', lambda client: client.vote_in_poll(question, options))
+
+    def vote_for_best_answer(self, question: QuestionInput, answer: AnswerInput) -> None:
+        """Vote for the best answer with the account that has the most votes left."""
+        self.write('best_answer_votes', lambda client: client.vote_for_best_answer(question, answer))
+
+    def like_question(self, question: QuestionInput) -> None:
+        """Like a question with the account that has the most likes left."""
+        self.write('likes', lambda client: client.like_question(question))
+
+    def like_answer(self, answer: AnswerInput) -> None:
+        """Like an answer with the account that has the most likes left."""
+        self.write('likes', lambda client: client.like_answer(answer))
+
+    def recommend_to_golden(self, question: QuestionInput) -> None:
+        """Recommend a question to golden with the account that has the most recommendations left."""
+        self.write('best_question_recommends', lambda client: client.recommend_to_golden(question))
@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+from typing import Optional, Dict, Tuple, Callable
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+from . import error
+
+
+Budget = Tuple[float, float]
+
+_GLOBAL = '*'
+
+
+class RateLimiter:
+    """
+    Client-side token bucket rate limiter.
+    There is a global bucket for all requests and optional separate buckets for api methods,
+    a request has to fit into both of them.
+    Can be shared between clients and threads. When a state file is given, the buckets are
+    stored in that file under an exclusive lock, so several processes share the same budget;
+    then reserve does blocking file io, and AsyncOtvetClient calls it in the default executor.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: float = 1, *,
+                 endpoints: Dict[str, Budget] = None, path: str = None, clock: Callable[[], float] = None):
+        """
+        :param rate: allowed number of requests per second, no global limit by default
+        :param burst: how many requests can be sent at once after a period of inactivity
+        :param endpoints: (rate, burst) budgets for specific api methods like '/v2/addans'
+        :param path: file to keep the state in, to share the limits between processes (POSIX only)
+        :param clock: current time in seconds, time.monotonic by default, time.time if path is given
+            (it must be the same in all processes then)
+        """
+        if path is not None and fcntl is None:
+            raise error.OtvetArgumentError('Shared rate limiter state is not supported on this platform')
+        self._budgets: Dict[str, Budget] = dict(endpoints or {})
+        if rate is not None:
+            self._budgets[_GLOBAL] = (rate, burst)
+        self._path = path
+        self._clock = clock or (time.time if path is not None else time.monotonic)
+        self._lock = threading.Lock()
+        self._state: Dict[str, float] = {}
+
+    @property
+    def path(self) -> Optional[str]:
+        """State file, None if the state is kept in memory."""
+        return self._path
+
+    def reserve(self, endpoint: str) -> float:
+        """
+        Take a token for a request to an api method.
+        :param endpoint: api method
+        :return: number of seconds to wait before sending the request
+        """
+        keys = [k for k in (_GLOBAL, endpoint) if k in self._budgets]
+        if not keys:
+            return 0.
+        with self._lock:
+            if self._path is None:
+                return self._reserve(self._state, keys)
+            with open(self._path, 'a+') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    content = f.read()
+                    state = json.loads(content) if content else {}
+                    delay = self._reserve(state, keys)
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(state))
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                return delay
+
+    def _reserve(self, state: Dict[str, float], keys) -> float:
+        # generic cell rate algorithm: state holds the theoretical arrival time of the next request
+        now = self._clock()
+        start = now
+        for key in keys:
+            rate, burst = self._budgets[key]
+            start = max(start, state.get(key, now) - (burst - 1) / rate)
+        for key in keys:
+            rate, burst = self._budgets[key]
+            state[key] = max(state.get(key, now), start) + 1 / rate
+        return start - now
+
+    def acquire(self, endpoint: str) -> None:
+        """Block until a request to an api method is allowed."""
+        delay = self.reserve(endpoint)
+        if delay > 0:
+            time.sleep(delay)
@@ -1,3 +1,4 @@
+import bisect
 from typing import List
 
 from .models import Rate
@@ -37,14 +38,30 @@ def _fill_rates():
 _fill_rates()
 
 _by_name = {r.name.lower(): r for r in rates}
+_by_exact_name = {r.name: r for r in rates}
+
+# distinct min_points values in ascending order, and the rates for each of them by min_kpd descending
+_thresholds: List[int] = sorted({r.min_points for r in rates})
+_rates_by_threshold: List[List[Rate]] = [
+    sorted((r for r in rates if r.min_points == threshold), key=lambda r: r.min_kpd, reverse=True)
+    for threshold in _thresholds
+]
 
 
 def by_user_stats(points: int, kpd: float) -> Rate:
     """Get a rate by points and kpd"""
-    return max([r for r in rates if r.min_points <= points and r.min_kpd <= kpd],
-               key=lambda r: (r.min_points, r.min_kpd))
+    index = bisect.bisect_right(_thresholds, points) - 1
+    if index < 0:
+        raise ValueError(f'No rate for {points} points')
+    for rate in _rates_by_threshold[index]:
+        if rate.min_kpd <= kpd:
+            return rate
+    raise ValueError(f'No rate for {points} points and kpd {kpd}')
 
 
 def by_name(name: str) -> Rate:
     """Get a rate by name, case-insensitive"""
-    return _by_name[name.lower()]
+    rate = _by_exact_name.get(name)
+    if rate is None:
+        rate = _by_name[name.lower()]
+    return rate
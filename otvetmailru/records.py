@@ -0,0 +1,81 @@
+"""
+Lightweight records and raw output, for bulk export.
+
+Every dataclass from otvetmailru.models (except Rate and Category) has a namedtuple counterpart here with the
+same name and fields. Records are built by the same factories, but values that the models turn into objects
+stay as the api returns them: enums are their codes ('A', 'V', ''), avatars are filin strings, rates are rank
+names and categories are ids (names in search results). Numbers, flags and timestamps are converted as usual.
+
+Use output='records' or output='raw' in the page and iterate methods of the client, see also
+otvetmailru.columnar for columnar output.
+"""
+import collections
+import dataclasses
+import enum
+import types
+from typing import Any
+
+from . import models, factories as factories_, rates as rates_
+
+
+class _RawEnum:
+    """Stand-in for an enum class that gives the raw values instead of the members."""
+
+    def __init__(self, enum_class: enum.EnumMeta):
+        for member in enum_class:
+            setattr(self, member.name, member.value)
+
+    def __call__(self, value: Any) -> Any:
+        return value
+
+
+class _RawRates:
+    """Stand-in for otvetmailru.rates that gives rank names."""
+
+    @staticmethod
+    def by_name(name: str) -> str:
+        return name
+
+    @staticmethod
+    def by_user_stats(points: int, kpd: float) -> str:
+        return rates_.by_user_stats(points, kpd).name
+
+
+class RawCategories:
+    """Category provider that keeps the category ids and names without loading the category tree."""
+
+    def by_id(self, category_id: int) -> int:
+        return category_id
+
+    def by_name(self, name: str) -> str:
+        return name
+
+
+def _build_records(namespace: dict) -> types.SimpleNamespace:
+    model_names = {}
+    for name, value in list(vars(models).items()):
+        if isinstance(value, enum.EnumMeta):
+            model_names[name] = _RawEnum(value)
+        elif isinstance(value, type) and dataclasses.is_dataclass(value) and value not in (models.Rate,
+                                                                                          models.Category):
+            record = collections.namedtuple(name, [f.name for f in dataclasses.fields(value)])
+            record.__module__ = __name__
+            model_names[name] = namespace[name] = record
+    model_names['Avatar'] = str
+    return types.SimpleNamespace(**model_names)
+
+
+def item_id(item: Any) -> int:
+    """Id of a model, a record or a raw api object."""
+    if isinstance(item, dict):
+        return int(item['id'] if 'id' in item else item['qid'])
+    return item.id
+
+
+def _keep_raw(data: Any, *args: Any) -> Any:
+    return data
+
+
+factories = factories_.bind(_build_records(globals()), rates=_RawRates)
+categories = RawCategories()
+raw_factories = types.SimpleNamespace(**{name: _keep_raw for name in vars(factories) if name.startswith('build_')})
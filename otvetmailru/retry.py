@@ -0,0 +1,72 @@
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Dict, FrozenSet
+
+from . import error
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed http request.
+    Delays grow exponentially and are randomized (full jitter), so that many clients
+    do not retry at the same moment.
+    Connection errors are always retryable. Timeouts, http errors with a status from retry_statuses and
+    undecodable responses are retried only for read methods unless retry_writes is set,
+    because the server may have already processed the request.
+
+    :ivar attempts: total number of attempts, including the first one
+    :ivar base_delay: delay before the first retry, in seconds
+    :ivar multiplier: delay growth factor
+    :ivar max_delay: maximal delay between attempts, in seconds
+    :ivar jitter: choose a random delay between zero and the computed one
+    :ivar deadline: total time in seconds after which no more retries are made
+    :ivar retry_statuses: http statuses considered transient
+    :ivar retry_writes: retry write methods on errors that may occur after the request was processed
+    :ivar overrides: policies for specific api methods like '/v2/question'
+    :ivar rng: random number generator for the jitter, the random module by default
+    """
+    attempts: int = 4
+    base_delay: float = 0.5
+    multiplier: float = 2
+    max_delay: float = 10
+    jitter: bool = True
+    deadline: Optional[float] = None
+    retry_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+    retry_writes: bool = False
+    overrides: Dict[str, 'RetryPolicy'] = field(default_factory=dict, compare=False)
+    rng: Optional[random.Random] = field(default=None, compare=False, repr=False)
+
+    def for_method(self, method: str) -> 'RetryPolicy':
+        """Policy to use for an api method."""
+        return self.overrides.get(method, self)
+
+    def is_retryable(self, exc: error.OtvetTransportError, is_write: bool) -> bool:
+        """Whether a request failed with this error may be repeated."""
+        if isinstance(exc, error.OtvetConnectionError):
+            return True
+        if is_write and not self.retry_writes:
+            return False
+        if isinstance(exc, error.OtvetHTTPError):
+            return exc.status_code in self.retry_statuses
+        return isinstance(exc, (error.OtvetTimeoutError, error.OtvetDecodeError))
+
+    def next_delay(self, attempt: int, exc: error.OtvetTransportError, is_write: bool,
+                   started: float) -> Optional[float]:
+        """
+        Decide whether to retry after a failed attempt.
+        :param attempt: number of the failed attempt, starting from 0
+        :param exc: error of the failed attempt
+        :param is_write: whether the request changes something on the server
+        :param started: time.monotonic() of the first attempt
+        :return: seconds to wait before the next attempt, or None to give up
+        """
+        if attempt + 1 >= self.attempts or not self.is_retryable(exc, is_write):
+            return None
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** attempt)
+        if self.jitter:
+            delay = (self.rng or random).uniform(0, delay)
+        if self.deadline is not None and time.monotonic() + delay > started + self.deadline:
+            return None
+        return delay
@@ -0,0 +1,110 @@
+"""
+Coalescing of identical concurrent calls.
+
+With coalesce_requests=True the clients pass every read request through a SingleFlight keyed on the method,
+the parameters and the user, so several threads (or coroutines) asking for the same page at the same time make
+one network request and get the same decoded response. Write requests are never coalesced.
+The callers get the same response object, so it should not be modified.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from . import utils
+
+
+R = TypeVar('R')
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while a call with some key is running, other calls with the same key
+    wait for it and get its result or error instead of running again.
+    Calls are not cached after they complete. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], R]) -> R:
+        """
+        Run func, or wait for the running call with the same key.
+        :param key: identity of the call
+        :param func: function to run
+        :return: result of func
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    Same as SingleFlight, for coroutines of one event loop.
+    If the running call is cancelled, the waiting callers run the call again.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[R]]) -> R:
+        """
+        Run func, or wait for the running call with the same key.
+        :param key: identity of the call
+        :param func: coroutine function to run
+        :return: result of func
+        """
+        while key in self._calls:
+            future = self._calls[key]
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+        future = utils.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # the error is raised here, waiters are optional
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            del self._calls[key]
+        return result
@@ -0,0 +1,179 @@
+import json
+import re
+from typing import Any, List, Sequence, Tuple
+
+
+_TOKEN_RE = re.compile(rb'[{}\[\]",]')
+_STRING_RE = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_WHITESPACE_RE = json.decoder.WHITESPACE
+# the last digit of a number and the characters that may continue it
+_NUMBER_TAIL_RE = re.compile(r'[0-9][0-9eE+\-.]*')
+
+_QUOTE, _COMMA = ord('"'), ord(',')
+_OPEN_OBJECT, _OPEN_ARRAY = ord('{'), ord('[')
+
+_decoder = json.JSONDecoder()
+
+
+def _decode_utf8(data: bytearray, start: int) -> str:
+    """Decode the data from start, leaving out a character split at the end."""
+    try:
+        return data[start:].decode()
+    except UnicodeDecodeError as e:
+        if e.reason != 'unexpected end of data':
+            raise
+        return data[start:start + e.start].decode()
+
+
+class JsonArrayStream:
+    """
+    Incremental parser that extracts the items of one array from a json document fed in chunks.
+    Only the items of one chunk are kept at a time, each item is decoded with the C scanner of the json module.
+    The rest of the document is kept as a skeleton with the array emptied, to check the response status
+    after the end.
+    Does not perform any io, so it can be used with any transport.
+    """
+
+    def __init__(self, path: Sequence[str]):
+        """
+        :param path: keys of nested objects that lead to the array, like ('comments', 'comments')
+        """
+        self._path = list(path)
+        self._buffer = bytearray()
+        self._pos = 0
+        # open containers outside the items: [is_object, current key, expecting a key]
+        self._stack: List[list] = []
+        self._in_array = False
+        self._item_start = 0
+        self._need_separator = False
+        self._retry_size = 0
+        self._skeleton = bytearray()
+        self._skeleton_from = 0
+        self.found = False
+
+    def _at_path(self) -> bool:
+        return (len(self._stack) == len(self._path)
+                and all(frame[0] and frame[1] == key for frame, key in zip(self._stack, self._path)))
+
+    def _scan(self) -> bool:
+        """Parse the document outside the array, return True when the array starts."""
+        buffer = self._buffer
+        stack = self._stack
+        pos = self._pos
+        while True:
+            match = _TOKEN_RE.search(buffer, pos)
+            if match is None:
+                self._pos = len(buffer)
+                return False
+            start = match.start()
+            char = buffer[start]
+            if char == _QUOTE:
+                string = _STRING_RE.match(buffer, start)
+                if string is None:
+                    # the string continues in the next chunk
+                    self._pos = start
+                    return False
+                pos = string.end()
+                if stack and stack[-1][0] and stack[-1][2]:
+                    stack[-1][1] = json.loads(string.group())
+                    stack[-1][2] = False
+                continue
+            pos = start + 1
+            if char == _OPEN_OBJECT or char == _OPEN_ARRAY:
+                if char == _OPEN_ARRAY and not self.found and self._at_path():
+                    self.found = self._in_array = True
+                    self._skeleton += buffer[self._skeleton_from:pos]
+                    self._item_start = self._pos = pos
+                    return True
+                stack.append([char == _OPEN_OBJECT, None, True])
+            elif char == _COMMA:
+                if stack and stack[-1][0]:
+                    stack[-1][2] = True
+            else:
+                if not stack:
+                    raise ValueError('Unbalanced json document')
+                stack.pop()
+
+    def _read_items(self, items: List[Any], final: bool) -> bool:
+        """Decode the complete items in the buffer, return True when the array ends."""
+        if not final and len(self._buffer) - self._item_start < self._retry_size:
+            return False
+        text = _decode_utf8(self._buffer, self._item_start)
+        length = len(text)
+        pos = 0
+        closed = False
+        while True:
+            pos = _WHITESPACE_RE.match(text, pos).end()
+            if pos == length:
+                break
+            if self._need_separator or text[pos] == ']':
+                if text[pos] == ']':
+                    pos += 1
+                    closed = True
+                    break
+                if text[pos] != ',':
+                    raise ValueError('Expecting , delimiter in the array')
+                pos += 1
+                self._need_separator = False
+                continue
+            try:
+                item, end = _decoder.raw_decode(text, pos)
+            except ValueError:
+                if final:
+                    raise
+                break
+            if not final:
+                tail = _NUMBER_TAIL_RE.match(text, end - 1)
+                if tail is not None and tail.end() == length:
+                    # a number may continue in the next chunk
+                    break
+            items.append(item)
+            pos = end
+            self._need_separator = True
+        consumed = len(text[:pos].encode())
+        self._item_start += consumed
+        if closed:
+            self._in_array = False
+            self._skeleton_from = self._item_start - 1
+            self._pos = self._item_start
+        else:
+            # an unfinished item is decoded again only when the unparsed data has doubled
+            pending = len(self._buffer) - self._item_start
+            self._retry_size = 0 if consumed else 2 * pending
+        return closed
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """
+        Parse the next chunk of the document.
+        :return: array items completed in this chunk
+        """
+        self._buffer += chunk
+        items = []
+        self._parse(items, False)
+        return items
+
+    def _parse(self, items: List[Any], final: bool) -> None:
+        while self._read_items(items, final) if self._in_array else self._scan():
+            pass
+        # drop the processed bytes, keeping the current item and an unfinished string
+        if self._in_array:
+            cut = self._item_start
+            self._item_start = 0
+        else:
+            self._skeleton += self._buffer[self._skeleton_from:self._pos]
+            self._skeleton_from = 0
+            cut = self._pos
+        del self._buffer[:cut]
+        self._pos = max(self._pos - cut, 0)
+
+    def finish(self) -> Tuple[List[Any], Any]:
+        """
+        Finish parsing when the whole document was fed.
+        :return: array items that were not returned by feed yet and the decoded document without the array items
+        """
+        items = []
+        if self._in_array:
+            self._parse(items, True)
+        if self._stack or self._in_array:
+            raise ValueError('Incomplete json document')
+        return items, json.loads(bytes(self._skeleton + self._buffer))
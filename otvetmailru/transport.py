@@ -0,0 +1,338 @@
+import contextlib
+import json
+from typing import (
+    Optional, Dict, Callable, Union, List, Any, NamedTuple, Tuple, Iterable, Iterator, AsyncIterator, Awaitable,
+)
+
+import requests
+import requests.adapters
+
+from . import error
+
+
+Params = Dict[str, Any]
+Timeout = Union[None, float, Tuple[float, float]]
+
+
+class Response:
+    """
+    Http response returned by a transport.
+    :ivar status_code: http status code
+    :ivar content: raw response body
+    :ivar encoding: encoding of the body, utf-8 if unknown
+    """
+
+    def __init__(self, status_code: int, content: bytes, encoding: Optional[str] = None):
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+
+    @property
+    def text(self) -> str:
+        """Response body decoded as a string."""
+        return self.content.decode(self.encoding, errors='replace')
+
+    def json(self) -> Any:
+        """Response body decoded as json."""
+        return json.loads(self.content)
+
+    def __repr__(self):
+        return f'Response({self.status_code}, {len(self.content)} bytes)'
+
+
+def _split_content(content: bytes, chunk_size: int) -> List[bytes]:
+    return [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+
+
+class StreamingResponse:
+    """
+    Http response with a body that is read in chunks.
+    :ivar status_code: http status code
+    """
+
+    def __init__(self, status_code: int, chunks: Iterable[bytes], close: Callable[[], None] = None):
+        """
+        :param status_code: http status code
+        :param chunks: parts of the body
+        :param close: function that releases the connection
+        """
+        self.status_code = status_code
+        self._chunks = chunks
+        self._close = close
+
+    def iter_content(self) -> Iterator[bytes]:
+        """Iterate over the parts of the body."""
+        return iter(self._chunks)
+
+    def close(self) -> None:
+        """Release the connection."""
+        if self._close is not None:
+            self._close()
+
+
+class AsyncStreamingResponse:
+    """
+    Asynchronous version of StreamingResponse.
+    :ivar status_code: http status code
+    """
+
+    def __init__(self, status_code: int, chunks: AsyncIterator[bytes], close: Callable[[], Awaitable[None]] = None):
+        self.status_code = status_code
+        self._chunks = chunks
+        self._close = close
+
+    def iter_content(self) -> AsyncIterator[bytes]:
+        """Iterate over the parts of the body."""
+        return self._chunks
+
+    async def close(self) -> None:
+        """Release the connection."""
+        if self._close is not None:
+            await self._close()
+
+
+class Transport:
+    """
+    Base class for synchronous http transports used by OtvetClient.
+    A transport performs requests and keeps the cookies of the session.
+    """
+
+    def request(self, method: str, url: str, *, params: Params = None, data: Params = None,
+                headers: Dict[str, str] = None) -> Response:
+        """
+        Perform an http request.
+        Connection failures are raised as OtvetConnectionError, timeouts as OtvetTimeoutError.
+        :param method: http method, GET or POST
+        :param url: full url
+        :param params: query string parameters, list values are sent as repeated keys
+        :param data: form parameters, list values are sent as repeated keys
+        :param headers: additional headers
+        :return: response object
+        """
+        raise NotImplementedError
+
+    def get(self, url: str, params: Params = None, headers: Dict[str, str] = None) -> Response:
+        return self.request('GET', url, params=params, headers=headers)
+
+    def post(self, url: str, data: Params = None, headers: Dict[str, str] = None) -> Response:
+        return self.request('POST', url, data=data, headers=headers)
+
+    def stream(self, method: str, url: str, *, params: Params = None, data: Params = None,
+               headers: Dict[str, str] = None, chunk_size: int = 65536) -> StreamingResponse:
+        """
+        Perform an http request and read the response body in chunks, see request.
+        The default implementation reads the whole body at once.
+        :param chunk_size: size of the parts of the body
+        :return: response that must be closed after reading
+        """
+        result = self.request(method, url, params=params, data=data, headers=headers)
+        return StreamingResponse(result.status_code, _split_content(result.content, chunk_size))
+
+    def get_cookie(self, name: str) -> Optional[str]:
+        """Get a session cookie by name, or None."""
+        raise NotImplementedError
+
+    def set_cookie(self, name: str, value: str, domain: str) -> None:
+        """Set a session cookie."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release the connections held by the transport."""
+        pass
+
+
+@contextlib.contextmanager
+def _requests_errors() -> Iterator[None]:
+    try:
+        yield
+    except requests.exceptions.ConnectionError as e:
+        raise error.OtvetConnectionError(str(e)) from e
+    except requests.exceptions.Timeout as e:
+        raise error.OtvetTimeoutError(str(e)) from e
+    except requests.exceptions.RequestException as e:
+        raise error.OtvetTransportError(str(e)) from e
+
+
+class RequestsTransport(Transport):
+    """
+    Transport based on requests.Session with a tunable urllib3 connection pool.
+    """
+
+    def __init__(self, session: requests.Session = None, *, pool_connections: int = None, pool_maxsize: int = None,
+                 pool_block: bool = False, keep_alive: bool = True, timeout: Timeout = None):
+        """
+        :param session: requests session to use, a new one is created by default
+        :param pool_connections: number of per-host connection pools to keep (10 by default)
+        :param pool_maxsize: maximal number of connections kept open to one host (10 by default)
+        :param pool_block: wait for a free connection instead of opening extra ones when a host pool is full
+        :param keep_alive: reuse connections between requests
+        :param timeout: request timeout in seconds, or a (connect, read) tuple; no timeout by default
+        """
+        self._owns_session = session is None
+        self.session = session or requests.Session()
+        if self._owns_session or pool_connections is not None or pool_maxsize is not None or pool_block:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections or 10,
+                                                    pool_maxsize=pool_maxsize or 10, pool_block=pool_block)
+            self.session.mount('https://', adapter)
+            self.session.mount('http://', adapter)
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+
+    def _headers(self, headers: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        # per request, so that a session passed by the caller is not changed
+        if self.keep_alive:
+            return headers
+        return {**(headers or {}), 'Connection': 'close'}
+
+    def request(self, method: str, url: str, *, params: Params = None, data: Params = None,
+                headers: Dict[str, str] = None) -> Response:
+        with _requests_errors():
+            result = self.session.request(method, url, params=params, data=data, headers=self._headers(headers),
+                                          timeout=self.timeout)
+            return Response(result.status_code, result.content, result.encoding)
+
+    def stream(self, method: str, url: str, *, params: Params = None, data: Params = None,
+               headers: Dict[str, str] = None, chunk_size: int = 65536) -> StreamingResponse:
+        with _requests_errors():
+            result = self.session.request(method, url, params=params, data=data, headers=self._headers(headers),
+                                          timeout=self.timeout, stream=True)
+
+        def chunks():
+            with _requests_errors():
+                yield from result.iter_content(chunk_size)
+
+        return StreamingResponse(result.status_code, chunks(), result.close)
+
+    def get_cookie(self, name: str) -> Optional[str]:
+        return self.session.cookies.get(name)
+
+    def set_cookie(self, name: str, value: str, domain: str) -> None:
+        self.session.cookies.set(name, value, domain=domain)
+
+    def close(self) -> None:
+        if self._owns_session:
+            self.session.close()
+
+
+class Request(NamedTuple):
+    """Request recorded by a fake transport."""
+    method: str
+    url: str
+    params: Params
+
+
+FakeHandler = Callable[[Params], Union[Response, dict, str]]
+
+
+class FakeTransport(Transport):
+    """
+    In-process transport for tests, no network is involved.
+    Handlers receive request parameters and return a dict (sent as json), a string (sent as text) or a Response.
+    Api calls are routed by the api method name (like '/v2/question'), other requests by url without the query.
+
+    :ivar requests: all requests performed, in order
+    :ivar cookies: session cookies by name
+    """
+
+    def __init__(self, handlers: Dict[str, FakeHandler] = None, main_page: str = ''):
+        """
+        :param handlers: handlers by api method name or url
+        :param main_page: html returned for the main page
+        """
+        self.handlers: Dict[str, FakeHandler] = {'https://otvet.mail.ru/': lambda params: main_page}
+        self.handlers.update(handlers or {})
+        self.requests: List[Request] = []
+        self.cookies: Dict[str, str] = {}
+
+    def route(self, key: str, handler: FakeHandler) -> None:
+        """Add a handler for an api method name or url."""
+        self.handlers[key] = handler
+
+    def _handle(self, method: str, url: str, params: Params, data: Params) -> Response:
+        params = {**(params or {}), **(data or {})}
+        self.requests.append(Request(method, url, params))
+        key = params.get('__urlp') or url.split('?')[0]
+        if key not in self.handlers:
+            return Response(404, b'{"status": 404, "error": "not_found"}')
+        result = self.handlers[key](params)
+        if isinstance(result, Response):
+            return result
+        if isinstance(result, str):
+            return Response(200, result.encode())
+        return Response(200, json.dumps(result).encode())
+
+    def request(self, method: str, url: str, *, params: Params = None, data: Params = None,
+                headers: Dict[str, str] = None) -> Response:
+        return self._handle(method, url, params, data)
+
+    def get_cookie(self, name: str) -> Optional[str]:
+        return self.cookies.get(name)
+
+    def set_cookie(self, name: str, value: str, domain: str) -> None:
+        self.cookies[name] = value
+
+
+class AsyncTransport:
+    """
+    Base class for asynchronous http transports used by AsyncOtvetClient.
+    Same as Transport, but request methods are coroutines.
+    """
+
+    async def request(self, method: str, url: str, *, params: Params = None, data: Params = None,
+                      headers: Dict[str, str] = None) -> Response:
+        """Perform an http request, see Transport.request."""
+        raise NotImplementedError
+
+    async def get(self, url: str, params: Params = None, headers: Dict[str, str] = None) -> Response:
+        return await self.request('GET', url, params=params, headers=headers)
+
+    async def post(self, url: str, data: Params = None, headers: Dict[str, str] = None) -> Response:
+        return await self.request('POST', url, data=data, headers=headers)
+
+    async def stream(self, method: str, url: str, *, params: Params = None, data: Params = None,
+                     headers: Dict[str, str] = None, chunk_size: int = 65536) -> AsyncStreamingResponse:
+        """
+        Perform an http request and read the response body in chunks, see Transport.stream.
+        The default implementation reads the whole body at once.
+        """
+        result = await self.request(method, url, params=params, data=data, headers=headers)
+
+        async def chunks():
+            for chunk in _split_content(result.content, chunk_size):
+                yield chunk
+
+        return AsyncStreamingResponse(result.status_code, chunks())
+
+    def get_cookie(self, name: str) -> Optional[str]:
+        """Get a session cookie by name, or None."""
+        raise NotImplementedError
+
+    def set_cookie(self, name: str, value: str, domain: str) -> None:
+        """Set a session cookie."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release the connections held by the transport."""
+        pass
+
+
+class FakeAsyncTransport(FakeTransport, AsyncTransport):
+    """Asynchronous version of FakeTransport."""
+
+    async def request(self, method: str, url: str, *, params: Params = None, data: Params = None,
+                      headers: Dict[str, str] = None) -> Response:
+        return self._handle(method, url, params, data)
+
+    async def get(self, url: str, params: Params = None, headers: Dict[str, str] = None) -> Response:
+        return await self.request('GET', url, params=params, headers=headers)
+
+    async def post(self, url: str, data: Params = None, headers: Dict[str, str] = None) -> Response:
+        return await self.request('POST', url, data=data, headers=headers)
+
+    async def stream(self, method: str, url: str, *, params: Params = None, data: Params = None,
+                     headers: Dict[str, str] = None, chunk_size: int = 65536) -> AsyncStreamingResponse:
+        return await AsyncTransport.stream(self, method, url, params=params, data=data, headers=headers,
+                                           chunk_size=chunk_size)
+
+    async def close(self) -> None:
+        pass
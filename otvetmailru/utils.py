@@ -1,5 +1,24 @@
+import asyncio
 import json
-from typing import Any
+from typing import Any, Union, Optional
+
+from . import error
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+_decoder = json.JSONDecoder()
+
+# python 3.6 has no get_running_loop, its get_event_loop returns the running loop when called from a coroutine
+get_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
 
 
 def update_not_none(params: dict, changes: dict) -> None:
@@ -8,8 +27,75 @@ def update_not_none(params: dict, changes: dict) -> None:
             params[k] = v
 
 
-def read_json_prefix(string: str) -> Any:
-    try:
-        return json.loads(string)
-    except json.JSONDecodeError as e:
-        return json.loads(string[:e.pos])
+class JsonBackend:
+    """
+    Json decoder used for api responses, based on the json module.
+    Subclass it to plug in another decoder.
+    The values embedded in the main page are always decoded with the json module, see read_json_prefix.
+    """
+    name = 'json'
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode a json document, raise ValueError if it is invalid."""
+        return json.loads(data)
+
+
+class OrjsonBackend(JsonBackend):
+    """
+    Json backend based on orjson.
+    Documents that orjson rejects, like lone surrogate escapes or NaN, are decoded with the json module.
+    Integers that do not fit into 64 bits are decoded as floats.
+    """
+    name = 'orjson'
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            return json.loads(data)
+
+
+class UjsonBackend(JsonBackend):
+    """
+    Json backend based on ujson.
+    Documents that ujson rejects are decoded with the json module.
+    """
+    name = 'ujson'
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        try:
+            return ujson.loads(data)
+        except ValueError:
+            return json.loads(data)
+
+
+_BACKENDS = {
+    'orjson': (OrjsonBackend, lambda: orjson),
+    'ujson': (UjsonBackend, lambda: ujson),
+    'json': (JsonBackend, lambda: json),
+}
+
+
+def get_json_backend(name: Optional[str] = None) -> JsonBackend:
+    """
+    Get a json backend by name.
+    orjson and ujson are faster, but may decode some documents differently from the json module, see their backends.
+    :param name: 'orjson', 'ujson' or 'json' (default)
+    """
+    if name is None:
+        name = 'json'
+    if name not in _BACKENDS:
+        raise error.OtvetArgumentError(f'Unknown json backend: {name}')
+    backend_class, module = _BACKENDS[name]
+    if module() is None:
+        raise error.OtvetArgumentError(f'{name} is not installed')
+    return backend_class()
+
+
+def read_json_prefix(string: str, pos: int = 0) -> Any:
+    """
+    Decode the json value at a position in a string, ignoring everything after it.
+    Uses the json module: orjson and ujson cannot stop after a value, and encoding the rest of the string
+    to decode it with them is slower.
+    """
+    return _decoder.raw_decode(string, json.decoder.WHITESPACE.match(string, pos).end())[0]
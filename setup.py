@@ -36,5 +36,12 @@ setup(
         'requests',
         'dataclasses;python_version<"3.7"',
     ],
+    extras_require={
+        'async': ['aiohttp'],
+        'fast': ['orjson'],
+        'numpy': ['numpy'],
+        'arrow': ['pyarrow'],
+        'dev': ['pytest', 'pyflakes'],
+    },
     python_requires=">=3.6",
 )
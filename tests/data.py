@@ -0,0 +1,63 @@
+"""Api responses for the tests."""
+import json
+
+
+CATEGORIES = [{'id': 1, 'urlname': 'auto', 'position': 1, 'name': 'Авто', 'readonly': '0',
+               'categories': [{'id': 2, 'urlname': 'cars', 'position': 1, 'name': 'Cars', 'readonly': '0'}]}]
+MAIN_PAGE = ('<html><script>\nvar CATEGORIES = ' + json.dumps(CATEGORIES) + ';\nvar BRANDURLS = ["b1"];\n'
+             'var ERRORS = {"12": "Bad thing"};\n'
+             'user = {"id" : "42", "salt" : "abc", "is_adult" : true}\n</script></html>')
+
+
+def user_json(user_id):
+    return {'usrid': str(user_id), 'nick': f'u{user_id}', 'vip': 0, 'kpd': '0.2', 'about': '', 'filin': f'F{user_id}',
+            'is_expert': 0, 'points': '300'}
+
+
+def question_preview_json(question_id):
+    return {'id': str(question_id), 'qtext': 'title', 'state': 'A', 'cid': '2', 'added': '5', 'waslead': '0',
+            'polltype': '', 'total_voted': 0, 'anscnt': '3', 'usrid': '7', 'nick': 'u7', 'vip': 0, 'kpd': '0.3',
+            'about': '', 'filin': 'F7', 'is_expert': 0}
+
+
+def answer_json(answer_id):
+    return {**user_json(8), 'id': str(answer_id), 'atext': 'text', 'source': '', 'added': '10', 'totalmarks': '1',
+            'comments': []}
+
+
+def question_json(question_id, answer_count):
+    return {**user_json(7), 'qid': str(question_id), 'cid': '2', 'acanselbest': 0, 'added': '5', 'totalmarks': '0',
+            'anscnt': str(answer_count), 'comcnt': '0', 'cancomment': '1', 'canreply': 1, 'qtext': 'title',
+            'qcomment': 'text', 'hidden': '0', 'state': 'A', 'waslead': '0', 'watcher': 0, 'marked': [],
+            'answers': [answer_json(100 + i) for i in range(2)], 'bestanswer': None, 'adds': [], 'polltype': '',
+            'comments': [], 'arating': 0, 'can_edit': 0, 'noadd': 0, 'created_at': 1600000000}
+
+
+def profile_json():
+    return {'snick': 'u7', 'spoints': '300', 'srank': 'Ученик', 'description': '', 'skpd': '0.3', 'is_expert': 0,
+            'vip': 0, 'banned': 0, 'subscribed': 0, 'hidden': 0, 'place': '1', 'sans': '10', 'sbans': '1',
+            'cnt': {'deleted_answers': 0, 'questions_new': 0, 'questions_voting': 0, 'questions_resolved': 0,
+                    'followers': 0},
+            'sqst': '3', 'black_cnt': 0, 'following': 0, 'weekpoints': 0, 'filin': 'F7'}
+
+
+def large_main_page(authenticated=True):
+    """
+    Main page of about the size of the real one, 480 KB: the variables read by the client are surrounded by markup
+    and other scripts, and the user object with the auth fields is near the end.
+    """
+    categories = [{'id': i, 'urlname': f'cat{i}', 'position': i, 'name': f'Категория {i}', 'readonly': '0',
+                   'categories': [{'id': i * 100 + j, 'urlname': f'cat{i}-{j}', 'position': j,
+                                   'name': f'Подкатегория {i}.{j}', 'readonly': '0'} for j in range(1, 11)]}
+                  for i in range(1, 31)]
+    brands = [f'brand{i}' for i in range(300)]
+    errors = {str(i): f'Ошибка номер {i}' for i in range(200)}
+    questions = json.dumps([{'id': str(i), 'qtext': f'Вопрос {i}?', 'usrid': str(i * 7)} for i in range(1500)],
+                           ensure_ascii=False)
+    markup = ''.join(f'<div class="item" data-id="{i}"><a href="/question/{i}/">Вопрос номер {i}?</a></div>\n'
+                     for i in range(3500))
+    user = ('user = {"id" : "42", "name" : "Пользователь", "salt" : "abc123", "is_adult" : true, "points" : 10}\n'
+            if authenticated else 'user = null\n')
+    return (f'<html><head><script>\nvar CATEGORIES = {json.dumps(categories, ensure_ascii=False)};\n'
+            f'var BRANDURLS = {json.dumps(brands)};\nvar ERRORS = {json.dumps(errors, ensure_ascii=False)};\n'
+            f'</script></head><body>\n{markup}<script>\nvar QUESTIONS = {questions};\n{user}</script></body></html>')
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+
+from otvetmailru import error, models
+from otvetmailru.aio import AsyncOtvetClient
+from otvetmailru.client import OtvetClient
+from otvetmailru.transport import FakeTransport, FakeAsyncTransport
+
+from .data import MAIN_PAGE, question_json, profile_json
+
+MISSING = 3
+NOT_FOUND = {'status': 404, 'error': 'not_found'}
+
+
+def slow(handle):
+    """Respond to requests for smaller ids later, so that they complete out of order."""
+    def handler(params):
+        item = int(next(v for k, v in params.items() if k in ('qid', 'aid', 'user')))
+        time.sleep(0.002 * (10 - item))
+        return NOT_FOUND if item == MISSING else handle(item)
+    return handler
+
+
+HANDLERS = {
+    '/v2/question': slow(lambda item: question_json(item, 2)),
+    '/v2/showans': slow(lambda item: question_json(item * 10, 2)),
+    '/v2/stats_ex': slow(lambda item: profile_json()),
+}
+ITEMS = [1, 2, MISSING, 4, 5, 6]
+BATCHES = [
+    ('get_questions', lambda question: question.id, ITEMS),
+    ('get_questions_by_answers', lambda question: question.id, [i * 10 for i in ITEMS]),
+    ('get_users', lambda user: user.id, ITEMS),
+]
+
+
+def check_results(results, get_id, expected):
+    assert len(results) == len(ITEMS)
+    for item, result, expected_id in zip(ITEMS, results, expected):
+        if item == MISSING:
+            assert isinstance(result, error.OtvetAPIError)
+        else:
+            assert not isinstance(result, error.OtvetError) and get_id(result) == expected_id
+
+
+@pytest.mark.parametrize('method, get_id, expected', BATCHES)
+def test_batch(method, get_id, expected):
+    client = OtvetClient(transport=FakeTransport(HANDLERS, MAIN_PAGE))
+    check_results(getattr(client, method)(ITEMS, concurrency=4), get_id, expected)
+
+
+@pytest.mark.parametrize('method, get_id, expected', BATCHES)
+def test_async_batch(method, get_id, expected):
+    async def main():
+        client = AsyncOtvetClient(transport=FakeAsyncTransport(HANDLERS, MAIN_PAGE))
+        return await getattr(client, method)(ITEMS, concurrency=4)
+
+    check_results(asyncio.run(main()), get_id, expected)
+
+
+@pytest.mark.parametrize('method', [method for method, _, _ in BATCHES])
+def test_empty_batch(method):
+    transport = FakeTransport(HANDLERS, MAIN_PAGE)
+    assert getattr(OtvetClient(transport=transport), method)([]) == []
+    assert not any('__urlp' in r.params for r in transport.requests)
+
+    async def main():
+        async_transport = FakeAsyncTransport(HANDLERS, MAIN_PAGE)
+        return await getattr(AsyncOtvetClient(transport=async_transport), method)([]), async_transport
+
+    results, async_transport = asyncio.run(main())
+    assert results == []
+    assert not any('__urlp' in r.params for r in async_transport.requests)
+
+
+def test_batch_accepts_models():
+    client = OtvetClient(transport=FakeTransport(HANDLERS, MAIN_PAGE))
+    questions = client.get_questions([1, 2])
+    assert isinstance(questions[0], models.Question)
+    assert [q.id for q in client.get_questions(questions)] == [1, 2]
@@ -0,0 +1,96 @@
+import json
+import time
+
+import pytest
+
+from otvetmailru.cache import ResponseCache, MemoryCache, SqliteCache
+from otvetmailru.client import OtvetClient
+from otvetmailru.transport import FakeTransport
+
+from .data import MAIN_PAGE, question_json, answer_json
+
+
+def comment_json(comment_id, answer_id):
+    return {'cmid': str(comment_id), 'cmtext': 'text', 'usrid': '9', 'added': '3', 'comcnt': '0', 'comments': [],
+            'parent': '0', 'refid': str(answer_id), 'num': '1', 'type': 'A'}
+
+
+def question(params):
+    """Question with answers and comments whose ids depend on the question id."""
+    question_id = int(params['qid'])
+    answers = [answer_json(question_id * 100 + i) for i in range(2)]
+    answers[0]['comments'] = [comment_json(question_id * 1000, question_id * 100)]
+    return {**question_json(question_id, 2), 'answers': answers}
+
+
+HANDLERS = {
+    '/v2/question': question,
+    '/v2/addcmt': lambda params: {'cmid': 7},
+    '/v2/addans': lambda params: {'result': {'id': 5}},
+    **{method: lambda params: {} for method in ('/v2/mark', '/v2/selectbest', '/v2/thanks', '/v2/notimportant')},
+}
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        yield MemoryCache()
+    else:
+        backend = SqliteCache(str(tmp_path / 'cache.db'))
+        yield backend
+        backend.close()
+
+
+def make_client(backend, ttls=None, user_id=42):
+    transport = FakeTransport(HANDLERS, MAIN_PAGE)
+    transport.cookies['ot'] = 'tok'
+    auth_info = json.dumps({'dict': {'token': 'tok', 'salt': 'abc'}, 'user_id': user_id, 'cookie': 'c'})
+    client = OtvetClient(transport=transport, auth_info=auth_info, cache=ResponseCache(backend, ttls))
+    return client, transport
+
+
+def question_requests(transport, question_id):
+    return sum(r.params.get('__urlp') == '/v2/question' and r.params['qid'] == question_id
+               for r in transport.requests)
+
+
+def test_hit(backend):
+    client, transport = make_client(backend)
+    assert client.get_question(1).answers[0].comments[0].id == 1000
+    assert client.get_question(1).answers[0].comments[0].id == 1000
+    assert question_requests(transport, 1) == 1
+    # responses are cached per user
+    other, other_transport = make_client(backend, user_id=43)
+    other.get_question(1)
+    assert question_requests(other_transport, 1) == 1
+
+
+def test_ttl(backend):
+    client, transport = make_client(backend, ttls={'/v2/question': 0.05})
+    client.get_question(1)
+    client.get_question(1)
+    time.sleep(0.1)
+    client.get_question(1)
+    assert question_requests(transport, 1) == 2
+
+
+@pytest.mark.parametrize('write', [
+    lambda client: client.add_answer(1, 'text'),
+    lambda client: client.like_question(1),
+    lambda client: client.add_poll_comment(1, 'text'),
+    lambda client: client.add_answer_comment(100, 'text'),
+    lambda client: client.add_answer_comment(100, 'text', reply_comment=1000),
+    lambda client: client.choose_best_answer(101),
+    lambda client: client.like_answer(100),
+    lambda client: client.thank_answer(101),
+    lambda client: client.hide_answer(100),
+])
+def test_write_invalidates_question(backend, write):
+    client, transport = make_client(backend)
+    client.get_question(1)
+    client.get_question(2)
+    write(client)
+    client.get_question(1)
+    client.get_question(2)
+    assert question_requests(transport, 1) == 2
+    assert question_requests(transport, 2) == 1
@@ -0,0 +1,78 @@
+import asyncio
+import concurrent.futures
+import json
+import threading
+import time
+
+from otvetmailru.aio import AsyncOtvetClient
+from otvetmailru.client import OtvetClient
+from otvetmailru.transport import FakeTransport, FakeAsyncTransport
+
+from .data import MAIN_PAGE, question_json, answer_json
+
+
+THREADS = 32
+HANDLERS = {
+    '/v2/question': lambda params: question_json(params['qid'], 3),
+    '/v2/moreanswers': lambda params: {'answers': [answer_json(102)]},
+}
+
+
+def test_internal_calls_use_overrides():
+    calls = []
+
+    class Client(OtvetClient):
+        def get_question(self, question, **kwargs):
+            calls.append(question)
+            return super().get_question(question, **kwargs)
+
+    client = Client(transport=FakeTransport(HANDLERS, MAIN_PAGE))
+    pages = list(client.iterate_answers(1, step=2))
+    assert [[a.id for a in page] for page in pages] == [[100, 101], [102]]
+    assert calls == [1]
+
+
+def test_internal_calls_use_async_overrides():
+    calls = []
+
+    class Client(AsyncOtvetClient):
+        async def get_question(self, question, **kwargs):
+            calls.append(question)
+            return await super().get_question(question, **kwargs)
+
+    async def main():
+        client = Client(transport=FakeAsyncTransport(HANDLERS, MAIN_PAGE))
+        return [[a.id for a in page] async for page in client.iterate_answers(1, step=2)]
+
+    assert asyncio.run(main()) == [[100, 101], [102]]
+    assert calls == [1]
+
+
+def test_one_token_renewal_for_many_threads():
+    current_token = ['old']
+    # every thread fails with the old token before any of them renews it
+    expired = threading.Barrier(THREADS, timeout=5)
+
+    def question(params):
+        if params['token'] != current_token[0]:
+            expired.wait()
+            return {'status': 403, 'error': 'invalid_token'}
+        return question_json(params['qid'], 2)
+
+    def main_page(params):
+        time.sleep(0.05)
+        transport.cookies['ot'] = current_token[0]
+        return MAIN_PAGE
+
+    transport = FakeTransport({'/v2/question': question, 'https://otvet.mail.ru/': main_page})
+    auth_info = json.dumps({'dict': {'token': 'old', 'salt': 'abc'}, 'user_id': 42, 'cookie': 'c'})
+    client = OtvetClient(transport=transport, auth_info=auth_info)
+    client.get_categories()
+    main_page_loads = len(transport.requests)
+
+    current_token[0] = 'new'
+    with concurrent.futures.ThreadPoolExecutor(THREADS) as executor:
+        questions = list(executor.map(lambda i: client.get_question(1), range(THREADS)))
+    assert [q.id for q in questions] == [1] * THREADS
+    assert sum(r.params.get('__urlp') is None for r in transport.requests) == main_page_loads + 1
+    assert json.loads(client.auth_info)['dict'] == {'token': 'new', 'salt': 'abc'}
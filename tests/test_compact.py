@@ -0,0 +1,36 @@
+from otvetmailru import compact
+from otvetmailru.client import OtvetClient
+from otvetmailru.transport import FakeTransport
+
+from .data import MAIN_PAGE, question_preview_json, question_json, answer_json, profile_json
+
+
+def test_compact_models_as_arguments():
+    transport = FakeTransport({
+        '/v2/questlist': lambda params: {'qst': [question_preview_json(1)]},
+        '/v2/question': lambda params: question_json(params['qid'], 3),
+        '/v2/stats_ex': lambda params: profile_json(),
+        '/v2/addans': lambda params: {'result': {'id': 5}},
+        '/v2/moreanswers': lambda params: {'answers': [answer_json(102)]},
+    }, MAIN_PAGE)
+    transport.cookies['ot'] = 'tok'
+    client = OtvetClient(transport=transport, compact_models=True)
+    preview = client.get_questions_page()[0]
+    assert isinstance(preview, compact.QuestionPreview)
+    assert client.user_id == 42
+
+    question = client.get_question(preview)
+    assert str(transport.requests[-1].params['qid']) == '1'
+    assert isinstance(question, compact.Question)
+
+    profile = client.get_user(preview.author)
+    assert str(transport.requests[-1].params['user']) == '7'
+    assert profile.id == 7
+
+    assert client.add_answer(preview, 'text') == 5
+    assert str(transport.requests[-1].params['qid']) == '1'
+
+    question_requests = sum(r.params.get('__urlp') == '/v2/question' for r in transport.requests)
+    pages = list(client.iterate_answers(question, step=2))
+    assert [[a.id for a in page] for page in pages] == [[100, 101], [102]]
+    assert sum(r.params.get('__urlp') == '/v2/question' for r in transport.requests) == question_requests
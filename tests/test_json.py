@@ -0,0 +1,38 @@
+import math
+
+import pytest
+
+from otvetmailru import error, utils
+from otvetmailru.client import OtvetClient
+from otvetmailru.transport import FakeTransport
+
+from .data import MAIN_PAGE, question_json
+
+
+def test_default_backend():
+    assert utils.get_json_backend().name == 'json'
+
+
+def test_unknown_backend():
+    with pytest.raises(error.OtvetArgumentError):
+        utils.get_json_backend('simplejson')
+
+
+def test_missing_backend(monkeypatch):
+    monkeypatch.setattr(utils, 'orjson', None)
+    with pytest.raises(error.OtvetArgumentError):
+        utils.get_json_backend('orjson')
+
+
+@pytest.mark.parametrize('name', [name for name in ('orjson', 'ujson') if getattr(utils, name) is not None])
+def test_fast_backend_falls_back_to_json(name):
+    backend = utils.get_json_backend(name)
+    assert backend.loads(b'{"qtext": "\\ud83d"}') == {'qtext': '\ud83d'}
+    assert math.isnan(backend.loads(b'[NaN]')[0])
+    with pytest.raises(ValueError):
+        backend.loads(b'<html>')
+
+    # the fake transport encodes the lone surrogate as an escape
+    transport = FakeTransport({'/v2/question': lambda params: {**question_json(1, 2), 'qtext': '\ud83d'}}, MAIN_PAGE)
+    client = OtvetClient(transport=transport, json_backend=name)
+    assert client.get_question(1).title == '\ud83d'
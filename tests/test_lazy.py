@@ -0,0 +1,22 @@
+import pickle
+
+from otvetmailru import models, compact
+from otvetmailru.client import OtvetClient
+from otvetmailru.transport import FakeTransport
+
+from .data import MAIN_PAGE, question_json
+
+
+def test_pickle_lazy_question():
+    for compact_models, question_class in ((False, models.Question), (True, compact.Question)):
+        transport = FakeTransport({'/v2/question': lambda params: question_json(params['qid'], 2)}, MAIN_PAGE)
+        client = OtvetClient(transport=transport, lazy_questions=True, compact_models=compact_models)
+        question = client.get_question(1)
+        assert type(question) is not question_class
+        question.comments = []
+
+        restored = pickle.loads(pickle.dumps(question))
+        assert type(restored) is question_class
+        assert restored.id == 1 and restored.category.name == 'Cars'
+        assert [a.id for a in restored.answers] == [100, 101]
+        assert restored.comments == []
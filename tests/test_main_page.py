@@ -0,0 +1,45 @@
+import pytest
+
+from otvetmailru import error, base
+from otvetmailru.client import OtvetClient
+from otvetmailru.transport import FakeTransport
+
+from .data import large_main_page
+
+AUTH_FIELDS = {'salt': 'abc123', 'id': '42', 'is_adult': True}
+
+
+def test_full_scan():
+    values = base.scan_main_page(large_main_page())
+    assert {name: values[name] for name in AUTH_FIELDS} == AUTH_FIELDS
+    assert len(values['CATEGORIES']) == 30 and values['CATEGORIES'][2]['categories'][0]['name'] == 'Подкатегория 3.1'
+    assert values['BRANDURLS'][-1] == 'brand299'
+    assert values['ERRORS']['12'] == 'Ошибка номер 12'
+
+
+def test_auth_only_scan():
+    assert base.scan_main_page(large_main_page(), with_metadata=False) == AUTH_FIELDS
+
+
+def test_page_without_auth_fields():
+    page = large_main_page(authenticated=False)
+    assert base.scan_main_page(page, with_metadata=False) == {}
+    assert set(base.scan_main_page(page)) == {'CATEGORIES', 'BRANDURLS', 'ERRORS'}
+
+    client = OtvetClient(transport=FakeTransport())
+    client._apply_main_page(page, None)
+    assert client.user_id is None and client.categories.by_id(301).name == 'Подкатегория 3.1'
+    with pytest.raises(error.OtvetAuthError):
+        client._apply_main_page(page, 'tok')
+
+
+@pytest.mark.parametrize('user, expected', [
+    # the id of another object far before the user object is not taken
+    ('{"id" : "7"}' + ' ' * 5000 + 'user = {"id" : "42", "salt" : "abc", "is_adult" : false}',
+     {'salt': 'abc', 'id': '42', 'is_adult': False}),
+    # values of a wrong format are skipped
+    ('user = {"id" : 42, "salt" : "a-b", "is_adult" : 1}', {}),
+    ('user = {"id" : {}, "salt" : "abc", "is_adult" : "yes"}', {'salt': 'abc'}),
+])
+def test_auth_field_formats(user, expected):
+    assert base.scan_main_page(f'<script>{user}</script>', with_metadata=False) == expected
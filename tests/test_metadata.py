@@ -0,0 +1,82 @@
+import asyncio
+import logging
+
+from otvetmailru import metadata
+from otvetmailru.aio import AsyncOtvetClient
+from otvetmailru.base import extract_metadata
+from otvetmailru.transport import FakeAsyncTransport
+
+from .data import MAIN_PAGE
+
+
+class SlowTransport(FakeAsyncTransport):
+    """The main page is returned when the gate opens."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gate = asyncio.Event()
+
+    async def request(self, method, url, *, params=None, data=None, headers=None):
+        await self.gate.wait()
+        return await super().request(method, url, params=params, data=data, headers=headers)
+
+
+def stale_snapshot(path):
+    snapshot = metadata.MetadataSnapshot(str(path / 'metadata.json'), ttl=60)
+    snapshot.save(metadata.Metadata(**{**vars(extract_metadata(MAIN_PAGE)), 'created': 0}))
+    return snapshot
+
+
+def test_async_refresh_task(tmp_path):
+    async def main():
+        snapshot = stale_snapshot(tmp_path)
+        transport = SlowTransport({}, MAIN_PAGE)
+        client = AsyncOtvetClient(transport=transport, metadata_snapshot=snapshot)
+        assert [c.name for c in await client.get_categories()] == ['Авто', 'Cars']
+        task = client._metadata_refresh_task
+        assert task is not None and not task.done()
+        # another client does not start a second refresh
+        other = AsyncOtvetClient(transport=transport, metadata_snapshot=snapshot)
+        await other.get_categories()
+        assert other._metadata_refresh_task is None
+        transport.gate.set()
+        await task
+        assert client._metadata_refresh_task is None
+        assert snapshot.is_fresh(snapshot.load())
+        assert len(transport.requests) == 1
+
+    asyncio.run(main())
+
+
+def test_async_refresh_error_is_logged(tmp_path, caplog):
+    def main_page(params):
+        raise RuntimeError('broken')
+
+    async def main():
+        snapshot = stale_snapshot(tmp_path)
+        client = AsyncOtvetClient(transport=FakeAsyncTransport({'https://otvet.mail.ru/': main_page}),
+                                  metadata_snapshot=snapshot)
+        await client.get_categories()
+        await asyncio.gather(client._metadata_refresh_task, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert client._metadata_refresh_task is None
+        assert not snapshot.is_fresh(snapshot.load())
+        assert snapshot.start_refresh()
+
+    with caplog.at_level(logging.WARNING, logger='otvetmailru.metadata'):
+        asyncio.run(main())
+    assert 'Cannot refresh the metadata snapshot: broken' in caplog.text
+
+
+def test_async_close_cancels_refresh(tmp_path):
+    async def main():
+        snapshot = stale_snapshot(tmp_path)
+        client = AsyncOtvetClient(transport=SlowTransport({}, MAIN_PAGE), metadata_snapshot=snapshot)
+        await client.get_categories()
+        task = client._metadata_refresh_task
+        await client.close()
+        assert task.cancelled()
+        # the refresh can be started again
+        assert snapshot.start_refresh()
+
+    asyncio.run(main())
@@ -0,0 +1,37 @@
+import copy
+import gc
+import pickle
+
+import pytest
+
+from otvetmailru.models import Avatar
+
+
+def test_equal_avatars_are_shared():
+    avatar = Avatar('F1')
+    assert Avatar('F1') is avatar
+    assert Avatar('F2') is not avatar
+    assert pickle.loads(pickle.dumps(avatar)) is avatar
+    assert copy.deepcopy(avatar) is avatar
+    assert str(avatar) == 'https://filin.mail.ru/pic?d=F1'
+    assert avatar.with_size(10, 20) == 'https://filin.mail.ru/pic?d=F1&width=10&height=20'
+
+
+def test_filin_is_read_only():
+    avatar = Avatar('F1')
+    with pytest.raises(AttributeError):
+        avatar.filin = 'F2'
+    assert Avatar('F1').filin == 'F1'
+
+
+def test_avatar_cache_is_bounded():
+    limit = Avatar._recent.maxlen
+    avatars = [Avatar(f'kept{i}') for i in range(10)]
+    for i in range(3 * limit):
+        Avatar(f'temporary{i}')
+    gc.collect()
+    assert len(Avatar._instances) <= limit + len(avatars)
+    # avatars in use stay shared after they were evicted from the recent ones
+    assert all(Avatar(f'kept{i}') is avatar for i, avatar in enumerate(avatars))
+    # recently created ones are kept alive and reused
+    assert Avatar(f'temporary{3 * limit - 1}') is Avatar._recent[-1]
@@ -0,0 +1,113 @@
+from otvetmailru import base, client as client_, polling
+from otvetmailru.client import OtvetClient
+from otvetmailru.polling import NewItemTracker
+from otvetmailru.transport import FakeTransport
+
+from .data import MAIN_PAGE, question_json, answer_json
+
+
+def page(first, last):
+    return [{'id': i} for i in range(first, last - 1, -1)]
+
+
+def test_backfill_stops_at_known_item():
+    tracker = NewItemTracker(10, page_size=5)
+    assert [q['id'] for q in tracker.feed(page(20, 16))] == [20, 19, 18, 17, 16]
+    assert (tracker.offset, tracker.anchor) == (5, 20)
+    assert [q['id'] for q in tracker.feed(page(15, 11))] == [15, 14, 13, 12, 11]
+    assert [q['id'] for q in tracker.feed(page(10, 6))] == []
+    assert tracker.offset is None and not tracker.skipped
+    assert (tracker.last_id, tracker.new_count) == (20, 10)
+
+
+def test_backfill_stops_at_short_page():
+    tracker = NewItemTracker(0, page_size=5)
+    tracker.feed(page(8, 4))
+    assert tracker.offset == 5
+    assert [q['id'] for q in tracker.feed(page(3, 1))] == [3, 2, 1]
+    assert tracker.offset is None and not tracker.skipped
+    assert tracker.last_id == 8
+
+
+def test_backfill_limit():
+    tracker = NewItemTracker(0, max_backfill_pages=1, page_size=5)
+    tracker.feed(page(20, 16))
+    tracker.feed(page(15, 11))
+    assert tracker.offset is None and tracker.skipped
+    assert tracker.last_id == 20
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def follow(monkeypatch, handlers, question_ids, state_check_interval):
+    fake_time = FakeTime()
+    for module in (polling, base, client_):
+        monkeypatch.setattr(module, 'time', fake_time)
+    transport = FakeTransport(handlers, MAIN_PAGE)
+    client = OtvetClient(transport=transport)
+    schedule = polling.AnswerSchedule(state_check_interval=state_check_interval)
+    list(client.follow_answers(question_ids, schedule=schedule))
+    return [(r.params['__urlp'], r.params['qid']) for r in transport.requests if '__urlp' in r.params]
+
+
+def test_follow_answers_loads_state_once_in_a_while(monkeypatch):
+    requests = follow(monkeypatch, {
+        '/v2/moreanswers': lambda params: {'answers': []},
+        '/v2/question': lambda params: {**question_json(params['qid'], 0), 'state': 'R'},
+    }, [1], 3)
+    assert requests == [('/v2/moreanswers', 1)] * 3 + [('/v2/question', 1)]
+
+
+def test_follow_answers_errors(monkeypatch):
+    failures = {1: [{'status': 429, 'error': 'too_many_requests'}], 2: [{'status': 404, 'error': 'not_found'}]}
+
+    def more_answers(params):
+        return failures[params['qid']].pop() if failures[params['qid']] else {'answers': []}
+
+    requests = follow(monkeypatch, {
+        '/v2/moreanswers': more_answers,
+        '/v2/question': lambda params: {**question_json(params['qid'], 0), 'state': 'R'},
+    }, [1, 2], 1)
+    # the limit error is retried later, the other api error drops the question
+    assert sorted(requests) == [('/v2/moreanswers', 1), ('/v2/moreanswers', 1), ('/v2/moreanswers', 2),
+                                ('/v2/question', 1)]
+
+
+def test_sync_watchlist_loads_answers_of_changed_questions():
+    answer_counts = {question_id: 2 for question_id in range(1, 8)}
+
+    def watchlist(params):
+        ids = sorted(answer_counts)[int(params['p']):int(params['p']) + int(params['n'])]
+        return {'questions': [{'qid': str(i), 'qtext': 'title', 'state': 'A', 'cid': '2', 'added': '5', 'waslead': '0',
+                               'polltype': '', 'anscnt': str(answer_counts[i]), 'usrid': '7', 'qnick': 'u7',
+                               'qfilin': 'F7'} for i in ids]}
+
+    def more_answers(params):
+        first = int(params['p'])
+        last = min(first + int(params['n']), answer_counts[params['qid']])
+        return {'answers': [answer_json(params['qid'] * 100 + i) for i in range(first, last)]}
+
+    transport = FakeTransport({'/v2/watchlist': watchlist, '/v2/moreanswers': more_answers}, MAIN_PAGE)
+    client = OtvetClient(transport=transport)
+    snapshot = polling.WatchlistSnapshot()
+    assert client.sync_watchlist(snapshot, 42, step=3) == []
+    answer_counts[5] = 6
+    changes = client.sync_watchlist(snapshot, 42, step=3)
+
+    assert [(c.question_id, c.previous_answer_count, c.answer_count) for c in changes] == [(5, 2, 6)]
+    assert [a.id for a in changes[0].new_answers] == [502, 503, 504, 505]
+    requests = [(r.params['__urlp'], r.params.get('qid')) for r in transport.requests if '__urlp' in r.params]
+    # three watchlist pages per sync, answers only for the changed question
+    assert requests == [('/v2/watchlist', None)] * 6 + [('/v2/moreanswers', 5)] * 2
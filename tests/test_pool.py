@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from otvetmailru import error
+from otvetmailru.client import OtvetClient
+from otvetmailru.pool import OtvetClientPool
+from otvetmailru.transport import FakeTransport
+
+from .data import MAIN_PAGE
+
+
+def limit_set(answers):
+    return {'ASK': 5, 'DIQ': 5, 'AAQ': answers, 'VBA': 5, 'OPV': 5, 'QAM': 5, 'IMQ': 5, 'VIQ': 5, 'GSR': 5}
+
+
+def account(user_id, answers, add_answer):
+    transport = FakeTransport({
+        '/v2/showlimits': lambda params: {'total': limit_set(100), 'current': limit_set(answers)},
+        '/v2/addans': add_answer,
+    }, MAIN_PAGE)
+    # set by the main page for a restored session
+    transport.cookies['ot'] = 'tok'
+    auth_info = json.dumps({'dict': {'token': 'tok', 'salt': 'abc'}, 'user_id': user_id, 'cookie': 'c'})
+    return OtvetClient(transport=transport, auth_info=auth_info), transport
+
+
+def answered(params):
+    return {'result': {'id': 5}}
+
+
+def test_writes_go_to_the_account_with_most_left():
+    first, _ = account(1, 2, answered)
+    second, _ = account(2, 3, answered)
+    pool = OtvetClientPool([first, second])
+    writers = [pool.writer('answers').user_id for _ in range(5)]
+    assert writers == [2, 1, 2, 1, 2]
+    assert pool.remaining('answers') == 0
+    with pytest.raises(error.OtvetLimitError):
+        pool.writer('answers')
+
+
+def test_limit_error_zeroes_the_account():
+    first, first_transport = account(1, 5, lambda params: {'status': 429, 'error': 'answers_per_day'})
+    second, _ = account(2, 3, answered)
+    pool = OtvetClientPool([first, second])
+    with pytest.raises(error.OtvetAPIError) as e:
+        pool.add_answer(1, 'text')
+    assert e.value.is_limit_error
+    assert pool.remaining('answers') == 3
+    assert [pool.add_answer(1, 'text') for _ in range(3)] == [5, 5, 5]
+    with pytest.raises(error.OtvetLimitError):
+        pool.add_answer(1, 'text')
+    # the limits were not loaded again
+    assert sum(r.params.get('__urlp') == '/v2/showlimits' for r in first_transport.requests) == 1
+
+
+def test_other_api_errors_reload_the_limits():
+    first, first_transport = account(1, 5, lambda params: {'status': 403, 'error': 'limit_wording_changed'})
+    pool = OtvetClientPool([first])
+    with pytest.raises(error.OtvetAPIError) as e:
+        pool.add_answer(1, 'text')
+    assert not e.value.is_limit_error
+    assert pool.remaining('answers') == 4
+    with pytest.raises(error.OtvetAPIError):
+        pool.add_answer(1, 'text')
+    assert sum(r.params.get('__urlp') == '/v2/showlimits' for r in first_transport.requests) == 2
+
+
+def test_custom_limit_error():
+    first, _ = account(1, 5, lambda params: {'status': 403, 'error': 'answers_per_day'})
+    pool = OtvetClientPool([first], limit_error=lambda e: e.response['error'] == 'answers_per_day')
+    with pytest.raises(error.OtvetAPIError):
+        pool.add_answer(1, 'text')
+    assert pool.remaining('answers') == 0
+
+
+def test_transport_errors_are_not_counted():
+    def timeout(params):
+        raise error.OtvetTimeoutError('read timed out')
+
+    first, first_transport = account(1, 5, timeout)
+    pool = OtvetClientPool([first])
+    with pytest.raises(error.OtvetTimeoutError):
+        pool.add_answer(1, 'text')
+    assert pool.remaining('answers') == 5
+    with pytest.raises(error.OtvetTimeoutError):
+        pool.add_answer(1, 'text')
+    # the limits are loaded again before the next write of the account
+    assert sum(r.params.get('__urlp') == '/v2/showlimits' for r in first_transport.requests) == 2
@@ -0,0 +1,130 @@
+import asyncio
+import time
+
+import pytest
+
+from otvetmailru import aio, client
+from otvetmailru.aio import AsyncOtvetClient
+from otvetmailru.client import OtvetClient
+from otvetmailru.transport import FakeTransport, FakeAsyncTransport
+
+from .data import MAIN_PAGE, question_preview_json
+
+TOTAL = 7
+STEP = 2
+PAGES = [[0, 1], [2, 3], [4, 5], [6]]
+
+
+def page(offset):
+    return list(range(offset, min(offset + STEP, TOTAL)))
+
+
+def user_questions(params):
+    return {'qst': [{**question_preview_json(i), 'hidden': 0} for i in page(int(params['p']))]}
+
+
+def test_order():
+    def get_page(offset):
+        # later pages are loaded first
+        time.sleep(0.01 * (TOTAL - offset))
+        return page(offset)
+
+    assert list(client.prefetch_pages(get_page, STEP, 3)) == PAGES
+
+
+def test_early_close():
+    requested = []
+
+    def get_page(offset):
+        requested.append(offset)
+        return page(offset)
+
+    pages = client.prefetch_pages(get_page, STEP, 2)
+    assert next(pages) == PAGES[0]
+    pages.close()
+    # only the pages in flight were requested
+    assert set(requested) <= {0, 2, 4}
+
+
+def test_error():
+    def get_page(offset):
+        if offset == 4:
+            raise ValueError(offset)
+        return page(offset)
+
+    pages = client.prefetch_pages(get_page, STEP, 3)
+    assert [next(pages), next(pages)] == PAGES[:2]
+    with pytest.raises(ValueError):
+        next(pages)
+
+
+def test_client():
+    transport = FakeTransport({'/v2/quserlist': user_questions}, MAIN_PAGE)
+    pages = OtvetClient(transport=transport).iterate_user_questions(7, step=STEP, prefetch=3)
+    assert [[q.id for q in p] for p in pages] == PAGES
+
+
+async def collect(pages):
+    return [p async for p in pages]
+
+
+def test_async_order():
+    async def get_page(offset):
+        await asyncio.sleep(0.01 * (TOTAL - offset))
+        return page(offset)
+
+    assert asyncio.run(collect(aio.prefetch_pages(get_page, STEP, 3))) == PAGES
+
+
+def run_with_blocked_pages(use_pages, fail_at=None):
+    """Pages after the first one never load, :return: offsets of the requests that were cancelled"""
+    cancelled = []
+
+    async def get_page(offset):
+        if offset == fail_at:
+            raise ValueError(offset)
+        if offset > 0:
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(offset)
+                raise
+        return page(offset)
+
+    async def main():
+        pages = aio.prefetch_pages(get_page, STEP, 3)
+        try:
+            await use_pages(pages)
+        finally:
+            await pages.aclose()
+        # nothing is left running
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    asyncio.run(main())
+    return cancelled
+
+
+def test_async_early_close():
+    async def use_pages(pages):
+        assert await pages.__anext__() == PAGES[0]
+
+    assert sorted(run_with_blocked_pages(use_pages)) == [2, 4]
+
+
+def test_async_error():
+    async def use_pages(pages):
+        assert await pages.__anext__() == PAGES[0]
+        with pytest.raises(ValueError):
+            await pages.__anext__()
+
+    # the page loading after the failed one, the next request was cancelled before it started
+    assert run_with_blocked_pages(use_pages, fail_at=2) == [4]
+
+
+def test_async_client():
+    async def main():
+        transport = FakeAsyncTransport({'/v2/quserlist': user_questions}, MAIN_PAGE)
+        pages = AsyncOtvetClient(transport=transport).iterate_user_questions(7, step=STEP, prefetch=3)
+        return [[q.id for q in p] async for p in pages]
+
+    assert asyncio.run(main()) == PAGES
@@ -0,0 +1,78 @@
+import pytest
+
+from otvetmailru import error, ratelimit
+from otvetmailru.client import OtvetClient
+from otvetmailru.ratelimit import RateLimiter
+from otvetmailru.transport import FakeTransport
+
+from .data import MAIN_PAGE, question_json
+
+
+class FakeClock:
+    def __init__(self, now=1000.):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_spacing():
+    clock = FakeClock()
+    limiter = RateLimiter(2, clock=clock)
+    assert [limiter.reserve('/v2/question') for _ in range(3)] == [0, 0.5, 1.]
+    clock.now += 1
+    assert limiter.reserve('/v2/question') == 0.5
+    clock.now += 10
+    assert limiter.reserve('/v2/question') == 0
+
+
+def test_burst():
+    clock = FakeClock()
+    limiter = RateLimiter(1, 3, clock=clock)
+    assert [limiter.reserve('/v2/question') for _ in range(4)] == [0, 0, 0, 1.]
+    clock.now += 100
+    # an idle period gives back only `burst` requests
+    assert [limiter.reserve('/v2/question') for _ in range(4)] == [0, 0, 0, 1.]
+
+
+def test_endpoint_budget():
+    clock = FakeClock()
+    limiter = RateLimiter(10, endpoints={'/v2/addans': (1, 1)}, clock=clock)
+    assert limiter.reserve('/v2/addans') == 0
+    assert limiter.reserve('/v2/addans') == 1.
+    # other methods only use the global budget, requests are sent in the order they were reserved
+    assert limiter.reserve('/v2/question') == pytest.approx(1.1)
+    assert RateLimiter(endpoints={'/v2/addans': (1, 1)}, clock=clock).reserve('/v2/question') == 0
+
+
+@pytest.mark.skipif(ratelimit.fcntl is None, reason='fcntl is not available')
+def test_shared_state_file(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / 'limits.json')
+    first = RateLimiter(1, path=path, clock=clock)
+    second = RateLimiter(1, path=path, clock=clock)
+    assert first.path == path
+    assert first.reserve('/v2/question') == 0
+    assert second.reserve('/v2/question') == 1.
+    assert first.reserve('/v2/question') == 2.
+
+
+def test_unsupported_state_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(ratelimit, 'fcntl', None)
+    with pytest.raises(error.OtvetArgumentError):
+        RateLimiter(1, path=str(tmp_path / 'limits.json'))
+
+
+def test_client_waits(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit.time, 'sleep', clock.sleep)
+    transport = FakeTransport({'/v2/question': lambda params: question_json(params['qid'], 2)}, MAIN_PAGE)
+    client = OtvetClient(transport=transport, rate_limiter=RateLimiter(4, clock=clock))
+    for question_id in range(3):
+        client.get_question(question_id)
+    assert clock.sleeps == [0.25, 0.25]
@@ -0,0 +1,33 @@
+import pytest
+
+from otvetmailru import rates
+
+
+def reference_by_user_stats(points, kpd):
+    """The linear scan that by_user_stats replaced."""
+    return max([r for r in rates.rates if r.min_points <= points and r.min_kpd <= kpd],
+               key=lambda r: (r.min_points, r.min_kpd))
+
+
+# every threshold and its neighbours
+POINTS = sorted({max(r.min_points + d, 0) for r in rates.rates for d in (-1, 0, 1)} | {10 ** 7})
+KPDS = sorted({max(r.min_kpd + d, 0) for r in rates.rates for d in (-1, -0.5, 0, 0.5, 1)} | {100})
+
+
+@pytest.mark.parametrize('points', POINTS)
+def test_by_user_stats_matches_scan(points):
+    for kpd in KPDS:
+        assert rates.by_user_stats(points, kpd) is reference_by_user_stats(points, kpd), (points, kpd)
+
+
+def test_by_user_stats_without_rate():
+    with pytest.raises(ValueError):
+        rates.by_user_stats(-1, 0)
+
+
+def test_by_name():
+    for rate in rates.rates:
+        assert rates.by_name(rate.name) is rate
+        assert rates.by_name(rate.name.upper()) is rate
+    with pytest.raises(KeyError):
+        rates.by_name('Неизвестный')
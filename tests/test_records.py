@@ -0,0 +1,104 @@
+import dataclasses
+import enum
+
+import pytest
+
+from otvetmailru import error, models, records, columnar
+from otvetmailru.client import OtvetClient
+from otvetmailru.transport import FakeTransport
+
+from .data import MAIN_PAGE, question_preview_json, answer_json
+
+
+def watched_question_json(question_id):
+    return {'qid': str(question_id), 'qtext': 'title', 'state': 'R', 'cid': '1', 'added': '5', 'waslead': '1',
+            'polltype': '', 'anscnt': '4', 'usrid': '7', 'qnick': 'u7', 'qfilin': 'F7'}
+
+
+HANDLERS = {
+    '/v2/questlist': lambda params: {'qst': [question_preview_json(i) for i in range(1, 4)]},
+    '/v2/quserlist': lambda params: {'qst': [{**question_preview_json(i), 'hidden': i % 2} for i in range(1, 4)]
+                                     if params['p'] == 0 else []},
+    '/v2/moreanswers': lambda params: {'answers': [answer_json(100 + i) for i in range(3)]},
+    '/v2/watchlist': lambda params: {'questions': [watched_question_json(i) for i in range(1, 4)]},
+}
+METHODS = [
+    ('get_questions_page', ()),
+    ('get_user_questions_page', (7,)),
+    ('get_more_answers_page', (1,)),
+    ('get_watching_questions_page', (7,)),
+    ('iterate_user_questions', (7,)),
+]
+
+
+def call(method, args, output):
+    client = OtvetClient(transport=FakeTransport(HANDLERS, MAIN_PAGE))
+    result = getattr(client, method)(*args, output=output)
+    if method.startswith('iterate_'):
+        pages = list(result)
+        # all items fit in one page
+        assert len(pages) == 1
+        return pages[0]
+    return result
+
+
+def model_values(value):
+    """Values of a model as records keep them."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, models.Avatar):
+        return value.filin
+    if isinstance(value, models.Rate):
+        return value.name
+    if isinstance(value, models.Category):
+        return value.id
+    if dataclasses.is_dataclass(value):
+        return type(value).__name__, {f.name: model_values(getattr(value, f.name)) for f in dataclasses.fields(value)}
+    if isinstance(value, list):
+        return [model_values(v) for v in value]
+    return value
+
+
+def record_values(value):
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        return type(value).__name__, {name: record_values(v) for name, v in value._asdict().items()}
+    if isinstance(value, list):
+        return [record_values(v) for v in value]
+    return value
+
+
+def model_columns(values, prefix=''):
+    """Scalar fields of model_values, with nested models flattened like in columnar output."""
+    columns = {}
+    for name, value in values[1].items():
+        if isinstance(value, tuple):
+            columns.update(model_columns(value, f'{prefix}{name}_'))
+        elif not isinstance(value, list):
+            columns[prefix + name] = value
+    return columns
+
+
+@pytest.mark.parametrize('output', ['records', 'raw', 'columns'])
+@pytest.mark.parametrize('method, args', METHODS)
+def test_output_matches_models(method, args, output):
+    items = call(method, args, 'models')
+    assert items
+    result = call(method, args, output)
+    if output == 'records':
+        assert [record_values(r) for r in result] == [model_values(m) for m in items]
+    elif output == 'columns':
+        rows = [model_columns(model_values(m)) for m in items]
+        assert len(result) == len(items)
+        assert 'id' in result.columns
+        for name, column in result.columns.items():
+            assert list(column) == [row[name] for row in rows], name
+    else:
+        assert all(isinstance(r, dict) for r in result)
+        assert [records.item_id(r) for r in result] == [m.id for m in items]
+
+
+@pytest.mark.parametrize('output, library', [('numpy', 'numpy'), ('arrow', 'pyarrow')])
+def test_missing_columnar_library(monkeypatch, output, library):
+    monkeypatch.setattr(columnar, library, None)
+    with pytest.raises(error.OtvetArgumentError):
+        call('get_questions_page', (), output)
@@ -0,0 +1,104 @@
+import json
+import random
+import time
+
+import pytest
+
+from otvetmailru import error
+from otvetmailru.client import OtvetClient
+from otvetmailru.retry import RetryPolicy
+from otvetmailru.transport import FakeTransport, Response
+
+from .data import MAIN_PAGE, question_json
+
+
+def failing(*results):
+    """Handler that returns or raises the given results, then a question."""
+    results = list(results)
+
+    def handle(params):
+        if results:
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return question_json(params['qid'], 2)
+    return handle
+
+
+def make_client(handlers, **policy_args):
+    transport = FakeTransport(handlers, MAIN_PAGE)
+    policy = RetryPolicy(jitter=False, base_delay=0, **policy_args)
+    auth_info = json.dumps({'dict': {'token': 'tok', 'salt': 'abc'}, 'user_id': 42, 'cookie': 'c'})
+    return OtvetClient(transport=transport, retry_policy=policy, auth_info=auth_info), transport
+
+
+def api_requests(transport, method):
+    return sum(r.params.get('__urlp') == method for r in transport.requests)
+
+
+@pytest.mark.parametrize('failure', [
+    Response(503, b''), Response(429, b''), Response(200, b'<html>'),
+    error.OtvetConnectionError('refused'), error.OtvetTimeoutError('timed out'),
+])
+def test_transient_errors_are_retried(failure):
+    client, transport = make_client({'/v2/question': failing(failure, failure)})
+    assert client.get_question(1).id == 1
+    assert api_requests(transport, '/v2/question') == 3
+
+
+def test_api_errors_are_not_retried():
+    client, transport = make_client({'/v2/question': failing({'status': 404, 'error': 'not_found'})})
+    with pytest.raises(error.OtvetAPIError):
+        client.get_question(1)
+    assert api_requests(transport, '/v2/question') == 1
+
+
+def test_client_errors_are_not_retried():
+    client, transport = make_client({'/v2/question': failing(Response(404, b''))})
+    with pytest.raises(error.OtvetHTTPError):
+        client.get_question(1)
+    assert api_requests(transport, '/v2/question') == 1
+
+
+def test_writes():
+    client, transport = make_client({'/v2/addans': failing(Response(503, b''))})
+    with pytest.raises(error.OtvetHTTPError):
+        client.add_answer(1, 'text')
+    assert api_requests(transport, '/v2/addans') == 1
+
+    # the request did not reach the server
+    client, transport = make_client({'/v2/addans': failing(error.OtvetConnectionError('refused'),
+                                                           {'result': {'id': 5}})})
+    assert client.add_answer(1, 'text') == 5
+    assert api_requests(transport, '/v2/addans') == 2
+
+    client, transport = make_client({'/v2/addans': failing(Response(503, b''), {'result': {'id': 5}})},
+                                    retry_writes=True)
+    assert client.add_answer(1, 'text') == 5
+
+
+def test_attempt_limit():
+    client, transport = make_client({'/v2/question': failing(*[Response(502, b'')] * 5)}, attempts=3)
+    with pytest.raises(error.OtvetHTTPError):
+        client.get_question(1)
+    assert api_requests(transport, '/v2/question') == 3
+
+
+def test_backoff_bounds():
+    failure = error.OtvetConnectionError('refused')
+    started = time.monotonic()
+    policy = RetryPolicy(attempts=10, jitter=False)
+    assert [policy.next_delay(a, failure, False, started) for a in range(6)] == [0.5, 1, 2, 4, 8, 10]
+    assert policy.next_delay(9, failure, False, started) is None
+
+    def jittered_delays(seed):
+        policy = RetryPolicy(attempts=10, rng=random.Random(seed))
+        return [policy.next_delay(a, failure, False, started) for a in range(9)]
+
+    delays = jittered_delays(1)
+    assert all(0 <= d <= min(10, 0.5 * 2 ** a) for a, d in enumerate(delays))
+    assert delays == jittered_delays(1)
+    assert len(set(delays)) == len(delays)
+
+    assert RetryPolicy(deadline=1, jitter=False).next_delay(2, failure, False, started) is None
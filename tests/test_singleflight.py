@@ -0,0 +1,147 @@
+import asyncio
+import concurrent.futures
+import json
+import threading
+import time
+
+import pytest
+
+from otvetmailru import error
+from otvetmailru.aio import AsyncOtvetClient
+from otvetmailru.client import OtvetClient
+from otvetmailru.transport import FakeTransport, FakeAsyncTransport
+
+from .data import MAIN_PAGE, question_json
+
+AUTH_INFO = json.dumps({'dict': {'token': 'tok', 'salt': 'abc'}, 'user_id': 42, 'cookie': 'c'})
+CALLERS = 8
+
+
+def api_requests(transport, method):
+    return sum(r.params.get('__urlp') == method for r in transport.requests)
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def run_concurrently(func):
+    executor = concurrent.futures.ThreadPoolExecutor(CALLERS)
+    futures = [executor.submit(func) for _ in range(CALLERS)]
+    executor.shutdown(wait=False)
+    return futures
+
+
+def make_client(handlers):
+    transport = FakeTransport(handlers, MAIN_PAGE)
+    transport.cookies['ot'] = 'tok'
+    return OtvetClient(transport=transport, auth_info=AUTH_INFO, coalesce_requests=True), transport
+
+
+def coalesced_reads(response):
+    """Make the same read from all callers while the first request is waiting, :return: futures and transport"""
+    release = threading.Event()
+
+    def handle(params):
+        release.wait(5)
+        return response
+
+    client, transport = make_client({'/v2/question': handle})
+    futures = run_concurrently(lambda: client.get_question(1))
+    wait_until(lambda: client._single_flight.coalesced == CALLERS - 1)
+    release.set()
+    return client, futures, transport
+
+
+def test_identical_reads_are_merged():
+    client, futures, transport = coalesced_reads(question_json(1, 2))
+    assert [future.result().id for future in futures] == [1] * CALLERS
+    assert api_requests(transport, '/v2/question') == 1
+    # completed calls are not reused
+    client.get_question(1)
+    assert api_requests(transport, '/v2/question') == 2
+
+
+def test_error_reaches_every_waiter():
+    _, futures, transport = coalesced_reads({'status': 404, 'error': 'not_found'})
+    for future in futures:
+        with pytest.raises(error.OtvetAPIError):
+            future.result()
+    assert api_requests(transport, '/v2/question') == 1
+
+
+def test_different_reads_are_not_merged():
+    client, transport = make_client({'/v2/question': lambda params: question_json(params['qid'], 2)})
+    with concurrent.futures.ThreadPoolExecutor(CALLERS) as executor:
+        questions = list(executor.map(client.get_question, range(CALLERS)))
+    assert [q.id for q in questions] == list(range(CALLERS))
+    assert api_requests(transport, '/v2/question') == CALLERS
+
+
+def test_writes_are_not_merged():
+    # every request waits for all of them, a merged request would break the barrier
+    barrier = threading.Barrier(CALLERS, timeout=5)
+
+    def handle(params):
+        barrier.wait()
+        return {'result': {'id': 5}}
+
+    client, transport = make_client({'/v2/addans': handle})
+    futures = run_concurrently(lambda: client.add_answer(1, 'text'))
+    assert [future.result() for future in futures] == [5] * CALLERS
+    assert api_requests(transport, '/v2/addans') == CALLERS
+    assert client._single_flight.coalesced == 0
+
+
+class GatedTransport(FakeAsyncTransport):
+    """Api requests wait for the gate to open, so that concurrent calls overlap."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gate = asyncio.Event()
+        self.waiting = 0
+
+    async def request(self, method, url, *, params=None, data=None, headers=None):
+        if '__urlp' in (params or data or {}):
+            self.waiting += 1
+            await self.gate.wait()
+        return await super().request(method, url, params=params, data=data, headers=headers)
+
+
+async def gather_gated(transport, client, make_call, condition):
+    tasks = [asyncio.ensure_future(make_call()) for _ in range(CALLERS)]
+    while not condition():
+        await asyncio.sleep(0)
+    transport.gate.set()
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def test_async_identical_reads_are_merged():
+    async def main(response):
+        transport = GatedTransport({'/v2/question': lambda params: response}, MAIN_PAGE)
+        client = AsyncOtvetClient(transport=transport, auth_info=AUTH_INFO, coalesce_requests=True)
+        results = await gather_gated(transport, client, lambda: client.get_question(1),
+                                     lambda: client._single_flight.coalesced == CALLERS - 1)
+        return results, api_requests(transport, '/v2/question')
+
+    results, requests = asyncio.run(main(question_json(1, 2)))
+    assert [q.id for q in results] == [1] * CALLERS
+    assert requests == 1
+
+    results, requests = asyncio.run(main({'status': 404, 'error': 'not_found'}))
+    assert all(isinstance(e, error.OtvetAPIError) for e in results)
+    assert requests == 1
+
+
+def test_async_writes_are_not_merged():
+    async def main():
+        transport = GatedTransport({'/v2/addans': lambda params: {'result': {'id': 5}}}, MAIN_PAGE)
+        client = AsyncOtvetClient(transport=transport, auth_info=AUTH_INFO, coalesce_requests=True)
+        results = await gather_gated(transport, client, lambda: client.add_answer(1, 'text'),
+                                     lambda: transport.waiting == CALLERS)
+        return results, api_requests(transport, '/v2/addans'), client._single_flight.coalesced
+
+    assert asyncio.run(main()) == ([5] * CALLERS, CALLERS, 0)
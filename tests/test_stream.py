@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from otvetmailru.stream import JsonArrayStream
+
+
+PATH = ('comments', 'comments')
+ITEMS = [
+    {'text': 'a ] b, "c" [{', 'n': 1}, 'é\n"\\', 'привет 🎉', 12345, -1.5e+10, 0, True, None, [1, ']'],
+    {'x': ']'}, 7,
+]
+DOCUMENT = json.dumps({'status': 200, 'comments': {'count': 5, 'comments': ITEMS, 'after': 'x]'}, 'tail': 'ё'},
+                      ensure_ascii=False).encode()
+SKELETON = {'status': 200, 'comments': {'count': 5, 'comments': [], 'after': 'x]'}, 'tail': 'ё'}
+
+
+def parse(chunks, path=PATH):
+    parser = JsonArrayStream(path)
+    items = []
+    for chunk in chunks:
+        items += parser.feed(chunk)
+    rest, skeleton = parser.finish()
+    return items + rest, skeleton, parser.found
+
+
+@pytest.mark.parametrize('document', [DOCUMENT, json.dumps(json.loads(DOCUMENT)).encode()])
+def test_split_at_every_offset(document):
+    for offset in range(len(document) + 1):
+        assert parse([document[:offset], document[offset:]]) == (ITEMS, SKELETON, True), offset
+
+
+def test_byte_by_byte():
+    assert parse(DOCUMENT[i:i + 1] for i in range(len(DOCUMENT))) == (ITEMS, SKELETON, True)
+
+
+def test_items_are_returned_when_complete():
+    parser = JsonArrayStream(['answers'])
+    assert parser.feed(b'{"answers": [{"id": 1}') == [{'id': 1}]
+    assert parser.feed(b', "text"') == ['text']
+    assert parser.feed(b', {"id": 2}') == [{'id': 2}]
+    # a number may continue in the next chunk
+    assert parser.feed(b', 12') == []
+    assert parser.feed(b'3') == []
+    assert parser.feed(b', true') == [123, True]
+    assert parser.feed(b']}') == []
+    assert parser.finish() == ([], {'answers': []})
+
+
+def test_document_without_array():
+    document = b'{"status": 403, "error": "invalid_token", "comments": {"count": 0}}'
+    for offset in range(len(document) + 1):
+        assert parse([document[:offset], document[offset:]]) == ([], json.loads(document), False)
+
+
+def test_empty_array():
+    document = b'{"comments": {"comments": [ ]}, "status": 200}'
+    for offset in range(len(document) + 1):
+        assert parse([document[:offset], document[offset:]]) == ([], {'comments': {'comments': []}, 'status': 200},
+                                                                 True)
+
+
+@pytest.mark.parametrize('document', [b'{"comments": {"comments": [1, 2', b'{"comments": {"comments": [1 2]}}',
+                                      b'{"comments": {"comments": [{"a": }]}}', b'{"status": 200'])
+def test_invalid_document(document):
+    with pytest.raises(ValueError):
+        parse([document])
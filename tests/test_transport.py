@@ -0,0 +1,28 @@
+import requests
+
+from otvetmailru.transport import RequestsTransport
+
+
+class RecordingSession(requests.Session):
+    def __init__(self):
+        super().__init__()
+        self.sent_headers = []
+
+    def request(self, method, url, **kwargs):
+        self.sent_headers.append(kwargs['headers'])
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{}'
+        return response
+
+
+def test_keep_alive_does_not_change_session():
+    session = RecordingSession()
+    transport = RequestsTransport(session, keep_alive=False)
+    transport.get('https://otvet.mail.ru/', headers={'Referer': 'x'})
+    transport.stream('GET', 'https://otvet.mail.ru/')
+    assert session.headers.get('Connection') != 'close'
+    assert session.sent_headers == [{'Referer': 'x', 'Connection': 'close'}, {'Connection': 'close'}]
+
+    RequestsTransport(session).get('https://otvet.mail.ru/')
+    assert session.sent_headers[-1] is None